@@ -4,19 +4,47 @@ FileSense Models Package
 from app.models.database import (
     File, 
     Tag, 
+    file_tags,
+    file_search,
+    file_trigrams,
     ActivityLog, 
     Settings,
+    ScanJob,
+    CatalogStat,
     init_database,
     get_session,
+    remove_session,
+    session_scope,
+    write_scope,
+    read_snapshot,
+    catalog_generation,
+    create_sqlite_engine,
+    SQLITE_PROFILES,
     Base
 )
+from app.models.migrations import migrate, SCHEMA_VERSION, MigrationError
 
 __all__ = [
     'File',
     'Tag', 
+    'file_tags',
+    'file_search',
+    'file_trigrams',
     'ActivityLog',
     'Settings',
+    'ScanJob',
+    'CatalogStat',
     'init_database',
     'get_session',
-    'Base'
+    'remove_session',
+    'session_scope',
+    'write_scope',
+    'read_snapshot',
+    'catalog_generation',
+    'create_sqlite_engine',
+    'SQLITE_PROFILES',
+    'Base',
+    'migrate',
+    'SCHEMA_VERSION',
+    'MigrationError'
 ]
@@ -1,10 +1,14 @@
 """
 Database models for FileSense
 """
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, MetaData, Table, Column, Index, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy.exc import DatabaseError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker, scoped_session, Session
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Optional
+import threading
 import os
 
 Base = declarative_base()
@@ -15,20 +19,21 @@ class File(Base):
     __tablename__ = 'files'
     
     id = Column(Integer, primary_key=True)
-    name = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False, index=True)
     path = Column(String(500), unique=True, nullable=False)
-    extension = Column(String(10))
+    extension = Column(String(10), index=True)
     size = Column(Integer)
-    date_added = Column(DateTime, default=datetime.utcnow)
+    date_added = Column(DateTime, default=datetime.utcnow, index=True)
     last_modified = Column(DateTime, default=datetime.utcnow)
-    last_accessed = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
     summary = Column(Text)
     ai_summary = Column(Text)
     author = Column(String(100))
-    category = Column(String(50))
+    category = Column(String(50), index=True)
     is_favorite = Column(Boolean, default=False)
+    content_indexed_at = Column(DateTime)  # NULL until the content indexer has read the file
     
-    tags = relationship('Tag', back_populates='file', cascade='all, delete-orphan')
+    tags = relationship('Tag', secondary='file_tags', back_populates='files', order_by='Tag.name')
     activities = relationship('ActivityLog', back_populates='file', cascade='all, delete-orphan')
     
     @property
@@ -110,25 +115,62 @@ class File(Base):
     @property
     def tag_list(self):
         """Get list of tag names"""
-        return [tag.tag for tag in self.tags]
+        return [tag.name for tag in self.tags]
     
     def __repr__(self):
         return f"<File(id={self.id}, name='{self.name}')>"
 
 
 class Tag(Base):
-    """Tag model for categorizing files"""
+    """Tag vocabulary: one row per distinct tag name, linked to files through file_tags"""
     __tablename__ = 'tags'
     
     id = Column(Integer, primary_key=True)
-    file_id = Column(Integer, ForeignKey('files.id'), nullable=False)
-    tag = Column(String(50), nullable=False)
+    name = Column(String(50), unique=True, nullable=False)
+    usage_count = Column(Integer, nullable=False, default=0, index=True)  # Kept by triggers on file_tags
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    file = relationship('File', back_populates='tags')
+    files = relationship('File', secondary='file_tags', back_populates='tags')
     
     def __repr__(self):
-        return f"<Tag(id={self.id}, tag='{self.tag}')>"
+        return f"<Tag(id={self.id}, name='{self.name}', usage_count={self.usage_count})>"
+
+
+# Which files carry which tags. The primary key serves lookups by file and
+# (tag_id, file_id) answers lookups by tag without touching the table.
+file_tags = Table(
+    'file_tags', Base.metadata,
+    Column('file_id', Integer, ForeignKey('files.id'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    Index('ix_file_tags_tag_id_file_id', 'tag_id', 'file_id'),
+    sqlite_with_rowid=False
+)
+
+
+# FTS5 index over the catalog, one row per file with rowid = files.id. It is
+# created by the migrations and kept in sync by triggers, except for content,
+# which the content indexer fills in. The table lives outside Base.metadata so
+# create_all() never makes it an ordinary table.
+file_search = Table(
+    'file_search', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('name', Text),
+    Column('path', Text),
+    Column('content', Text),
+    Column('summary', Text),
+    Column('tags', Text)
+)
+
+
+# Trigram index over files.name and files.path (external content, so it reads
+# the text back from files), for substring searches of three characters or more
+file_trigrams = Table(
+    'file_trigrams', file_search.metadata,
+    Column('rowid', Integer, primary_key=True),
+    Column('name', Text),
+    Column('path', Text)
+)
 
 
 class ActivityLog(Base):
@@ -136,10 +178,10 @@ class ActivityLog(Base):
     __tablename__ = 'activity_log'
     
     id = Column(Integer, primary_key=True)
-    file_id = Column(Integer, ForeignKey('files.id'), nullable=False)
+    file_id = Column(Integer, ForeignKey('files.id'), nullable=False, index=True)
     activity_type = Column(String(50), nullable=False)
     description = Column(Text)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     
     file = relationship('File', back_populates='activities')
     
@@ -197,6 +239,121 @@ class Category(Base):
         return f"<Category(name='{self.name}')>"
 
 
+class ScanJob(Base):
+    """Folder scan progress, checkpointed so an interrupted scan can resume"""
+    __tablename__ = 'scan_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    root = Column(String(500), nullable=False)
+    cursor = Column(String(500))  # Last directory whose files are all committed
+    status = Column(String(20), default='running')  # running, completed
+    incremental = Column(Boolean, default=False)
+    processed = Column(Integer, default=0)
+    inserted = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    unchanged = Column(Integer, default=0)
+    removed = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)  # Entries excluded by the scan rules
+    failed = Column(Integer, default=0)  # Files that could not be written to the catalog
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def counts(self):
+        """Get counts in the format returned by FileService.rescan_folder"""
+        return {
+            'inserted': self.inserted or 0,
+            'updated': self.updated or 0,
+            'removed': self.removed or 0,
+            'unchanged': self.unchanged or 0,
+            'skipped': self.skipped or 0,
+            'failed': self.failed or 0
+        }
+    
+    def __repr__(self):
+        return f"<ScanJob(id={self.id}, root='{self.root}', status='{self.status}')>"
+
+
+class CatalogStat(Base):
+    """
+    Running catalog totals, kept current by SQLite triggers (see migrations.py).
+    
+    kind is 'total' (key 'files', 'bytes' or 'tagged'), 'extension',
+    'category' or 'added_day' (key YYYY-MM-DD); value is the count, or the
+    byte total. Missing extensions and categories use the key ''.
+    """
+    __tablename__ = 'catalog_stats'
+    
+    kind = Column(String(20), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<CatalogStat({self.kind}:{self.key}={self.value})>"
+
+
+# SQLite settings applied to every new connection. 'performance' uses WAL with
+# synchronous=NORMAL: a power cut can lose the last few commits but never
+# corrupts the database, and commits no longer wait for an fsync each.
+SQLITE_PROFILES = {
+    'default': {},  # SQLite's built-in settings
+    'performance': {
+        'busy_timeout': 5000,  # ms to wait on a locked database; set first
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,  # negative is KiB, so 64 MiB
+        'mmap_size': 268435456,  # 256 MiB
+        'temp_store': 'MEMORY'
+    }
+}
+
+# Profile used by init_database, overridable with FILESENSE_DB_PROFILE
+SQLITE_PROFILE = os.environ.get('FILESENSE_DB_PROFILE', 'performance')
+
+
+def apply_sqlite_profile(dbapi_connection, pragmas: dict):
+    """Run a profile's PRAGMA statements on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in pragmas.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+
+# Connections kept open for concurrent readers (UI, watcher, scans, AI threads);
+# writers share them but take turns through the write lock (see write_scope)
+READER_POOL_SIZE = 8
+
+
+def create_sqlite_engine(db_path: str, profile: str = None, pool_size: int = READER_POOL_SIZE):
+    """Create an engine whose connections all get the named SQLite profile"""
+    profile = profile or SQLITE_PROFILE
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}' (expected one of {', '.join(SQLITE_PROFILES)})")
+    pragmas = SQLITE_PROFILES[profile]
+    
+    engine = create_engine(
+        f'sqlite:///{db_path}', echo=False,
+        pool_size=pool_size, max_overflow=pool_size,
+        # Pooled connections move between threads; each is used by one session at a time
+        connect_args={'check_same_thread': False}
+    )
+    
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_profile(dbapi_connection, pragmas)
+    
+    return engine
+
+
+def move_database_aside(db_path: str) -> str:
+    """Rename an unreadable database (and its WAL/shared-memory files) out of the way, returning the new path"""
+    backup = f"{db_path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.replace(db_path + suffix, backup + suffix)
+    return backup
+
+
 # Database setup
 def get_database_path():
     """Get the database file path"""
@@ -206,51 +363,271 @@ def get_database_path():
 
 
 def init_database():
-    """Initialize the database and create tables"""
-    import sqlite3
+    """Initialize the database and create tables (once), returning this thread's session"""
+    global _engine, _sessions
+    
+    with _init_lock:
+        if _sessions is None:
+            _engine = _create_catalog_engine(get_database_path())
+            _sessions = scoped_session(sessionmaker(bind=_engine, class_=CatalogSession))
+    return _sessions()
+
+
+# SQLite result codes for a file that isn't a usable database: SQLITE_CORRUPT,
+# SQLITE_NOTADB. Locked, busy and I/O errors leave a good catalog in place.
+UNREADABLE_DATABASE_CODES = (11, 26)
+
+
+def is_unreadable_database(error: DatabaseError) -> bool:
+    """Check if an error means the database file itself is damaged or not a database"""
+    code = getattr(error.orig, 'sqlite_errorcode', None)
+    if code is not None:
+        # Extended codes keep the primary code in the low byte
+        return code & 0xff in UNREADABLE_DATABASE_CODES
+    message = str(error.orig)
+    return 'file is not a database' in message or 'malformed' in message
+
+
+def _create_catalog_engine(db_path: str):
+    """Open the catalog and migrate its schema in place"""
+    from app.models.migrations import migrate
+    
+    engine = create_sqlite_engine(db_path)
+    try:
+        migrate(engine)
+    except DatabaseError as e:
+        engine.dispose()
+        if not is_unreadable_database(e):
+            raise
+        # Not a readable SQLite file; keep it for recovery and start a new catalog
+        backup = move_database_aside(db_path)
+        print(f"Error opening database ({e.orig}), moved it to {backup} and created a new one")
+        engine = create_sqlite_engine(db_path)
+        migrate(engine)
+    return engine
+
+
+# Seconds a writer waits for the catalog write lock before giving up
+WRITE_LOCK_TIMEOUT = 30
+
+# Writes to the catalog go through this lock, so there is one writer at a time
+# and readers never wait behind two writers fighting over SQLite's lock. It is
+# held for exactly one write_scope() or session_scope() block.
+_write_lock = threading.Lock()
+_write_lock_owner = None  # Ident of the thread holding it
+
+# Bumped by every commit that wrote to the catalog, so anything derived from
+# an earlier generation (e.g. cached search results) is known to be stale
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+@contextmanager
+def _holding_write_lock():
+    """Hold the catalog write lock for a block, raising TimeoutError if it stays taken"""
+    global _write_lock_owner
+    if _write_lock_owner == threading.get_ident():
+        # A second session on this thread would wait on SQLite for the first one
+        raise RuntimeError("This thread is already writing to the catalog in another session")
+    if not _write_lock.acquire(timeout=WRITE_LOCK_TIMEOUT):
+        raise TimeoutError(f"Catalog write lock still taken after {WRITE_LOCK_TIMEOUT}s")
+    _write_lock_owner = threading.get_ident()
+    try:
+        yield
+    finally:
+        _write_lock_owner = None
+        _write_lock.release()
+
+
+class CatalogSession(Session):
+    """
+    Session that notes whether its transaction wrote to the catalog, so the
+    commit can start a new catalog generation. Writes belong in a
+    write_scope() or session_scope() block, which serializes them.
+    """
     
-    db_path = get_database_path()
+    _wrote = False
     
-    # Check if database exists and has correct schema
-    if os.path.exists(db_path):
+    def execute(self, statement, *args, **kwargs):
+        # Bulk INSERT/UPDATE/DELETE statements bypass flush
+        if getattr(statement, 'is_dml', False):
+            self._wrote = True
+        return super().execute(statement, *args, **kwargs)
+    
+    def commit(self):
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Check if files table has ai_summary column
-            cursor.execute("PRAGMA table_info(files)")
-            columns = [col[1] for col in cursor.fetchall()]
-            conn.close()
-            
-            # If table exists but missing required columns, delete and recreate
-            required_columns = ['ai_summary', 'category', 'is_favorite']
-            if columns:
-                missing = [col for col in required_columns if col not in columns]
-                if missing:
-                    print(f"Database schema outdated (missing: {missing}), recreating...")
-                    os.remove(db_path)
-        except Exception as e:
-            print(f"Error checking database: {e}")
-            # If any error, try to remove and recreate
+            # Flush first, so whether this commit writes is known before it lands
+            self.flush()
+            if not self._wrote:
+                super().commit()
+                return
+            # Advance before, so nothing cached earlier is served once the write
+            # may be visible, and after, so nothing read while it landed is kept
+            _advance_generation()
             try:
-                os.remove(db_path)
-                print("Removed corrupted database, will recreate.")
-            except:
-                pass
+                super().commit()
+            finally:
+                _advance_generation()
+        finally:
+            self._wrote = False
+    
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self._wrote = False
     
-    engine = create_engine(f'sqlite:///{db_path}', echo=False)
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._wrote = False
+
 
+def _advance_generation():
+    global _generation
+    with _generation_lock:
+        _generation += 1
 
-# Global session
-_db_session = None
+
+@event.listens_for(CatalogSession, 'after_flush')
+def _note_flush(session, flush_context):
+    """Flushes only run when there are changes to write"""
+    session._wrote = True
+
+
+# Engine and per-thread session registry, created by init_database
+_engine = None
+_sessions = None
+_init_lock = threading.Lock()
 
 
 def get_session():
-    """Get database session (singleton)"""
-    global _db_session
-    if _db_session is None:
-        _db_session = init_database()
-    return _db_session
+    """
+    Get the calling thread's database session.
+    
+    Each thread gets its own session, so the UI, file watcher, scans and
+    worker threads never share one. Objects loaded in one thread belong to
+    that thread's session; other threads should look rows up again by id.
+    """
+    if _sessions is None:
+        return init_database()
+    return _sessions()
+
+
+def remove_session():
+    """Close and forget the calling thread's session (call when a worker thread finishes)"""
+    if _sessions is not None:
+        _sessions.remove()
+
+
+@contextmanager
+def read_snapshot():
+    """
+    Run a block of reads on the calling thread's session against one
+    consistent snapshot of the catalog.
+    
+    In WAL mode a read transaction sees the database as of its first query,
+    ignores commits made while it runs and never waits on a writer, so the
+    block's queries agree with each other even while a scan is committing
+    batches. The transaction ends with the block rather than lingering and
+    holding back WAL checkpoints, and objects loaded inside stay usable.
+    Nested blocks share the outer snapshot; a session with uncommitted
+    writes simply reads through them.
+        
+        with read_snapshot():
+            stats = StatsService.get_summary_stats()
+            recent = FileService.get_recent_files()
+    """
+    session = get_session()
+    connection = session.connection().connection.dbapi_connection
+    if connection.in_transaction:
+        yield session
+        return
+    
+    # pysqlite only opens transactions for writes; open a read one by hand.
+    # The snapshot can't be older than the generation noted before it starts.
+    session.info['snapshot_generation'] = _generation
+    connection.execute('BEGIN')
+    try:
+        yield session
+    finally:
+        session.info.pop('snapshot_generation', None)
+        # A block that wrote keeps its transaction for the caller to commit
+        if connection.in_transaction and not session._wrote:
+            connection.rollback()
+
+
+def catalog_generation() -> Optional[int]:
+    """
+    Get the catalog generation the calling thread reads: the one its
+    read_snapshot() block started at, otherwise the latest. Call it before
+    the queries whose results are being labelled, so a commit landing in
+    between makes the label older, never newer.
+    
+    Returns None while the thread's session has uncommitted changes, since
+    what it reads then may yet be rolled back.
+    """
+    session = get_session()
+    if session._wrote or session.new or session.dirty or session.deleted:
+        return None
+    return session.info.get('snapshot_generation', _generation)
+
+
+@contextmanager
+def write_scope():
+    """
+    Run a block of catalog writes on the calling thread's session, holding
+    the write lock until it ends.
+    
+    Commits when the block finishes and rolls back if it raises. The lock
+    is held for the block only, so keep slow work (disk, network) outside
+    it; waiting longer than WRITE_LOCK_TIMEOUT for it raises TimeoutError.
+    A write_scope() inside another on the same thread joins the outer one.
+        
+        file = FileService.get_file_by_id(file_id)
+        with write_scope():
+            file.category = category
+    """
+    session = get_session()
+    if _write_lock_owner == threading.get_ident() and session.info.get('write_scope'):
+        yield session
+        return
+    
+    with _holding_write_lock():
+        session.info['write_scope'] = True
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.info.pop('write_scope', None)
+
+
+@contextmanager
+def session_scope():
+    """
+    Open a new session for one unit of work that writes, holding the write
+    lock. Reads don't need the lock; use read_snapshot() for those.
+    
+    Commits when the block finishes, rolls back if it raises, and always
+    closes the session. Use it from background threads instead of holding a
+    long-lived session:
+        
+        with session_scope() as session:
+            session.get(File, file_id).category = category
+    """
+    if _sessions is None:
+        init_database()
+    with _holding_write_lock():
+        session = _sessions.session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
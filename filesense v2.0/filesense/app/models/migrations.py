@@ -0,0 +1,473 @@
+"""
+Schema migrations for the FileSense catalog
+"""
+import time
+from typing import Callable, List, Tuple
+
+
+def _columns(conn, table: str) -> List[str]:
+    """Get the column names of a table"""
+    return [row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")]
+
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    """Add a column unless the table already has it (ADD COLUMN is O(1) in SQLite)"""
+    if column not in _columns(conn, table):
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# The tables as FileSense 2.0 created them. Later steps change them from here,
+# so this stays frozen instead of following the current models.
+BASELINE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS files (
+        id INTEGER NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        path VARCHAR(500) NOT NULL,
+        extension VARCHAR(10),
+        size INTEGER,
+        date_added DATETIME,
+        last_modified DATETIME,
+        last_accessed DATETIME,
+        summary TEXT,
+        ai_summary TEXT,
+        author VARCHAR(100),
+        category VARCHAR(50),
+        is_favorite BOOLEAN,
+        PRIMARY KEY (id),
+        UNIQUE (path)
+    )""",
+    """CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER NOT NULL,
+        file_id INTEGER NOT NULL,
+        tag VARCHAR(50) NOT NULL,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(file_id) REFERENCES files (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS activity_log (
+        id INTEGER NOT NULL,
+        file_id INTEGER NOT NULL,
+        activity_type VARCHAR(50) NOT NULL,
+        description TEXT,
+        timestamp DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(file_id) REFERENCES files (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS settings (
+        id INTEGER NOT NULL,
+        "key" VARCHAR(50) NOT NULL,
+        value TEXT,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE ("key")
+    )""",
+    """CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        color VARCHAR(7),
+        description TEXT,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )""",
+]
+
+# Scan checkpoints as resumable scans added them, before catalogs were
+# versioned; step 1 has always created this table too
+SCAN_JOBS_TABLE = """CREATE TABLE IF NOT EXISTS scan_jobs (
+        id INTEGER NOT NULL,
+        root VARCHAR(500) NOT NULL,
+        cursor VARCHAR(500),
+        status VARCHAR(20),
+        incremental BOOLEAN,
+        processed INTEGER,
+        inserted INTEGER,
+        updated INTEGER,
+        unchanged INTEGER,
+        removed INTEGER,
+        skipped INTEGER,
+        started_at DATETIME,
+        updated_at DATETIME,
+        PRIMARY KEY (id)
+    )"""
+
+
+def _baseline(conn):
+    """Create missing tables and add columns that unversioned catalogs lack"""
+    for statement in BASELINE_TABLES + [SCAN_JOBS_TABLE]:
+        conn.exec_driver_sql(statement)
+    
+    # Catalogs from before AI summaries and categories
+    _add_column(conn, 'files', 'ai_summary', 'TEXT')
+    _add_column(conn, 'files', 'category', 'VARCHAR(50)')
+    _add_column(conn, 'files', 'is_favorite', 'BOOLEAN DEFAULT 0')
+    # Scan checkpoints from before include/exclude rules
+    _add_column(conn, 'scan_jobs', 'skipped', 'INTEGER DEFAULT 0')
+
+
+def _hot_query_indexes(conn):
+    """Index the columns behind recent files, type/category/tag filters and the activity feed"""
+    # The unique index can't be built over duplicate tags
+    removed = conn.exec_driver_sql(
+        "DELETE FROM tags WHERE id NOT IN (SELECT MIN(id) FROM tags GROUP BY file_id, tag)"
+    ).rowcount
+    if removed:
+        print(f"Removed {removed} duplicate tags")
+    
+    for statement in [
+        "CREATE INDEX IF NOT EXISTS ix_files_last_accessed ON files (last_accessed)",
+        "CREATE INDEX IF NOT EXISTS ix_files_extension ON files (extension)",
+        "CREATE INDEX IF NOT EXISTS ix_files_category ON files (category)",
+        "CREATE INDEX IF NOT EXISTS ix_files_date_added ON files (date_added)",
+        "CREATE INDEX IF NOT EXISTS ix_tags_tag ON tags (tag)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_tags_file_id_tag ON tags (file_id, tag)",
+        "CREATE INDEX IF NOT EXISTS ix_activity_log_timestamp ON activity_log (timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_activity_log_file_id ON activity_log (file_id)",
+    ]:
+        conn.exec_driver_sql(statement)
+
+
+# catalog_stats buckets: kind -> key expression over a files row (NEW or OLD)
+STAT_BUCKETS = {
+    'extension': "COALESCE({row}.extension, '')",
+    'category': "COALESCE({row}.category, '')",
+    'added_day': "COALESCE(date({row}.date_added), '')",
+}
+
+
+def _where(condition: str) -> str:
+    return f" AND {condition}" if condition else ''
+
+
+def _bucket_add(kind: str, key: str, condition: str = None) -> str:
+    """SQL adding one to a bucket, creating it if needed"""
+    # An upsert from INSERT ... SELECT needs a WHERE clause, or SQLite reads ON CONFLICT as a join
+    return (f"INSERT INTO catalog_stats (kind, key, value) SELECT '{kind}', {key}, 1 "
+            f"WHERE {condition or 1}\n        ON CONFLICT (kind, key) DO UPDATE SET value = value + 1;")
+
+
+def _bucket_remove(kind: str, key: str, condition: str = None) -> str:
+    """SQL taking one from a bucket, dropping it once empty so distributions only list what exists"""
+    return (f"UPDATE catalog_stats SET value = value - 1 WHERE kind = '{kind}' AND key = {key}{_where(condition)};\n"
+            f"    DELETE FROM catalog_stats WHERE kind = '{kind}' AND key = {key} AND value <= 0;")
+
+
+def _total(key: str, change: str, condition: str = None) -> str:
+    """SQL applying a change such as '+ 1' to a 'total' row"""
+    return f"UPDATE catalog_stats SET value = value {change} WHERE kind = 'total' AND key = '{key}'{_where(condition)};"
+
+
+def rebuild_catalog_stats(conn, tag_table: str = 'file_tags'):
+    """Recompute every catalog_stats row from the files table and the table linking files to tags"""
+    conn.exec_driver_sql("DELETE FROM catalog_stats")
+    conn.exec_driver_sql(
+        "INSERT INTO catalog_stats (kind, key, value) "
+        "SELECT 'total', 'files', COUNT(*) FROM files "
+        "UNION ALL SELECT 'total', 'bytes', COALESCE(SUM(size), 0) FROM files "
+        f"UNION ALL SELECT 'total', 'tagged', COUNT(DISTINCT file_id) FROM {tag_table} "
+        "WHERE file_id IN (SELECT id FROM files)"
+    )
+    for kind, key in STAT_BUCKETS.items():
+        key = key.format(row='files')
+        conn.exec_driver_sql(
+            f"INSERT INTO catalog_stats (kind, key, value) "
+            f"SELECT '{kind}', {key}, COUNT(*) FROM files GROUP BY {key}"
+        )
+
+
+def _stat_triggers(tag_table: str) -> dict:
+    """catalog_stats triggers, name -> (event, statements), for files tagged through tag_table"""
+    new = {kind: key.format(row='NEW') for kind, key in STAT_BUCKETS.items()}
+    old = {kind: key.format(row='OLD') for kind, key in STAT_BUCKETS.items()}
+    
+    changed = {kind: f"{old[kind]} IS NOT {new[kind]}" for kind in STAT_BUCKETS}
+    first_tag = (f"(SELECT COUNT(*) FROM {tag_table} WHERE file_id = NEW.file_id) = 1 "
+                 f"AND EXISTS (SELECT 1 FROM files WHERE id = NEW.file_id)")
+    last_tag = (f"NOT EXISTS (SELECT 1 FROM {tag_table} WHERE file_id = OLD.file_id) "
+                f"AND EXISTS (SELECT 1 FROM files WHERE id = OLD.file_id)")
+    
+    return {
+        'catalog_stats_file_insert': ('AFTER INSERT ON files', [
+            _total('files', '+ 1'),
+            _total('bytes', '+ COALESCE(NEW.size, 0)'),
+        ] + [_bucket_add(kind, new[kind]) for kind in STAT_BUCKETS]),
+        'catalog_stats_file_delete': ('AFTER DELETE ON files', [
+            _total('files', '- 1'),
+            _total('bytes', '- COALESCE(OLD.size, 0)'),
+            _total('tagged', '- 1', f'EXISTS (SELECT 1 FROM {tag_table} WHERE file_id = OLD.id)'),
+        ] + [_bucket_remove(kind, old[kind]) for kind in STAT_BUCKETS]),
+        'catalog_stats_file_update': ('AFTER UPDATE OF size, extension, category, date_added ON files', [
+            _total('bytes', '+ COALESCE(NEW.size, 0) - COALESCE(OLD.size, 0)', 'NEW.size IS NOT OLD.size'),
+        ] + [_bucket_remove(kind, old[kind], changed[kind]) for kind in STAT_BUCKETS]
+          + [_bucket_add(kind, new[kind], changed[kind]) for kind in STAT_BUCKETS]),
+        # A file counts as tagged from its first tag until its last one goes
+        'catalog_stats_tag_insert': (f'AFTER INSERT ON {tag_table}', [
+            _total('tagged', '+ 1', first_tag),
+        ]),
+        'catalog_stats_tag_delete': (f'AFTER DELETE ON {tag_table}', [
+            _total('tagged', '- 1', last_tag),
+        ]),
+        'catalog_stats_tag_update': (f'AFTER UPDATE OF file_id ON {tag_table} WHEN OLD.file_id IS NOT NEW.file_id', [
+            _total('tagged', '- 1', last_tag),
+            _total('tagged', '+ 1', first_tag),
+        ]),
+    }
+
+
+def _create_triggers(conn, triggers: dict):
+    """(Re)create triggers from name -> (event, statements)"""
+    for name, (event, statements) in triggers.items():
+        body = '\n    '.join(statements)
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        conn.exec_driver_sql(f"CREATE TRIGGER {name} {event} BEGIN\n    {body}\nEND")
+
+
+def _catalog_stats(conn):
+    """Keep file/tag totals and per-extension, per-category and per-day counts in catalog_stats"""
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS catalog_stats ("
+        "kind VARCHAR(20) NOT NULL, key VARCHAR(100) NOT NULL, value INTEGER NOT NULL, "
+        "PRIMARY KEY (kind, key))"
+    )
+    _create_triggers(conn, _stat_triggers('tags'))
+    rebuild_catalog_stats(conn, 'tags')
+
+
+def _tag_vocabulary(conn):
+    """Replace per-file tag rows with a tag vocabulary and a file_tags link table"""
+    # The old table's triggers would follow it through the rename below
+    for name in ('catalog_stats_file_delete', 'catalog_stats_tag_insert',
+                 'catalog_stats_tag_delete', 'catalog_stats_tag_update'):
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    
+    legacy = 'file_id' in _columns(conn, 'tags')
+    if legacy:
+        conn.exec_driver_sql("ALTER TABLE tags RENAME TO tags_v3")
+    
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS tags ("
+        "id INTEGER NOT NULL, name VARCHAR(50) NOT NULL, usage_count INTEGER NOT NULL DEFAULT 0, "
+        "created_at DATETIME, PRIMARY KEY (id), UNIQUE (name))"
+    )
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS file_tags ("
+        "file_id INTEGER NOT NULL, tag_id INTEGER NOT NULL, created_at DATETIME, "
+        "PRIMARY KEY (file_id, tag_id), "
+        "FOREIGN KEY(file_id) REFERENCES files (id), FOREIGN KEY(tag_id) REFERENCES tags (id)"
+        ") WITHOUT ROWID"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_file_tags_tag_id_file_id ON file_tags (tag_id, file_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_tags_usage_count ON tags (usage_count)")
+    
+    if legacy:
+        # Tags of files that no longer exist are dropped on the way
+        conn.exec_driver_sql(
+            "INSERT INTO tags (name, created_at) SELECT tag, MIN(created_at) FROM tags_v3 "
+            "WHERE file_id IN (SELECT id FROM files) GROUP BY tag"
+        )
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO file_tags (file_id, tag_id, created_at) "
+            "SELECT old.file_id, tags.id, old.created_at FROM tags_v3 AS old JOIN tags ON tags.name = old.tag "
+            "WHERE old.file_id IN (SELECT id FROM files)"
+        )
+        conn.exec_driver_sql("DROP TABLE tags_v3")
+    
+    conn.exec_driver_sql("UPDATE tags SET usage_count = (SELECT COUNT(*) FROM file_tags WHERE tag_id = tags.id)")
+    
+    triggers = _stat_triggers('file_tags')
+    # Deleting a file takes its links along; after the tagged check, so the
+    # tag triggers see the file already gone and don't count it twice
+    triggers['catalog_stats_file_delete'][1].append("DELETE FROM file_tags WHERE file_id = OLD.id;")
+    triggers.update({
+        'tags_usage_insert': ('AFTER INSERT ON file_tags', [
+            "UPDATE tags SET usage_count = usage_count + 1 WHERE id = NEW.tag_id;",
+        ]),
+        'tags_usage_delete': ('AFTER DELETE ON file_tags', [
+            "UPDATE tags SET usage_count = usage_count - 1 WHERE id = OLD.tag_id;",
+        ]),
+        'tags_usage_update': ('AFTER UPDATE OF tag_id ON file_tags WHEN OLD.tag_id IS NOT NEW.tag_id', [
+            "UPDATE tags SET usage_count = usage_count - 1 WHERE id = OLD.tag_id;",
+            "UPDATE tags SET usage_count = usage_count + 1 WHERE id = NEW.tag_id;",
+        ]),
+    })
+    _create_triggers(conn, triggers)
+    rebuild_catalog_stats(conn)
+
+
+def _file_name_index(conn):
+    """Index file names so the file list can page through them in order"""
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_files_name ON files (name)")
+
+
+def _search_tags(file_id: str) -> str:
+    """SQL for a file's tag names as one space-separated string"""
+    return (f"(SELECT group_concat(tags.name, ' ') FROM file_tags JOIN tags ON tags.id = file_tags.tag_id "
+            f"WHERE file_tags.file_id = {file_id})")
+
+
+def _search_summary(row: str) -> str:
+    """SQL for a file's summaries as one string"""
+    return f"trim(coalesce({row}.summary, '') || ' ' || coalesce({row}.ai_summary, ''))"
+
+
+def _full_text_search(conn):
+    """Index names, paths, summaries, tags and extracted content in an FTS5 table"""
+    # Set when a file's content is in file_search; NULL queues it for the content indexer
+    _add_column(conn, 'files', 'content_indexed_at', 'DATETIME')
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_files_content_pending ON files (id) WHERE content_indexed_at IS NULL"
+    )
+    
+    # rowid is the file id; remove_diacritics lets 'resume' find 'résumé'
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS file_search USING fts5("
+        "name, path, content, summary, tags, "
+        "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    )
+    # ORDER BY rank weighs a match in the name highest, then tags, summaries, path and content
+    conn.exec_driver_sql(
+        "INSERT INTO file_search (file_search, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0, 3.0, 5.0)')"
+    )
+    conn.exec_driver_sql("DELETE FROM file_search")
+    conn.exec_driver_sql(
+        "INSERT INTO file_search (rowid, name, path, content, summary, tags) "
+        f"SELECT id, name, path, '', {_search_summary('files')}, coalesce({_search_tags('files.id')}, '') FROM files"
+    )
+    conn.exec_driver_sql("UPDATE files SET content_indexed_at = NULL")
+    
+    _create_triggers(conn, {
+        'file_search_insert': ('AFTER INSERT ON files', [
+            "INSERT INTO file_search (rowid, name, path, content, summary, tags) "
+            f"VALUES (NEW.id, NEW.name, NEW.path, '', {_search_summary('NEW')}, '');",
+        ]),
+        'file_search_update': ('AFTER UPDATE OF name, path, summary, ai_summary ON files', [
+            f"UPDATE file_search SET name = NEW.name, path = NEW.path, summary = {_search_summary('NEW')} "
+            "WHERE rowid = NEW.id;",
+        ]),
+        'file_search_delete': ('AFTER DELETE ON files', [
+            "DELETE FROM file_search WHERE rowid = OLD.id;",
+        ]),
+        # A changed file goes back in the content indexer's queue
+        'file_search_content_stale': (
+            'AFTER UPDATE OF size, last_modified ON files '
+            'WHEN NEW.size IS NOT OLD.size OR NEW.last_modified IS NOT OLD.last_modified', [
+                "UPDATE files SET content_indexed_at = NULL WHERE id = NEW.id;",
+            ]),
+        'file_search_tag_insert': ('AFTER INSERT ON file_tags', [
+            f"UPDATE file_search SET tags = coalesce({_search_tags('NEW.file_id')}, '') WHERE rowid = NEW.file_id;",
+        ]),
+        'file_search_tag_delete': ('AFTER DELETE ON file_tags', [
+            f"UPDATE file_search SET tags = coalesce({_search_tags('OLD.file_id')}, '') WHERE rowid = OLD.file_id;",
+        ]),
+        'file_search_tag_rename': ('AFTER UPDATE OF name ON tags', [
+            f"UPDATE file_search SET tags = coalesce({_search_tags('file_search.rowid')}, '') "
+            "WHERE rowid IN (SELECT file_id FROM file_tags WHERE tag_id = NEW.id);",
+        ]),
+    })
+
+
+def _trigram_index(conn):
+    """Index name and path trigrams so substring searches don't scan the files table"""
+    # External content: the index reads name and path back from files instead of copying them
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS file_trigrams USING fts5("
+        "name, path, content='files', content_rowid='id', tokenize='trigram')"
+    )
+    conn.exec_driver_sql("INSERT INTO file_trigrams (file_trigrams) VALUES ('rebuild')")
+    # A match in the name ranks above one only in the folders
+    conn.exec_driver_sql("INSERT INTO file_trigrams (file_trigrams, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    
+    # An external content index can only remove a row given the values it indexed
+    remove_old = ("INSERT INTO file_trigrams (file_trigrams, rowid, name, path) "
+                  "VALUES ('delete', OLD.id, OLD.name, OLD.path);")
+    add_new = "INSERT INTO file_trigrams (rowid, name, path) VALUES (NEW.id, NEW.name, NEW.path);"
+    _create_triggers(conn, {
+        'file_trigrams_insert': ('AFTER INSERT ON files', [add_new]),
+        'file_trigrams_update': ('AFTER UPDATE OF name, path ON files', [remove_old, add_new]),
+        'file_trigrams_delete': ('AFTER DELETE ON files', [remove_old]),
+    })
+
+
+def _scan_job_failures(conn):
+    """Count the files a scan could not write to the catalog"""
+    _add_column(conn, 'scan_jobs', 'failed', 'INTEGER DEFAULT 0')
+
+
+def _search_tag_moves(conn):
+    """Keep file_search tags current when a link moves to another tag or file, as merging tags does"""
+    _create_triggers(conn, {
+        'file_search_tag_update': ('AFTER UPDATE ON file_tags', [
+            f"UPDATE file_search SET tags = coalesce({_search_tags('OLD.file_id')}, '') WHERE rowid = OLD.file_id;",
+            f"UPDATE file_search SET tags = coalesce({_search_tags('NEW.file_id')}, '') "
+            "WHERE rowid = NEW.file_id AND NEW.file_id IS NOT OLD.file_id;",
+        ]),
+    })
+    # Tags merged before the trigger existed left their old names behind
+    conn.exec_driver_sql(f"UPDATE file_search SET tags = coalesce({_search_tags('file_search.rowid')}, '')")
+
+
+# (version, description, step). Append new steps; never edit or reorder old ones.
+# Steps must be idempotent. A brand new catalog runs them all, starting from
+# the 2.0 tables _baseline creates, so every catalog takes the same path.
+# Steps spell out their DDL rather than reading the models, which move on.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'baseline schema', _baseline),
+    (2, 'indexes for hot queries', _hot_query_indexes),
+    (3, 'trigger-maintained catalog statistics', _catalog_stats),
+    (4, 'tag vocabulary with file_tags links', _tag_vocabulary),
+    (5, 'file name index for paging', _file_name_index),
+    (6, 'full-text search index', _full_text_search),
+    (7, 'trigram index for substring search', _trigram_index),
+    (8, 'failed file counts on scan jobs', _scan_job_failures),
+    (9, 'search tags follow moved tag links', _search_tag_moves),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class MigrationError(Exception):
+    """Raised when a migration step fails; the catalog stays at its previous version"""
+
+
+def get_schema_version(conn) -> int:
+    """Read the catalog's schema version (0 for new or unversioned catalogs)"""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine) -> int:
+    """
+    Bring the catalog schema up to SCHEMA_VERSION in place.
+    
+    The version lives in PRAGMA user_version, so an up-to-date catalog costs
+    one integer read. Each pending step runs in its own transaction together
+    with its version bump, so a failed step leaves the catalog untouched at
+    the last good version. Returns the resulting version.
+    """
+    # AUTOCOMMIT hands transaction control to the explicit BEGIN/COMMIT below,
+    # which also makes the DDL transactional
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        version = get_schema_version(conn)
+        if version == SCHEMA_VERSION:
+            return version
+        if version > SCHEMA_VERSION:
+            print(f"Catalog schema v{version} is newer than this version of FileSense (v{SCHEMA_VERSION})")
+            return version
+        
+        for step_version, description, step in MIGRATIONS:
+            if step_version <= version:
+                continue
+            
+            start = time.perf_counter()
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                step(conn)
+                conn.exec_driver_sql(f"PRAGMA user_version = {step_version}")
+                conn.exec_driver_sql("COMMIT")
+            except Exception as e:
+                conn.exec_driver_sql("ROLLBACK")
+                raise MigrationError(f"Migration to v{step_version} ({description}) failed: {e}") from e
+            
+            version = step_version
+            print(f"Migrated catalog to v{version}: {description} ({time.perf_counter() - start:.2f}s)")
+    
+    return version
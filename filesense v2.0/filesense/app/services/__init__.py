@@ -5,6 +5,10 @@ from app.services.ollama_service import OllamaService
 from app.services.file_service import FileService
 from app.services.stats_service import StatsService
 from app.services.file_watcher import FileWatcher, SmartFolderMonitor, WatchedFolder
+from app.services.activity_logger import ActivityLogger, RetentionPolicy, get_activity_logger, log_activity
+from app.services.search_cache import SearchCache, get_search_cache
+from app.services.search_index import SearchIndex, SearchWorker, ContentIndexer, get_content_indexer
+from app.services.scan_manager import ScanManager, ScanTask, ScanCancelled, get_scan_manager
 
 __all__ = [
     'OllamaService',
@@ -12,5 +16,19 @@ __all__ = [
     'StatsService',
     'FileWatcher',
     'SmartFolderMonitor',
-    'WatchedFolder'
+    'WatchedFolder',
+    'ActivityLogger',
+    'RetentionPolicy',
+    'get_activity_logger',
+    'log_activity',
+    'ScanManager',
+    'ScanTask',
+    'ScanCancelled',
+    'get_scan_manager',
+    'SearchIndex',
+    'SearchWorker',
+    'ContentIndexer',
+    'get_content_indexer',
+    'SearchCache',
+    'get_search_cache'
 ]
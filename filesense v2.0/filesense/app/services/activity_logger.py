@@ -0,0 +1,246 @@
+"""
+Activity Logger - Buffered activity log writes, retention and compaction
+"""
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import insert, delete, select, func
+from app.models import File, ActivityLog, Settings, session_scope, read_snapshot
+
+
+class RetentionPolicy:
+    """How much activity history to keep; 0 disables a limit"""
+    
+    DEFAULT_MAX_AGE_DAYS = 365
+    DEFAULT_MAX_PER_FILE = 50
+    
+    # Settings table keys
+    MAX_AGE_KEY = 'activity_max_age_days'
+    MAX_PER_FILE_KEY = 'activity_max_per_file'
+    
+    def __init__(self, max_age_days: int = DEFAULT_MAX_AGE_DAYS, max_per_file: int = DEFAULT_MAX_PER_FILE):
+        self.max_age_days = max(0, max_age_days)
+        self.max_per_file = max(0, max_per_file)
+    
+    @classmethod
+    def load(cls) -> 'RetentionPolicy':
+        """Read the policy from the settings table, falling back to the defaults"""
+        with read_snapshot() as session:
+            values = dict(session.query(Settings.key, Settings.value).filter(
+                Settings.key.in_((cls.MAX_AGE_KEY, cls.MAX_PER_FILE_KEY))
+            ).all())
+        
+        def number(key, default):
+            try:
+                return int(values.get(key, default))
+            except (TypeError, ValueError):
+                return default
+        
+        return cls(number(cls.MAX_AGE_KEY, cls.DEFAULT_MAX_AGE_DAYS),
+                   number(cls.MAX_PER_FILE_KEY, cls.DEFAULT_MAX_PER_FILE))
+    
+    def __repr__(self):
+        return f"<RetentionPolicy(max_age_days={self.max_age_days}, max_per_file={self.max_per_file})>"
+
+
+class ActivityLogger:
+    """
+    Collect activity log entries in memory and write them in batches.
+    
+    log() only appends to a buffer; a background thread inserts the buffer
+    in one transaction every flush_interval seconds, or as soon as it holds
+    batch_size entries. Entries still buffered when the process dies are
+    lost, which is acceptable for a history log; the buffer is flushed at
+    exit and by flush(). Readers that must show the latest entries merge
+    pending() with the table rather than flushing.
+    
+    compact() applies the RetentionPolicy, deleting in chunks of
+    chunk_size rows, each in its own short transaction, so other writers
+    are never held up for long.
+    """
+    
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0,
+                 chunk_size: int = 500, chunk_pause: float = 0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause
+        
+        self._buffer: List[dict] = []
+        self._writing: List[dict] = []  # Taken from the buffer by the flush in progress
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time, so entries stay in order
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._compactor: Optional[threading.Thread] = None
+    
+    def log(self, file_id: int, activity_type: str, description: str = None):
+        """Record an activity; it is written with the next batch"""
+        entry = {
+            'file_id': file_id,
+            'activity_type': activity_type,
+            'description': description,
+            'timestamp': datetime.utcnow()
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+    
+    def pending(self) -> List[dict]:
+        """Entries not in the table yet: the buffer, and any batch being written now"""
+        with self._lock:
+            return self._writing + self._buffer
+    
+    def flush(self) -> int:
+        """Write all buffered entries now, returning how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+                self._writing = entries
+            if not entries:
+                return 0
+            
+            try:
+                with session_scope() as session:
+                    session.execute(insert(ActivityLog), entries)
+                return len(entries)
+            except Exception as e:
+                print(f"Error writing {len(entries)} activity log entries: {e}")
+                # Put them back for the next attempt
+                with self._lock:
+                    self._buffer[:0] = entries
+                return 0
+            finally:
+                with self._lock:
+                    self._writing = []
+    
+    def compact(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+        """Delete activity history outside the retention policy, in chunks"""
+        policy = policy or RetentionPolicy.load()
+        removed = {'expired': 0, 'over_limit': 0, 'orphaned': 0}
+        
+        if policy.max_age_days:
+            cutoff = datetime.utcnow() - timedelta(days=policy.max_age_days)
+            removed['expired'] = self._delete_chunks(
+                select(ActivityLog.id).where(ActivityLog.timestamp < cutoff)
+            )
+        
+        if policy.max_per_file:
+            removed['over_limit'] = self._trim_per_file(policy.max_per_file)
+        
+        # Rows for files deleted while their entries sat in the buffer
+        removed['orphaned'] = self._delete_chunks(
+            select(ActivityLog.id).outerjoin(File, File.id == ActivityLog.file_id).where(File.id.is_(None))
+        )
+        
+        total = sum(removed.values())
+        if total:
+            print(f"Compacted activity log: removed {total} entries {removed}")
+        return removed
+    
+    def start_compactor(self, interval: float = 6 * 3600, delay: float = 60):
+        """Run compact() on a background thread after delay seconds, then every interval"""
+        if self._compactor and self._compactor.is_alive():
+            return
+        
+        def run():
+            if self._stop.wait(delay):
+                return
+            while True:
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Error compacting activity log: {e}")
+                if self._stop.wait(interval):
+                    return
+        
+        self._compactor = threading.Thread(target=run, daemon=True, name='activity-compactor')
+        self._compactor.start()
+    
+    def close(self):
+        """Stop the background threads and write what is left in the buffer"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self.flush()
+    
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._flush_loop, daemon=True, name='activity-logger')
+                    self._thread.start()
+    
+    def _flush_loop(self):
+        """Background writer body"""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def _delete_chunks(self, ids) -> int:
+        """Delete the rows an id query selects, one short transaction per chunk"""
+        removed = 0
+        while not self._stop.is_set():
+            with session_scope() as session:
+                count = session.execute(
+                    delete(ActivityLog).where(ActivityLog.id.in_(ids.limit(self.chunk_size)))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+            removed += count
+            if count < self.chunk_size:
+                break
+            # Let queued writers in between chunks
+            time.sleep(self.chunk_pause)
+        return removed
+    
+    def _trim_per_file(self, keep: int) -> int:
+        """Delete all but the newest keep entries of each file"""
+        with read_snapshot() as session:
+            file_ids = [row[0] for row in session.query(ActivityLog.file_id).group_by(
+                ActivityLog.file_id
+            ).having(func.count(ActivityLog.id) > keep)]
+        
+        removed = 0
+        for i in range(0, len(file_ids), 50):
+            if self._stop.is_set():
+                break
+            with session_scope() as session:
+                for file_id in file_ids[i:i + 50]:
+                    newest = select(ActivityLog.id).where(ActivityLog.file_id == file_id).order_by(
+                        ActivityLog.timestamp.desc(), ActivityLog.id.desc()
+                    ).limit(keep)
+                    removed += session.execute(
+                        delete(ActivityLog).where(ActivityLog.file_id == file_id, ActivityLog.id.not_in(newest))
+                        .execution_options(synchronize_session=False)
+                    ).rowcount
+            time.sleep(self.chunk_pause)
+        return removed
+
+
+# Global logger
+_activity_logger = None
+_activity_logger_lock = threading.Lock()
+
+
+def get_activity_logger() -> ActivityLogger:
+    """Get the shared activity logger (singleton), flushed at exit"""
+    global _activity_logger
+    with _activity_logger_lock:
+        if _activity_logger is None:
+            _activity_logger = ActivityLogger()
+            atexit.register(_activity_logger.close)
+    return _activity_logger
+
+
+def log_activity(file_id: int, activity_type: str, description: str = None):
+    """Record an activity through the shared logger"""
+    get_activity_logger().log(file_id, activity_type, description)
@@ -3,11 +3,20 @@ File Service for file operations and management
 """
 import os
 import shutil
+import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Callable, Dict
-from sqlalchemy import func
-from app.models import File, Tag, ActivityLog, get_session
+from typing import List, Optional, Callable, Dict, Tuple, Iterator
+from sqlalchemy import func, update, delete, select, exists, or_, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+from app.models import File, Tag, file_tags, ActivityLog, ScanJob, CatalogStat, get_session, write_scope
+from app.services.activity_logger import log_activity
+from app.services.search_index import SearchIndex
+from app.utils.directory_walker import DirectoryWalker
+from app.utils.path_rules import PathRules
+
+logger = logging.getLogger(__name__)
 
 
 class FileService:
@@ -24,73 +33,321 @@ class FileService:
         '.zip', '.rar', '.7z', '.tar', '.gz'
     }
     
+    # Directories listed concurrently during a folder scan (helps on network drives)
+    SCAN_WORKERS = 4
+    
+    # Number of new files inserted per transaction during a folder scan
+    SCAN_BATCH_SIZE = 500
+    
+    # Orders get_files_page() supports; each column is indexed, and ties break on id
+    PAGE_SORTS = {
+        'id': File.id,
+        'name': File.name,
+        'date_added': File.date_added,
+        'last_accessed': File.last_accessed
+    }
+    
+    # Files per page when streaming with iter_files()
+    PAGE_SIZE = 500
+    
     @staticmethod
-    def scan_folder(folder_path: str, progress_callback: Optional[Callable] = None) -> List[File]:
-        """Scan a folder and add files to database"""
+    def scan_folder(folder_path: str, progress_callback: Optional[Callable] = None,
+                    batch_size: Optional[int] = None, rules: Optional[PathRules] = None,
+                    control: Optional[Callable] = None) -> List[File]:
+        """
+        Scan a folder and add new files to database.
+        Known paths are loaded once up front and new files are inserted
+        together with their activity rows in batched transactions.
+        progress_callback(processed, total, filename) is called once per batch.
+        rules defaults to PathRules.for_root(folder_path).
+        control() is called before each file; it may block to pause the scan
+        or raise to stop it, leaving the last committed batch as its checkpoint.
+        """
+        added_files, _ = FileService._scan(folder_path, progress_callback, batch_size,
+                                           incremental=False, rules=rules, control=control)
+        return added_files
+    
+    @staticmethod
+    def rescan_folder(folder_path: str, progress_callback: Optional[Callable] = None,
+                      batch_size: Optional[int] = None, rules: Optional[PathRules] = None,
+                      control: Optional[Callable] = None) -> Dict[str, int]:
+        """
+        Incrementally rescan a previously imported folder.
+        Files whose size and modification time match the database are skipped,
+        changed files have their metadata updated and rows for files that no
+        longer exist on disk are removed.
+        Returns counts: {'inserted', 'updated', 'removed', 'unchanged', 'skipped', 'failed'},
+        where skipped is the number of entries excluded by the rules and failed
+        the number of files that could not be written to the database.
+        """
+        _, counts = FileService._scan(folder_path, progress_callback, batch_size,
+                                      incremental=True, rules=rules, control=control)
+        return counts
+    
+    @staticmethod
+    def _scan(folder_path: str, progress_callback: Optional[Callable], batch_size: Optional[int],
+              incremental: bool, rules: Optional[PathRules] = None,
+              control: Optional[Callable] = None) -> Tuple[List[File], Dict[str, int]]:
+        """
+        Walk a folder and sync it with the database in batched transactions.
+        Progress is checkpointed in a ScanJob with each batch, so scanning a
+        folder whose last scan was interrupted resumes after the last
+        committed directory.
+        """
         session = get_session()
         added_files = []
+        counts = {'inserted': 0, 'updated': 0, 'removed': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+        batch_size = batch_size or FileService.SCAN_BATCH_SIZE
         
-        if not os.path.exists(folder_path):
-            return added_files
+        if not os.path.isdir(folder_path):
+            return added_files, counts
         
         folder = Path(folder_path)
-        
-        # Get all files recursively
-        try:
-            all_files = list(folder.rglob('*'))
-        except PermissionError:
-            print(f"Permission denied: {folder_path}")
-            return added_files
-        
-        total_files = len([f for f in all_files if f.is_file()])
-        processed = 0
-        
-        for file_path in all_files:
-            if file_path.is_file() and file_path.suffix.lower() in FileService.SUPPORTED_EXTENSIONS:
+        job = FileService._get_scan_job(session, str(folder), incremental)
+        counts = job.counts
+        processed = resumed_from = job.processed or 0
+        
+        walker = DirectoryWalker(
+            str(folder),
+            extensions=FileService.SUPPORTED_EXTENSIONS,
+            rules=rules if rules is not None else PathRules.for_root(str(folder)),
+            workers=FileService.SCAN_WORKERS,
+            stat=True,
+            ordered=True,
+            resume_after=job.cursor
+        )
+        
+        # Prefetch known rows under this folder instead of querying once per file
+        known = {
+            path: (file_id, size, last_modified)
+            for file_id, path, size, last_modified in session.query(
+                File.id, File.path, File.size, File.last_modified
+            ).filter(File.path.startswith(str(folder) + os.sep, autoescape=True))
+        }
+        seen_ids = set()
+        pending = []
+        updates = []
+        
+        # The walk is ordered, so once it moves on, a directory is finished.
+        # Checkpoints record the last finished directory and the counters
+        # as they were when it finished, since a resume re-walks the rest.
+        current_dir = None
+        checkpoint = (job.cursor, processed, counts['unchanged'])
+        
+        for entry in walker.walk():
+            if control:
+                control()
+            entry_dir = os.path.dirname(entry.path)
+            if entry_dir != current_dir:
+                if current_dir is not None:
+                    checkpoint = (current_dir, processed, counts['unchanged'])
+                current_dir = entry_dir
+            processed += 1
+            
+            row = known.get(entry.path)
+            
+            if row is None:
                 try:
-                    processed += 1
-                    
-                    if progress_callback:
-                        progress_callback(processed, total_files, file_path.name)
-                    
-                    # Check if already exists
-                    existing = session.query(File).filter_by(path=str(file_path)).first()
-                    if existing:
-                        continue
-                    
-                    stat = file_path.stat()
-                    
-                    new_file = File(
-                        name=file_path.name,
-                        path=str(file_path),
-                        extension=file_path.suffix,
-                        size=stat.st_size,
-                        date_added=datetime.utcnow(),
-                        last_modified=datetime.fromtimestamp(stat.st_mtime),
-                        last_accessed=datetime.fromtimestamp(stat.st_atime)
-                    )
-                    
-                    session.add(new_file)
-                    session.commit()
-                    
-                    # Log activity
-                    activity = ActivityLog(
-                        file_id=new_file.id,
-                        activity_type='Added',
-                        description=f'File added to database from {folder_path}'
-                    )
-                    session.add(activity)
-                    session.commit()
-                    
-                    added_files.append(new_file)
-                    
-                except PermissionError:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                
+                pending.append(File(
+                    name=entry.name,
+                    path=entry.path,
+                    extension=os.path.splitext(entry.name)[1],
+                    size=stat.st_size,
+                    date_added=datetime.utcnow(),
+                    last_modified=datetime.fromtimestamp(stat.st_mtime),
+                    last_accessed=datetime.fromtimestamp(stat.st_atime)
+                ))
+            elif incremental:
+                file_id, size, last_modified = row
+                seen_ids.add(file_id)
+                try:
+                    stat = entry.stat()
+                except OSError:
                     continue
-                except Exception as e:
-                    print(f"Error adding {file_path}: {e}")
-                    session.rollback()
+                
+                mtime = datetime.fromtimestamp(stat.st_mtime)
+                if stat.st_size == size and mtime == last_modified:
+                    counts['unchanged'] += 1
+                else:
+                    updates.append({'id': file_id, 'size': stat.st_size, 'last_modified': mtime})
+            
+            if processed % batch_size == 0:
+                added_files.extend(FileService._commit_scan_batch(
+                    session, job, pending, updates, folder_path, counts, checkpoint
+                ))
+                pending = []
+                updates = []
+                if progress_callback:
+                    progress_callback(processed, resumed_from + walker.estimated_total, entry.name)
+        
+        added_files.extend(FileService._commit_scan_batch(
+            session, job, pending, updates, folder_path, counts,
+            (current_dir or checkpoint[0], processed, counts['unchanged'])
+        ))
+        
+        if incremental:
+            # Confirm against the disk so rows under unreadable or excluded
+            # directories are not mistaken for deleted files
+            vanished = [
+                file_id for path, (file_id, _, _) in known.items()
+                if file_id not in seen_ids and not os.path.lexists(path)
+            ]
+            counts['removed'] = FileService._remove_file_rows(session, vanished, batch_size)
+        
+        counts['skipped'] += walker.skipped
+        if walker.skipped:
+            logger.info("Skipped %d excluded entries in %s", walker.skipped, folder_path)
+        if counts['failed']:
+            logger.warning("%d files in %s could not be written to the database", counts['failed'], folder_path)
+        
+        with write_scope():
+            job.removed = counts['removed']
+            job.skipped = counts['skipped']
+            job.status = 'completed'
+        
+        if progress_callback:
+            progress_callback(processed, processed, 'Complete')
+        
+        return added_files, counts
+    
+    @staticmethod
+    def get_scan_counts(folder_path: str, incremental: bool = False) -> Dict[str, int]:
+        """Get the counts of the last completed scan (or rescan) of a folder, as rescan_folder returns them"""
+        job = get_session().query(ScanJob).filter_by(
+            root=str(Path(folder_path)),
+            incremental=incremental,
+            status='completed'
+        ).order_by(ScanJob.id.desc()).first()
+        return job.counts if job else {}
+    
+    @staticmethod
+    def _get_scan_job(session, root: str, incremental: bool) -> ScanJob:
+        """Get the interrupted scan job for a folder, or start a new one"""
+        job = session.query(ScanJob).filter_by(
+            root=root,
+            incremental=incremental,
+            status='running'
+        ).order_by(ScanJob.id.desc()).first()
+        
+        if job:
+            logger.info("Resuming scan of %s after %s", root, job.cursor or 'start')
+            return job
+        
+        job = ScanJob(root=root, incremental=incremental, status='running')
+        with write_scope():
+            session.add(job)
+        return job
+    
+    @staticmethod
+    def _commit_scan_batch(session, job: ScanJob, files: List[File], updates: List[dict], folder_path: str,
+                           counts: Dict[str, int], checkpoint: Tuple[Optional[str], int, int]) -> List[File]:
+        """
+        Insert new files with their 'Added' activity rows, apply metadata updates
+        and checkpoint the scan job in one transaction.
+        If the batch fails it is written again one file at a time, so only the
+        files at fault are left out; those are logged and counted as failed.
+        """
+        try:
+            with write_scope():
+                FileService._write_scan_rows(session, files, updates, folder_path)
+                FileService._checkpoint_scan_job(job, counts, checkpoint, len(files), len(updates))
+        except Exception as e:
+            logger.warning("Writing %d files from %s failed (%s); retrying them one at a time",
+                           len(files) + len(updates), folder_path, e)
+            files, updates = FileService._retry_scan_rows(session, files, updates, folder_path, counts)
+            with write_scope():
+                FileService._checkpoint_scan_job(job, counts, checkpoint, len(files), len(updates))
+        
+        counts['inserted'] += len(files)
+        counts['updated'] += len(updates)
+        return files
+    
+    @staticmethod
+    def _write_scan_rows(session, files: List[File], updates: List[dict], folder_path: str):
+        """Add new files with their 'Added' activity rows and apply metadata updates (inside a write scope)"""
+        if files:
+            session.add_all(files)
+            # Flush to get the new file ids for the activity rows
+            session.flush()
+            
+            session.add_all([
+                ActivityLog(
+                    file_id=new_file.id,
+                    activity_type='Added',
+                    description=f'File added to database from {folder_path}'
+                )
+                for new_file in files
+            ])
         
-        return added_files
+        if updates:
+            # Bulk UPDATE by primary key
+            session.execute(update(File), updates)
+    
+    @staticmethod
+    def _retry_scan_rows(session, files: List[File], updates: List[dict], folder_path: str,
+                         counts: Dict[str, int]) -> Tuple[List[File], List[dict]]:
+        """Write a failed batch one row per transaction, returning the files and updates that went in"""
+        added, applied = [], []
+        
+        for failed in files:
+            # The rolled back objects may keep ids from the failed flush; start over from their values
+            new_file = File(**{column: getattr(failed, column) for column in (
+                'name', 'path', 'extension', 'size', 'date_added', 'last_modified', 'last_accessed'
+            )})
+            try:
+                with write_scope():
+                    FileService._write_scan_rows(session, [new_file], [], folder_path)
+                added.append(new_file)
+            except Exception as e:
+                logger.error("Could not add %r to the database: %s", failed.path, e)
+                counts['failed'] += 1
+        
+        for row in updates:
+            try:
+                with write_scope():
+                    FileService._write_scan_rows(session, [], [row], folder_path)
+                applied.append(row)
+            except Exception as e:
+                logger.error("Could not update file %d in the database: %s", row['id'], e)
+                counts['failed'] += 1
+        
+        return added, applied
+    
+    @staticmethod
+    def _checkpoint_scan_job(job: ScanJob, counts: Dict[str, int], checkpoint: Tuple[Optional[str], int, int],
+                             inserted: int, updated: int):
+        """Record a scan's progress up to the end of a batch (inside a write scope)"""
+        job.cursor, job.processed, job.unchanged = checkpoint
+        job.inserted = counts['inserted'] + inserted
+        job.updated = counts['updated'] + updated
+        job.failed = counts['failed']
+    
+    @staticmethod
+    def _remove_file_rows(session, file_ids: List[int], batch_size: int) -> int:
+        """Delete file rows with their tags and activities in batched transactions"""
+        removed = 0
+        
+        for i in range(0, len(file_ids), batch_size):
+            chunk = file_ids[i:i + batch_size]
+            try:
+                with write_scope():
+                    # Bulk deletes skip ORM cascades, so remove child rows explicitly
+                    session.execute(delete(file_tags).where(file_tags.c.file_id.in_(chunk)))
+                    session.query(ActivityLog).filter(ActivityLog.file_id.in_(chunk)).delete(synchronize_session=False)
+                    session.query(File).filter(File.id.in_(chunk)).delete(synchronize_session=False)
+                removed += len(chunk)
+            except Exception as e:
+                logger.error("Could not remove %d missing files from the database: %s", len(chunk), e)
+        
+        if removed:
+            # Drop any stale objects for the deleted rows from this thread's session
+            session.expire_all()
+        
+        return removed
     
     @staticmethod
     def add_file(file_path: str) -> Optional[File]:
@@ -120,23 +377,16 @@ class FileService:
                 last_accessed=datetime.fromtimestamp(stat.st_atime)
             )
             
-            session.add(new_file)
-            session.commit()
+            with write_scope():
+                session.add(new_file)
             
             # Log activity
-            activity = ActivityLog(
-                file_id=new_file.id,
-                activity_type='Added',
-                description='File added to database'
-            )
-            session.add(activity)
-            session.commit()
+            log_activity(new_file.id, 'Added', 'File added to database')
             
             return new_file
-            
+        
         except Exception as e:
             print(f"Error adding file: {e}")
-            session.rollback()
             return None
     
     @staticmethod
@@ -145,6 +395,111 @@ class FileService:
         session = get_session()
         return session.query(File).all()
     
+    @staticmethod
+    def _filter_files(query, extension: Optional[str] = None, category: Optional[str] = None,
+                      name: Optional[str] = None):
+        """Apply the page filters; an empty extension or category matches files without one"""
+        if extension is not None:
+            query = query.filter(File.extension == extension if extension else
+                                 or_(File.extension.is_(None), File.extension == ''))
+        if category is not None:
+            query = query.filter(File.category == category if category else
+                                 or_(File.category.is_(None), File.category == ''))
+        if name:
+            query = query.filter(SearchIndex.name_contains(name))
+        return query
+    
+    @staticmethod
+    def get_files_page(limit: int = 200, after: Optional[tuple] = None, sort: str = 'id',
+                       descending: bool = False, extension: Optional[str] = None,
+                       category: Optional[str] = None, name: Optional[str] = None,
+                       with_tags: bool = False) -> Tuple[List[File], Optional[tuple]]:
+        """
+        Get one page of files in sort order, starting after a cursor.
+        Pages seek the sort column's index to the cursor, the (sort value, id)
+        of the previous page's last file, so a page deep into the catalog
+        costs the same as the first. Returns the files and the cursor for the
+        next page, or None after the last page. with_tags loads the tags of
+        the whole page in one query.
+        """
+        session = get_session()
+        column = FileService.PAGE_SORTS[sort]
+        query = FileService._filter_files(session.query(File), extension, category, name)
+        if with_tags:
+            query = query.options(selectinload(File.tags))
+        
+        # SQLite sorts NULLs first, and a row value comparison never matches
+        # them, so nullable columns page through NULL and non-NULL rows separately
+        if not column.nullable:
+            phases = [None]
+        else:
+            phases = [False, True] if descending else [True, False]
+            if after is not None:
+                phases = phases[phases.index(after[0] is None):]
+        
+        files = []
+        for null_phase in phases:
+            page = query
+            if null_phase is not None:
+                page = page.filter(column.is_(None) if null_phase else column.isnot(None))
+            
+            if after is not None and (null_phase is None or null_phase == (after[0] is None)):
+                value, last_id = after
+                if null_phase or column is File.id:
+                    page = page.filter(File.id < last_id if descending else File.id > last_id)
+                elif descending:
+                    page = page.filter(tuple_(column, File.id) < tuple_(value, last_id))
+                else:
+                    page = page.filter(tuple_(column, File.id) > tuple_(value, last_id))
+            
+            order = [column.desc(), File.id.desc()] if descending else [column, File.id]
+            if column is File.id:
+                order = order[:1]
+            files.extend(page.order_by(*order).limit(limit - len(files)).all())
+            if len(files) >= limit:
+                break
+        
+        if len(files) < limit:
+            return files, None
+        last = files[-1]
+        return files, (getattr(last, column.key), last.id)
+    
+    @staticmethod
+    def iter_files(page_size: Optional[int] = None, **filters) -> Iterator[File]:
+        """
+        Stream files page by page, taking the same sort and filter arguments
+        as get_files_page(). Only one page is held at a time; files the caller
+        doesn't keep are freed as it moves on.
+        """
+        after = None
+        while True:
+            files, after = FileService.get_files_page(page_size or FileService.PAGE_SIZE, after, **filters)
+            yield from files
+            if after is None:
+                return
+    
+    @staticmethod
+    def estimate_file_count(extension: Optional[str] = None, category: Optional[str] = None) -> int:
+        """
+        Count the files matching page filters from catalog_stats instead of
+        the files table: exact for one filter, an upper bound for both.
+        """
+        session = get_session()
+        keys = [('extension', extension), ('category', category)]
+        keys = [(kind, key) for kind, key in keys if key is not None] or [('total', 'files')]
+        
+        counts = []
+        for kind, key in keys:
+            value = session.query(CatalogStat.value).filter_by(kind=kind, key=key).scalar()
+            counts.append(value or 0)
+        return min(counts)
+    
+    @staticmethod
+    def get_extension_counts() -> Dict[str, int]:
+        """Get file counts per stored extension ('' for files without one)"""
+        session = get_session()
+        return dict(session.query(CatalogStat.key, CatalogStat.value).filter_by(kind='extension').all())
+    
     @staticmethod
     def get_file_by_id(file_id: int) -> Optional[File]:
         """Get file by ID"""
@@ -152,23 +507,9 @@ class FileService:
         return session.query(File).get(file_id)
     
     @staticmethod
-    def search_files(query: str) -> List[File]:
-        """Search files by name or tags"""
-        session = get_session()
-        
-        # Search by name
-        files = session.query(File).filter(
-            File.name.like(f'%{query}%')
-        ).all()
-        
-        # Also search by tags
-        tagged_files = session.query(File).join(Tag).filter(
-            Tag.tag.like(f'%{query}%')
-        ).all()
-        
-        # Combine and deduplicate
-        all_files = list(set(files + tagged_files))
-        return all_files
+    def search_files(query: str, limit: int = 200) -> List[File]:
+        """Search names, paths, content, summaries and tags, best matches first"""
+        return [file for file, _ in SearchIndex.search(query, limit)]
     
     @staticmethod
     def get_recent_files(limit: int = 20) -> List[File]:
@@ -182,47 +523,23 @@ class FileService:
     def get_files_by_tag(tag: str) -> List[File]:
         """Get files with specific tag"""
         session = get_session()
-        return session.query(File).join(Tag).filter(
-            Tag.tag == tag
+        return session.query(File).join(File.tags).filter(
+            Tag.name == tag
         ).all()
     
+    @staticmethod
+    def _tag_ids(session, names: List[str]) -> Dict[str, int]:
+        """Get the vocabulary ids of tag names, adding names not seen before"""
+        session.execute(
+            sqlite_insert(Tag).on_conflict_do_nothing(index_elements=['name']),
+            [{'name': name} for name in names]
+        )
+        return dict(session.query(Tag.name, Tag.id).filter(Tag.name.in_(names)).all())
+    
     @staticmethod
     def add_tags_to_file(file_id: int, tags: List[str]) -> bool:
         """Add tags to a file"""
-        session = get_session()
-        file = session.query(File).get(file_id)
-        
-        if not file:
-            return False
-        
-        try:
-            for tag_name in tags:
-                # Check if tag already exists
-                existing_tag = session.query(Tag).filter_by(
-                    file_id=file_id,
-                    tag=tag_name
-                ).first()
-                
-                if not existing_tag:
-                    tag = Tag(file_id=file_id, tag=tag_name)
-                    session.add(tag)
-            
-            session.commit()
-            
-            # Log activity
-            activity = ActivityLog(
-                file_id=file_id,
-                activity_type='Tagged',
-                description=f'Added tags: {", ".join(tags)}'
-            )
-            session.add(activity)
-            session.commit()
-            
-            return True
-        except Exception as e:
-            print(f"Error adding tags: {e}")
-            session.rollback()
-            return False
+        return FileService.batch_add_tags([file_id], tags) == 1
     
     @staticmethod
     def remove_tag_from_file(file_id: int, tag_name: str) -> bool:
@@ -230,31 +547,52 @@ class FileService:
         session = get_session()
         
         try:
-            tag = session.query(Tag).filter_by(
-                file_id=file_id,
-                tag=tag_name
-            ).first()
+            tag_id = select(Tag.id).where(Tag.name == tag_name).scalar_subquery()
+            with write_scope():
+                removed = session.execute(
+                    delete(file_tags).where(file_tags.c.file_id == file_id, file_tags.c.tag_id == tag_id)
+                ).rowcount
             
-            if tag:
-                session.delete(tag)
-                session.commit()
-                
+            if removed:
                 # Log activity
-                activity = ActivityLog(
-                    file_id=file_id,
-                    activity_type='Untagged',
-                    description=f'Removed tag: {tag_name}'
-                )
-                session.add(activity)
-                session.commit()
+                log_activity(file_id, 'Untagged', f'Removed tag: {tag_name}')
                 
                 return True
         except Exception as e:
             print(f"Error removing tag: {e}")
-            session.rollback()
         
         return False
     
+    @staticmethod
+    def rename_tag(old_name: str, new_name: str) -> bool:
+        """Rename a tag on every file carrying it; renaming onto an existing tag merges the two"""
+        session = get_session()
+        tag = session.query(Tag).filter(Tag.name == old_name).first()
+        
+        if not tag or not new_name or new_name == old_name:
+            return False
+        
+        try:
+            with write_scope():
+                target = session.query(Tag).filter(Tag.name == new_name).first()
+                if target is None:
+                    # One vocabulary row, however many files use it
+                    tag.name = new_name
+                else:
+                    # Move the links over, except on files that already carry the new name
+                    session.execute(
+                        update(file_tags).where(
+                            file_tags.c.tag_id == tag.id,
+                            file_tags.c.file_id.not_in(select(file_tags.c.file_id).where(file_tags.c.tag_id == target.id))
+                        ).values(tag_id=target.id)
+                    )
+                    session.execute(delete(file_tags).where(file_tags.c.tag_id == tag.id))
+                    session.execute(delete(Tag).where(Tag.id == tag.id))
+            return True
+        except Exception as e:
+            print(f"Error renaming tag: {e}")
+            return False
+    
     @staticmethod
     def update_summary(file_id: int, summary: str, ai_summary: bool = False) -> bool:
         """Update file summary"""
@@ -265,26 +603,18 @@ class FileService:
             return False
         
         try:
-            if ai_summary:
-                file.ai_summary = summary
-            else:
-                file.summary = summary
-            
-            session.commit()
+            with write_scope():
+                if ai_summary:
+                    file.ai_summary = summary
+                else:
+                    file.summary = summary
             
             # Log activity
-            activity = ActivityLog(
-                file_id=file_id,
-                activity_type='Updated',
-                description='Summary updated'
-            )
-            session.add(activity)
-            session.commit()
+            log_activity(file_id, 'Updated', 'Summary updated')
             
             return True
         except Exception as e:
             print(f"Error updating summary: {e}")
-            session.rollback()
             return False
     
     @staticmethod
@@ -304,23 +634,16 @@ class FileService:
             shutil.move(file.path, new_path)
             
             # Update database
-            file.path = new_path
-            file.name = os.path.basename(new_path)
-            session.commit()
+            with write_scope():
+                file.path = new_path
+                file.name = os.path.basename(new_path)
             
             # Log activity
-            activity = ActivityLog(
-                file_id=file_id,
-                activity_type='Moved',
-                description=f'File moved to {new_path}'
-            )
-            session.add(activity)
-            session.commit()
+            log_activity(file_id, 'Moved', f'File moved to {new_path}')
             
             return True
         except Exception as e:
             print(f"Error moving file: {e}")
-            session.rollback()
             return False
     
     @staticmethod
@@ -336,13 +659,12 @@ class FileService:
             if delete_from_disk and os.path.exists(file.path):
                 os.remove(file.path)
             
-            session.delete(file)
-            session.commit()
+            with write_scope():
+                session.delete(file)
             
             return True
         except Exception as e:
             print(f"Error deleting file: {e}")
-            session.rollback()
             return False
     
     @staticmethod
@@ -366,7 +688,7 @@ class FileService:
             func.sum(File.size)
         ).scalar() or 0
         
-        tagged_files = session.query(File).join(Tag).distinct().count()
+        tagged_files = session.query(func.count(func.distinct(file_tags.c.file_id))).scalar()
         
         return {
             'total_files': total_files,
@@ -377,15 +699,33 @@ class FileService:
     
     @staticmethod
     def batch_add_tags(file_ids: List[int], tags: List[str]) -> int:
-        """Add tags to multiple files"""
+        """Add tags to multiple files in one transaction"""
         session = get_session()
-        success_count = 0
+        names = list(dict.fromkeys(tags))
+        file_ids = [row[0] for row in session.query(File.id).filter(File.id.in_(file_ids)).all()]
+        
+        if not file_ids or not names:
+            return len(file_ids)
+        
+        try:
+            with write_scope():
+                tag_ids = FileService._tag_ids(session, names)
+                now = datetime.utcnow()
+                # Links a file already has are skipped, so usage counts stay exact
+                session.execute(
+                    sqlite_insert(file_tags).on_conflict_do_nothing(),
+                    [{'file_id': file_id, 'tag_id': tag_ids[name], 'created_at': now}
+                     for file_id in file_ids for name in names]
+                )
+        except Exception as e:
+            print(f"Error adding tags: {e}")
+            return 0
         
+        # Log activity
         for file_id in file_ids:
-            if FileService.add_tags_to_file(file_id, tags):
-                success_count += 1
+            log_activity(file_id, 'Tagged', f'Added tags: {", ".join(tags)}')
         
-        return success_count
+        return len(file_ids)
     
     @staticmethod
     def batch_move_files(file_ids: List[int], destination: str) -> int:
@@ -432,29 +772,22 @@ class FileService:
             return False
         
         try:
-            file.category = category
-            session.commit()
+            with write_scope():
+                file.category = category
             
             # Log activity
-            activity = ActivityLog(
-                file_id=file_id,
-                activity_type='Categorized',
-                description=f'Category set to: {category}'
-            )
-            session.add(activity)
-            session.commit()
+            log_activity(file_id, 'Categorized', f'Category set to: {category}')
             
             return True
         except Exception as e:
             print(f"Error updating category: {e}")
-            session.rollback()
             return False
     
     @staticmethod
     def get_all_tags() -> List[str]:
-        """Get all unique tags"""
+        """Get all tags in use"""
         session = get_session()
-        tags = session.query(Tag.tag).distinct().all()
+        tags = session.query(Tag.name).filter(Tag.usage_count > 0).order_by(Tag.name).all()
         return [t[0] for t in tags]
     
     @staticmethod
@@ -462,9 +795,9 @@ class FileService:
         """Get tag usage counts"""
         session = get_session()
         result = session.query(
-            Tag.tag,
-            func.count(Tag.id)
-        ).group_by(Tag.tag).all()
+            Tag.name,
+            Tag.usage_count
+        ).filter(Tag.usage_count > 0).all()
         
         return {tag: count for tag, count in result}
     
@@ -472,8 +805,8 @@ class FileService:
     def get_files_without_tags() -> List[File]:
         """Get files that have no tags"""
         session = get_session()
-        return session.query(File).outerjoin(Tag).filter(
-            Tag.id == None
+        return session.query(File).filter(
+            ~exists().where(file_tags.c.file_id == File.id)
         ).all()
     
     @staticmethod
@@ -498,13 +831,11 @@ class FileService:
             path = Path(file.path)
             stat = path.stat()
             
-            file.size = stat.st_size
-            file.last_modified = datetime.fromtimestamp(stat.st_mtime)
-            file.last_accessed = datetime.fromtimestamp(stat.st_atime)
-            
-            session.commit()
+            with write_scope():
+                file.size = stat.st_size
+                file.last_modified = datetime.fromtimestamp(stat.st_mtime)
+                file.last_accessed = datetime.fromtimestamp(stat.st_atime)
             return True
         except Exception as e:
             print(f"Error refreshing metadata: {e}")
-            session.rollback()
             return False
@@ -7,6 +7,9 @@ import threading
 from pathlib import Path
 from typing import Callable, Optional, List, Set
 from datetime import datetime
+from app.models import remove_session
+from app.utils.directory_walker import DirectoryWalker
+from app.utils.path_rules import PathRules
 
 
 class FileWatcher:
@@ -17,6 +20,7 @@ class FileWatcher:
         self.running = False
         self.thread: Optional[threading.Thread] = None
         self.poll_interval = 2.0  # seconds
+        self.scan_workers = 4  # directories listed concurrently per poll
         
         # Callbacks
         self.on_file_created: Optional[Callable[[str], None]] = None
@@ -25,16 +29,23 @@ class FileWatcher:
         
         # Track file states
         self._file_states: dict = {}
+        
+        # Exclude rules per watched folder, and entries they skipped on the last poll
+        self._rules: dict = {}
+        self.skipped: dict = {}
     
-    def add_folder(self, folder_path: str):
-        """Add folder to watch list"""
+    def add_folder(self, folder_path: str, rules: Optional[PathRules] = None):
+        """Add folder to watch list (rules defaults to PathRules.for_root)"""
         if os.path.isdir(folder_path):
             self.watched_folders.add(folder_path)
+            self._rules[folder_path] = rules if rules is not None else PathRules.for_root(folder_path)
             self._scan_folder(folder_path)
     
     def remove_folder(self, folder_path: str):
         """Remove folder from watch list"""
         self.watched_folders.discard(folder_path)
+        self._rules.pop(folder_path, None)
+        self.skipped.pop(folder_path, None)
     
     def start(self):
         """Start watching folders"""
@@ -55,29 +66,35 @@ class FileWatcher:
     def _scan_folder(self, folder_path: str):
         """Initial scan to build file state"""
         try:
-            for root, _, files in os.walk(folder_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    try:
-                        stat = os.stat(file_path)
-                        self._file_states[file_path] = {
-                            'mtime': stat.st_mtime,
-                            'size': stat.st_size
-                        }
-                    except (OSError, IOError):
-                        pass
+            for entry in self._walk(folder_path):
+                stat = entry.stat()
+                self._file_states[entry.path] = {
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size
+                }
         except Exception as e:
             print(f"Error scanning folder {folder_path}: {e}")
     
+    def _walk(self, folder_path: str):
+        """Yield file entries with their stat already cached, pruning excluded directories"""
+        walker = DirectoryWalker(folder_path, workers=self.scan_workers, stat=True,
+                                 rules=self._rules.get(folder_path))
+        yield from walker.walk()
+        self.skipped[folder_path] = walker.skipped
+    
     def _watch_loop(self):
         """Main watching loop"""
-        while self.running:
-            try:
-                self._check_for_changes()
-            except Exception as e:
-                print(f"Error in watch loop: {e}")
-            
-            time.sleep(self.poll_interval)
+        try:
+            while self.running:
+                try:
+                    self._check_for_changes()
+                except Exception as e:
+                    print(f"Error in watch loop: {e}")
+                
+                time.sleep(self.poll_interval)
+        finally:
+            # Callbacks that import files used this thread's session
+            remove_session()
     
     def _check_for_changes(self):
         """Check for file changes"""
@@ -89,30 +106,26 @@ class FileWatcher:
                 continue
             
             try:
-                for root, _, files in os.walk(folder):
-                    for filename in files:
-                        file_path = os.path.join(root, filename)
-                        current_files.add(file_path)
-                        
-                        try:
-                            stat = os.stat(file_path)
-                            current_state = {
-                                'mtime': stat.st_mtime,
-                                'size': stat.st_size
-                            }
-                            
-                            if file_path not in self._file_states:
-                                # New file
-                                self._file_states[file_path] = current_state
-                                if self.on_file_created:
-                                    self.on_file_created(file_path)
-                            elif self._file_states[file_path] != current_state:
-                                # Modified file
-                                self._file_states[file_path] = current_state
-                                if self.on_file_modified:
-                                    self.on_file_modified(file_path)
-                        except (OSError, IOError):
-                            pass
+                for entry in self._walk(folder):
+                    file_path = entry.path
+                    current_files.add(file_path)
+                    
+                    stat = entry.stat()
+                    current_state = {
+                        'mtime': stat.st_mtime,
+                        'size': stat.st_size
+                    }
+                    
+                    if file_path not in self._file_states:
+                        # New file
+                        self._file_states[file_path] = current_state
+                        if self.on_file_created:
+                            self.on_file_created(file_path)
+                    elif self._file_states[file_path] != current_state:
+                        # Modified file
+                        self._file_states[file_path] = current_state
+                        if self.on_file_modified:
+                            self.on_file_modified(file_path)
             except Exception as e:
                 print(f"Error scanning folder {folder}: {e}")
         
@@ -141,9 +154,9 @@ class SmartFolderMonitor:
         # Event callbacks for UI
         self.on_event: Optional[Callable[[str, str, str], None]] = None
     
-    def add_smart_folder(self, folder_path: str):
+    def add_smart_folder(self, folder_path: str, rules: Optional[PathRules] = None):
         """Add smart folder to monitor"""
-        self.watcher.add_folder(folder_path)
+        self.watcher.add_folder(folder_path, rules)
     
     def remove_smart_folder(self, folder_path: str):
         """Remove smart folder from monitoring"""
@@ -186,11 +199,13 @@ class WatchedFolder:
     
     def __init__(self, path: str, recursive: bool = True, 
                  extensions: Optional[List[str]] = None,
-                 auto_tag: bool = False):
+                 auto_tag: bool = False,
+                 exclude_patterns: Optional[List[str]] = None):
         self.path = path
         self.recursive = recursive
         self.extensions = extensions or []
         self.auto_tag = auto_tag
+        self.exclude_patterns = exclude_patterns or []
         self.enabled = True
         self.last_scan = None
     
@@ -206,6 +221,15 @@ class WatchedFolder:
         
         return True
     
+    @property
+    def rules(self) -> PathRules:
+        """Scan rules for this folder: its exclude patterns, with extensions as includes"""
+        return PathRules.for_root(
+            self.path,
+            excludes=self.exclude_patterns,
+            includes=[f'*{ext}' for ext in self.extensions]
+        )
+    
     def to_dict(self) -> dict:
         """Convert to dictionary for storage"""
         return {
@@ -213,6 +237,7 @@ class WatchedFolder:
             'recursive': self.recursive,
             'extensions': self.extensions,
             'auto_tag': self.auto_tag,
+            'exclude_patterns': self.exclude_patterns,
             'enabled': self.enabled
         }
     
@@ -223,7 +248,8 @@ class WatchedFolder:
             path=data['path'],
             recursive=data.get('recursive', True),
             extensions=data.get('extensions', []),
-            auto_tag=data.get('auto_tag', False)
+            auto_tag=data.get('auto_tag', False),
+            exclude_patterns=data.get('exclude_patterns', [])
         )
         folder.enabled = data.get('enabled', True)
         return folder
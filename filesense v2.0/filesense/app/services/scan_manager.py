@@ -0,0 +1,302 @@
+"""
+Scan Manager - Prioritized, cancellable background folder scans
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.models import remove_session
+from app.services.file_service import FileService
+from app.services.search_index import get_content_indexer
+
+
+class ScanCancelled(Exception):
+    """Raised inside a running scan to stop it"""
+
+
+class ScanTask:
+    """A queued, running or finished folder scan and its progress"""
+    
+    # Lower runs first
+    INTERACTIVE = 0
+    BACKGROUND = 10
+    
+    def __init__(self, task_id: int, folder: str, incremental: bool, priority: int,
+                 on_progress: Optional[Callable[['ScanTask'], None]] = None,
+                 on_done: Optional[Callable[['ScanTask'], None]] = None):
+        self.id = task_id
+        self.folder = folder
+        self.incremental = incremental
+        self.priority = priority
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        # queued, running, paused, cancelled, completed, failed
+        self.status = 'queued'
+        self.processed = 0
+        self.total = 0
+        self.current_file = ''
+        self.result = None  # List[File] for a scan, counts dict for a rescan
+        self.counts = None  # Counts for either, as FileService.rescan_folder returns them
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        
+        # The scan thread checks these between files: a requested pause parks
+        # it on _resume, and only then is its slot handed to another task
+        self._resume = threading.Event()
+        self._resume.set()
+        self._pause_requested = False
+        self._cancel = False
+        self._preempted = False  # Paused by the scheduler rather than the user
+    
+    @property
+    def is_finished(self) -> bool:
+        """Check if the task has stopped for good"""
+        return self.status in ('cancelled', 'completed', 'failed')
+    
+    @property
+    def percent(self) -> int:
+        """Progress as a percentage of the estimated total"""
+        return int(self.processed * 100 / self.total) if self.total else 0
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for display"""
+        return {
+            'id': self.id,
+            'folder': self.folder,
+            'incremental': self.incremental,
+            'priority': 'interactive' if self.priority <= self.INTERACTIVE else 'background',
+            'status': self.status,
+            'processed': self.processed,
+            'total': self.total,
+            'percent': self.percent,
+            'current_file': self.current_file,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f"<ScanTask(id={self.id}, folder='{self.folder}', status='{self.status}')>"
+
+
+class ScanManager:
+    """
+    Run folder scans on background threads, at most max_concurrent at a time.
+    
+    Queued tasks start in priority order. When every slot is taken and an
+    interactive task is waiting, a running background task is paused between
+    files to make room and resumes once a slot frees up. Cancelling stops a
+    scan at the next file; its last committed batch stays checkpointed, so
+    scanning the folder again continues from there.
+    
+    Each scan thread works in its own database session, so concurrent scans
+    and the UI don't share one. on_progress and on_done callbacks run on the
+    scan thread, so UI code should hand them to its main loop (e.g.
+    widget.after), and rows the scan changed should be reloaded there.
+    """
+    
+    def __init__(self, max_concurrent: int = 1):
+        self.max_concurrent = max(1, max_concurrent)
+        self._tasks: Dict[int, ScanTask] = {}
+        self._queue: List[tuple] = []  # (priority, task id) heap
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def submit(self, folder: str, incremental: bool = False, interactive: bool = False,
+               on_progress: Optional[Callable[[ScanTask], None]] = None,
+               on_done: Optional[Callable[[ScanTask], None]] = None) -> int:
+        """Queue a scan (or an incremental rescan) of a folder and return its task id"""
+        with self._lock:
+            task = ScanTask(
+                next(self._ids), folder, incremental,
+                ScanTask.INTERACTIVE if interactive else ScanTask.BACKGROUND,
+                on_progress, on_done
+            )
+            self._tasks[task.id] = task
+            heapq.heappush(self._queue, (task.priority, task.id))
+            self._schedule()
+        return task.id
+    
+    def cancel(self, task_id: int) -> bool:
+        """Cancel a queued, running or paused task"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.is_finished:
+                return False
+            
+            if task.status == 'queued':
+                # Left in the heap; _schedule drops finished tasks when it pops them
+                task.status = 'cancelled'
+                task.finished_at = datetime.now()
+                notify = True
+            else:
+                task._cancel = True
+                task._pause_requested = False
+                task._resume.set()
+                notify = False
+        
+        if notify and task.on_done:
+            task.on_done(task)
+        return True
+    
+    def pause(self, task_id: int) -> bool:
+        """Pause a running task at its next file, freeing its slot"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.status != 'running' or task._pause_requested:
+                return False
+            task._pause_requested = True
+        return True
+    
+    def resume(self, task_id: int) -> bool:
+        """Resume a task paused with pause()"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task._preempted:
+                return False
+            if task._pause_requested:
+                # Not parked yet, so just withdraw the request
+                task._pause_requested = False
+                return True
+            if task.status != 'paused':
+                return False
+            # Runs again as soon as a slot is free
+            task.status = 'queued'
+            heapq.heappush(self._queue, (task.priority, task.id))
+            self._schedule()
+        return True
+    
+    def set_max_concurrent(self, max_concurrent: int):
+        """Change how many scans may run at once"""
+        with self._lock:
+            self.max_concurrent = max(1, max_concurrent)
+            self._schedule()
+    
+    def get_task(self, task_id: int) -> Optional[ScanTask]:
+        """Get a task by id"""
+        return self._tasks.get(task_id)
+    
+    def get_tasks(self, include_finished: bool = True) -> List[ScanTask]:
+        """Get tasks, newest first"""
+        tasks = sorted(self._tasks.values(), key=lambda t: t.id, reverse=True)
+        if not include_finished:
+            tasks = [t for t in tasks if not t.is_finished]
+        return tasks
+    
+    def clear_finished(self):
+        """Forget finished tasks"""
+        with self._lock:
+            self._tasks = {tid: t for tid, t in self._tasks.items() if not t.is_finished}
+    
+    def _schedule(self):
+        """Start or resume tasks while there are free slots (caller holds the lock)"""
+        while True:
+            # Tasks asked to pause keep their slot until they park
+            running = [t for t in self._tasks.values() if t.status == 'running']
+            preempted = [t for t in self._tasks.values() if t._preempted and t.status == 'paused']
+            
+            # Drop cancelled entries from the top of the queue
+            while self._queue and getattr(self._tasks.get(self._queue[0][1]), 'status', None) != 'queued':
+                heapq.heappop(self._queue)
+            
+            # Best waiting task: queued, or paused earlier to make room
+            candidates = [self._tasks[self._queue[0][1]]] if self._queue else []
+            candidates.extend(preempted)
+            if not candidates:
+                return
+            task = min(candidates, key=lambda t: (t.priority, t.id))
+            
+            if len(running) >= self.max_concurrent:
+                if any(t._pause_requested for t in running):
+                    # A slot is about to free up
+                    return
+                # Pre-empt the lowest priority, most recently started scan if it ranks below;
+                # it calls back into _schedule once parked
+                victim = max(running, key=lambda t: (t.priority, t.started_at))
+                if victim.priority <= task.priority:
+                    return
+                victim._pause_requested = True
+                victim._preempted = True
+                return
+            
+            if task._preempted:
+                task._preempted = False
+                task.status = 'running'
+                task._resume.set()
+            else:
+                heapq.heappop(self._queue)
+                task.status = 'running'
+                if task.started_at is None:
+                    task.started_at = datetime.now()
+                    threading.Thread(target=self._run, args=(task,), daemon=True,
+                                     name=f'scan-{task.id}').start()
+                else:
+                    # Resumed after a user pause; the thread is still waiting
+                    task._resume.set()
+    
+    def _run(self, task: ScanTask):
+        """Scan thread body"""
+        def progress(processed, total, filename):
+            task.processed = processed
+            task.total = total
+            task.current_file = filename
+            if task.on_progress:
+                task.on_progress(task)
+        
+        def control():
+            if task._pause_requested:
+                with self._lock:
+                    if task._pause_requested:
+                        task._pause_requested = False
+                        task.status = 'paused'
+                        task._resume.clear()
+                        self._schedule()
+                if task.on_progress:
+                    task.on_progress(task)
+                task._resume.wait()
+            if task._cancel:
+                raise ScanCancelled()
+        
+        try:
+            if task.incremental:
+                task.result = task.counts = FileService.rescan_folder(task.folder, progress, control=control)
+            else:
+                task.result = FileService.scan_folder(task.folder, progress, control=control)
+                task.counts = FileService.get_scan_counts(task.folder)
+            status = 'completed'
+            # New and changed files are waiting for their content to be indexed
+            get_content_indexer().wake()
+        except ScanCancelled:
+            status = 'cancelled'
+        except Exception as e:
+            print(f"Error scanning {task.folder}: {e}")
+            task.error = str(e)
+            status = 'failed'
+        finally:
+            remove_session()
+        
+        with self._lock:
+            task.status = status
+            task._preempted = False
+            task.finished_at = datetime.now()
+            self._schedule()
+        
+        if task.on_done:
+            task.on_done(task)
+
+
+# Global manager
+_scan_manager = None
+
+
+def get_scan_manager() -> ScanManager:
+    """Get the shared scan manager (singleton)"""
+    global _scan_manager
+    if _scan_manager is None:
+        _scan_manager = ScanManager()
+    return _scan_manager
@@ -0,0 +1,138 @@
+"""
+Search Cache - Recently computed search results, dropped whenever the catalog changes
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from app.models import catalog_generation
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of search results.
+    
+    Keys are a normalized query plus its filters. Every entry is stamped
+    with the catalog generation it was computed from (see
+    database.catalog_generation), and a commit that writes to the catalog
+    starts a new generation, so a hit is always what the query would return
+    now. The whole cache is emptied the first time a newer generation is
+    seen. Least recently used entries are evicted beyond max_entries or
+    max_bytes; sizes are estimates.
+    
+    Cache ids and text rather than ORM objects, which belong to the session
+    that loaded them.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._generation = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(query: str, **filters) -> tuple:
+        """Cache key for a query and its filters; case and surrounding spaces don't matter"""
+        return (query.strip().lower(), tuple(sorted(filters.items())))
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, or compute(), caching its result"""
+        generation = catalog_generation()
+        if generation is not None:
+            with self._lock:
+                self._advance(generation)
+                if generation == self._generation and key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                self.misses += 1
+        
+        value = compute()
+        
+        if generation is not None:
+            self._store(key, value, generation)
+        return value
+    
+    def clear(self):
+        """Forget every entry"""
+        with self._lock:
+            self._drop_all()
+    
+    def stats(self) -> dict:
+        """Hit, miss, eviction and size counters for tuning the limits"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'generation': self._generation,
+            }
+    
+    def _store(self, key: Hashable, value: Any, generation: int):
+        """Cache a value computed at generation, unless the catalog has moved on since"""
+        size = _estimate_size(key) + _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._advance(generation)
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+    
+    def _advance(self, generation: int):
+        """Empty the cache when a newer catalog generation shows up (call with the lock held)"""
+        if self._generation is None or generation > self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._drop_all()
+            self._generation = generation
+    
+    def _drop_all(self):
+        """Forget every entry (call with the lock held)"""
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate bytes held by a value made of containers, strings and numbers"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item) for item in value)
+    return size
+
+
+# Global cache
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get the shared search result cache (singleton)"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+    return _search_cache
@@ -0,0 +1,450 @@
+"""
+Search Index - Full-text search over the catalog and the content indexer that feeds it
+"""
+import atexit
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import select, update, text
+from sqlalchemy.exc import OperationalError
+from app.models import (File, file_search, file_trigrams, get_session, remove_session, session_scope,
+                        read_snapshot, catalog_generation)
+from app.services.search_cache import SearchCache, get_search_cache
+from app.utils.content_reader import ContentReader
+
+
+class SearchIndex:
+    """
+    Query the catalog's FTS5 tables: file_search for words (see
+    migrations._full_text_search) and file_trigrams for substrings of names
+    and paths (see migrations._trigram_index)
+    """
+    
+    # Marks around matched terms in snippets
+    HIGHLIGHT = ('[', ']')
+    SNIPPET_TOKENS = 12
+    
+    # bm25() has to score every match before the best can be picked, 2-4 µs
+    # each; queries matching more files than this list the newest instead
+    RANK_LIMIT = 5000
+    
+    # The trigram tokenizer can't match anything shorter
+    MIN_SUBSTRING = 3
+    
+    # Substrings in more names than this are common enough that scanning
+    # finds a page of them sooner than collecting every match from the index
+    SUBSTRING_SCAN_LIMIT = 5000
+    
+    @staticmethod
+    def build_query(query: str) -> Optional[str]:
+        """
+        Turn free text into an FTS5 query in which every word must match as a
+        prefix of some term, so 'quart rep' finds 'Quarterly Report.docx'.
+        Returns None when the text has no words to search for.
+        """
+        words = re.findall(r'\w+', query.lower())
+        if not words:
+            return None
+        # Quoting keeps FTS5 operators and column filters in the text literal
+        return ' '.join(f'"{word}"*' for word in words)
+    
+    @staticmethod
+    def substring_query(query: str) -> Optional[str]:
+        """
+        Turn text into a file_trigrams query matching it anywhere, ignoring
+        case, so 'voice_20' finds 'invoice_2023.pdf'. Returns None when the
+        text is too short for trigrams.
+        """
+        query = query.strip()
+        if len(query) < SearchIndex.MIN_SUBSTRING:
+            return None
+        return '"' + query.replace('"', '""') + '"'
+    
+    @staticmethod
+    def name_contains(query: str):
+        """Filter clause for files whose name contains query, ignoring case"""
+        match = SearchIndex.substring_query(query)
+        if match is None or SearchIndex._count(
+                get_session(), 'file_trigrams', f'name : {match}', SearchIndex.SUBSTRING_SCAN_LIMIT
+        ) > SearchIndex.SUBSTRING_SCAN_LIMIT:
+            # SQLite's LIKE ignores ASCII case too
+            return File.name.like(f'%{query}%')
+        return File.id.in_(select(file_trigrams.c.rowid).where(file_trigrams.c.name.match(match)))
+    
+    @staticmethod
+    def search(query: str, limit: int = 100) -> List[Tuple[File, str]]:
+        """
+        Get the best matching files, best first, each with a highlighted
+        snippet: files matching every word, then files whose name or path
+        contains the text as typed. Queries matching more than RANK_LIMIT
+        files get the newest matches instead.
+        
+        Matches come from the search cache while the catalog is unchanged.
+        """
+        return SearchIndex.load_files(SearchIndex.search_hits(query, limit))
+    
+    @staticmethod
+    def search_hits(query: str, limit: int = 100) -> List[Tuple[int, str]]:
+        """(file id, snippet) of search()'s matches, without loading the files"""
+        session = get_session()
+        return get_search_cache().get_or_compute(
+            SearchCache.make_key(query, limit=limit), lambda: SearchIndex._hits(session, query, limit)
+        )
+    
+    @staticmethod
+    def load_files(hits: List[Tuple[int, str]]) -> List[Tuple[File, str]]:
+        """(file, snippet) for each (file id, snippet) hit, in order, skipping files removed since"""
+        if not hits:
+            return []
+        
+        session = get_session()
+        files = {f.id: f for f in session.query(File).filter(File.id.in_([file_id for file_id, _ in hits]))}
+        return [(files[file_id], snippet) for file_id, snippet in hits if file_id in files]
+    
+    @staticmethod
+    def extends(previous: str, query: str) -> bool:
+        """
+        Whether every file search() finds for query is among those it finds
+        for previous: query adds to the end of previous, which was long
+        enough to have had its substring matches included
+        """
+        previous, query = previous.strip().lower(), query.strip().lower()
+        return len(previous) >= SearchIndex.MIN_SUBSTRING and query.startswith(previous)
+    
+    @staticmethod
+    def refine(query: str, hits: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """
+        Narrow the complete hits of an earlier query that query extends (see
+        extends()) to the ones query matches, by checking their indexed text
+        instead of searching the whole index. Word matches come first, then
+        substring matches, each keeping the earlier order and snippets.
+        """
+        if not hits:
+            return []
+        
+        session = get_session()
+        rows = {row.rowid: row for row in session.execute(
+            select(file_search).where(file_search.c.rowid.in_([file_id for file_id, _ in hits]))
+        )}
+        # Each word is a phrase of index tokens whose last one is a prefix, as in build_query()
+        phrases = [SearchIndex._tokens(word) for word in re.findall(r'\w+', query.lower())]
+        text = query.strip().lower()
+        
+        words, substrings = [], []
+        for hit in hits:
+            row = rows.get(hit[0])
+            if row is None:
+                continue
+            columns = [SearchIndex._tokens(value or '')
+                       for value in (row.name, row.path, row.content, row.summary, row.tags)]
+            if phrases and all(any(SearchIndex._has_phrase(tokens, phrase) for tokens in columns)
+                               for phrase in phrases):
+                words.append(hit)
+            elif text in (row.name or '').lower() or text in (row.path or '').lower():
+                substrings.append(hit)
+        return words + substrings
+    
+    @staticmethod
+    def _tokens(value: str) -> List[str]:
+        """Split text into terms as file_search's unicode61 tokenizer does"""
+        value = value.lower()
+        if not value.isascii():
+            value = ''.join(c for c in unicodedata.normalize('NFKD', value) if not unicodedata.combining(c))
+        return re.findall(r'[^\W_]+', value)
+    
+    @staticmethod
+    def _has_phrase(tokens: List[str], phrase: List[str]) -> bool:
+        """Whether tokens hold phrase's terms in a row, the last one as a prefix"""
+        if not phrase:
+            return True
+        *whole, prefix = phrase
+        for i in range(len(tokens) - len(whole)):
+            if tokens[i + len(whole)].startswith(prefix) and tokens[i:i + len(whole)] == whole:
+                return True
+        return False
+    
+    @staticmethod
+    def _hits(session, query: str, limit: int) -> List[Tuple[int, str]]:
+        """(file id, snippet) of the best matches for search()"""
+        hits = []
+        
+        match = SearchIndex.build_query(query)
+        if match is not None:
+            hits = SearchIndex._matches(session, 'file_search', match, limit, SearchIndex.SNIPPET_TOKENS)
+        
+        substring = SearchIndex.substring_query(query)
+        if substring is not None and len(hits) < limit:
+            found = {file_id for file_id, _ in hits}
+            # A trigram snippet token is one character
+            hits.extend(hit for hit in SearchIndex._matches(session, 'file_trigrams', substring, limit, 60)
+                        if hit[0] not in found)
+            hits = hits[:limit]
+        return hits
+    
+    @staticmethod
+    def _matches(session, table: str, match: str, limit: int, tokens: int) -> List[Tuple[int, str]]:
+        """(file id, snippet) of the best matches in one FTS5 table"""
+        matches = SearchIndex._count(session, table, match, SearchIndex.RANK_LIMIT)
+        if not matches:
+            return []
+        
+        # rank is bm25() with the column weights configured by the migrations
+        order = 'rank' if matches <= SearchIndex.RANK_LIMIT else 'rowid DESC'
+        start, end = SearchIndex.HIGHLIGHT
+        return [tuple(row) for row in session.execute(text(
+            f"SELECT rowid, snippet({table}, -1, :start, :end, '…', :tokens) "
+            f"FROM {table} WHERE {table} MATCH :match ORDER BY {order} LIMIT :limit"
+        ), {'match': match, 'start': start, 'end': end, 'tokens': tokens, 'limit': limit})]
+    
+    @staticmethod
+    def _count(session, table: str, match: str, cap: int) -> int:
+        """Count matches in one FTS5 table, stopping past cap; this only walks the index"""
+        return session.execute(text(
+            f"SELECT count(*) FROM (SELECT 1 FROM {table} WHERE {table} MATCH :match LIMIT :cap)"
+        ), {'match': match, 'cap': cap + 1}).scalar()
+    
+    @staticmethod
+    def pending_count() -> int:
+        """Count files whose content is not in the index yet"""
+        session = get_session()
+        return session.query(File.id).filter(File.content_indexed_at.is_(None)).count()
+
+
+class SearchWorker:
+    """
+    Run search-as-you-type queries on a background thread.
+    
+    Only the latest text matters: submit() replaces any query still waiting
+    and interrupts the running one's SQLite statement, so a stale search
+    never holds up the next. Results go to on_results(query, hits) on the
+    worker thread as (file id, snippet) pairs; load the files again by id
+    (SearchIndex.load_files) on the thread that shows them.
+    
+    When a query extends the previous one, whose search found all its
+    matches (fewer than limit) with the catalog unchanged since, every new
+    match is among them, so they are narrowed with SearchIndex.refine()
+    instead of searching the index again.
+    """
+    
+    def __init__(self, limit: int = 100):
+        self.limit = limit
+        
+        self._pending = None  # (query, on_results) waiting to run
+        self._connection = None  # SQLite connection of the running search
+        self._previous = None  # (query, generation, hits) of the last complete search
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, query: str, on_results: Callable[[str, List[Tuple[int, str]]], None]):
+        """Search for query next, cancelling whatever search is waiting or running"""
+        with self._lock:
+            if self._closed:
+                return
+            self._pending = (query, on_results)
+            self._interrupt()
+            self._ready.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='search-worker')
+                self._thread.start()
+    
+    def cancel(self):
+        """Cancel the waiting and running searches without starting another"""
+        with self._lock:
+            self._pending = None
+            self._interrupt()
+    
+    def close(self):
+        """Cancel any search and stop the thread; on_results isn't called again"""
+        with self._lock:
+            self._closed = True
+            self._pending = None
+            self._interrupt()
+            self._ready.notify()
+    
+    def _interrupt(self):
+        """Abort the running search's SQLite statement (call with the lock held)"""
+        if self._connection is not None:
+            self._connection.interrupt()
+    
+    def _run(self):
+        """Take the latest query, search, and report results nothing newer has replaced"""
+        try:
+            while True:
+                with self._lock:
+                    while self._pending is None and not self._closed:
+                        self._ready.wait()
+                    if self._closed:
+                        return
+                    query, on_results = self._pending
+                    self._pending = None
+                
+                hits = self._search(query)
+                
+                with self._lock:
+                    current = self._pending is None and not self._closed
+                if hits is not None and current:
+                    on_results(query, hits)
+        finally:
+            remove_session()
+    
+    def _search(self, query: str) -> Optional[List[Tuple[int, str]]]:
+        """Hits for query, or None if it was cancelled"""
+        session = get_session()
+        try:
+            # Matches and refinement read one snapshot, labelled with its generation
+            with read_snapshot():
+                with self._lock:
+                    if self._pending is not None or self._closed:
+                        return None
+                    self._connection = session.connection().connection.dbapi_connection
+                try:
+                    generation = catalog_generation()
+                    previous = self._previous
+                    if (previous and previous[1] == generation
+                            and SearchIndex.extends(previous[0], query)):
+                        hits = SearchIndex.refine(query, previous[2])
+                    else:
+                        hits = SearchIndex.search_hits(query, self.limit)
+                finally:
+                    with self._lock:
+                        self._connection = None
+        except OperationalError as e:
+            if 'interrupted' in str(e.orig):
+                return None
+            print(f"Error searching for '{query}': {e}")
+            return []
+        except Exception as e:
+            print(f"Error searching for '{query}': {e}")
+            return []
+        
+        self._previous = (query, generation, hits) if len(hits) < self.limit else None
+        return hits
+
+
+class ContentIndexer:
+    """
+    Extract the text of catalogued files into the full-text index.
+    
+    Names, paths, summaries and tags reach file_search through triggers as
+    rows are written; reading a document is far too slow for that, so a
+    background thread works through the files whose content_indexed_at is
+    NULL: new files, and files a rescan found changed. Documents are read
+    with no transaction open, then written batch_size at a time in short
+    transactions, so scans and the UI are never held up for long.
+    
+    A file whose size or modification time changed while it was being read
+    stays queued and is read again.
+    """
+    
+    def __init__(self, batch_size: int = 25, max_chars: int = 20000,
+                 idle_interval: float = 30.0, batch_pause: float = 0.05):
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.idle_interval = idle_interval
+        self.batch_pause = batch_pause
+        
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def index_pending(self) -> int:
+        """Index the content of every queued file, returning how many were indexed"""
+        indexed = 0
+        after = 0
+        while not self._stop.is_set():
+            with read_snapshot() as session:
+                batch = session.execute(
+                    select(File.id, File.path, File.last_modified)
+                    .where(File.content_indexed_at.is_(None), File.id > after)
+                    .order_by(File.id).limit(self.batch_size)
+                ).all()
+            if not batch:
+                break
+            
+            after = batch[-1].id
+            indexed += self._index_batch(batch)
+            # Let queued writers in between batches
+            time.sleep(self.batch_pause)
+        return indexed
+    
+    def start(self, delay: float = 5):
+        """Run index_pending() on a background thread after delay seconds, then whenever woken"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        def run():
+            if self._stop.wait(delay):
+                return
+            while not self._stop.is_set():
+                try:
+                    self.index_pending()
+                except Exception as e:
+                    print(f"Error indexing file content: {e}")
+                self._wake.wait(self.idle_interval)
+                self._wake.clear()
+        
+        self._thread = threading.Thread(target=run, daemon=True, name='content-indexer')
+        self._thread.start()
+    
+    def wake(self):
+        """Look for queued files now, e.g. after a scan"""
+        self._wake.set()
+    
+    def close(self):
+        """Stop the background thread after its current batch"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+    
+    def _read(self, path: str) -> str:
+        """Extracted text of a file, or '' when it has none we can read"""
+        if not ContentReader.can_read(path):
+            return ''
+        content, error = ContentReader.read_file(path, self.max_chars)
+        return '' if error else content
+    
+    def _index_batch(self, batch) -> int:
+        """Read a batch of files, then store their content in one transaction"""
+        contents = [(row, self._read(row.path)) for row in batch]
+        
+        indexed = 0
+        try:
+            with session_scope() as session:
+                now = datetime.utcnow()
+                for row, content in contents:
+                    unchanged = (File.last_modified.is_(None) if row.last_modified is None
+                                 else File.last_modified == row.last_modified)
+                    marked = session.execute(
+                        update(File).where(File.id == row.id, File.content_indexed_at.is_(None), unchanged)
+                        .values(content_indexed_at=now).execution_options(synchronize_session=False)
+                    ).rowcount
+                    if marked:
+                        session.execute(
+                            update(file_search).where(file_search.c.rowid == row.id).values(content=content)
+                        )
+                        indexed += 1
+        except Exception as e:
+            print(f"Error indexing content of {len(batch)} files: {e}")
+            return 0
+        return indexed
+
+
+# Global indexer
+_content_indexer = None
+_content_indexer_lock = threading.Lock()
+
+
+def get_content_indexer() -> ContentIndexer:
+    """Get the shared content indexer (singleton), stopped at exit"""
+    global _content_indexer
+    with _content_indexer_lock:
+        if _content_indexer is None:
+            _content_indexer = ContentIndexer()
+            atexit.register(_content_indexer.close)
+    return _content_indexer
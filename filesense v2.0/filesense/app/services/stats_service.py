@@ -1,34 +1,66 @@
 """
 Statistics Service for dashboard analytics
 """
-from sqlalchemy import func
+from sqlalchemy import func, or_, and_
 from sqlalchemy.sql import func as sql_func
 from datetime import datetime, timedelta
 from typing import Dict, List
-from app.models import File, Tag, ActivityLog, get_session
+from app.models import File, Tag, ActivityLog, CatalogStat, get_session
+from app.services.activity_logger import get_activity_logger
 
 
 class StatsService:
-    """Service for calculating file statistics"""
+    """
+    Service for calculating file statistics.
+    
+    Counts and totals come from catalog_stats, which SQLite triggers keep
+    current on every file and tag change, so they cost a primary key lookup
+    rather than a scan of the catalog.
+    """
+    
+    @staticmethod
+    def _stat(kind: str, key: str) -> int:
+        """Read one catalog_stats counter"""
+        session = get_session()
+        # Query the column, not the entity: triggers change rows behind the identity map
+        value = session.query(CatalogStat.value).filter_by(kind=kind, key=key).scalar()
+        return value or 0
+    
+    @staticmethod
+    def _distribution(kind: str, rows=None) -> Dict[str, int]:
+        """Counts per extension or category key from catalog_stats rows"""
+        if rows is None:
+            session = get_session()
+            rows = session.query(CatalogStat.key, CatalogStat.value).filter_by(kind=kind).all()
+        
+        distribution = {}
+        for key, count in rows:
+            if kind == 'extension':
+                name = key.upper().lstrip('.') if key else 'Unknown'
+            else:
+                name = key if key else 'Uncategorized'
+            distribution[name] = distribution.get(name, 0) + count
+        return distribution
+    
+    @staticmethod
+    def _week_start() -> str:
+        """First day key of the last 7 days, today included"""
+        return (datetime.utcnow() - timedelta(days=6)).date().isoformat()
     
     @staticmethod
     def get_total_files() -> int:
         """Get total number of files"""
-        session = get_session()
-        return session.query(File).count()
+        return StatsService._stat('total', 'files')
     
     @staticmethod
     def get_total_size() -> int:
         """Get total size of all files in bytes"""
-        session = get_session()
-        total = session.query(func.sum(File.size)).scalar()
-        return total if total else 0
+        return StatsService._stat('total', 'bytes')
     
     @staticmethod
     def get_tagged_files_count() -> int:
         """Get number of tagged files"""
-        session = get_session()
-        return session.query(File).join(Tag).distinct().count()
+        return StatsService._stat('total', 'tagged')
     
     @staticmethod
     def get_untagged_files_count() -> int:
@@ -38,58 +70,49 @@ class StatsService:
     @staticmethod
     def get_file_type_distribution() -> Dict[str, int]:
         """Get distribution of file types"""
-        session = get_session()
-        
-        results = session.query(
-            File.extension,
-            func.count(File.id)
-        ).group_by(File.extension).all()
-        
-        distribution = {}
-        for ext, count in results:
-            ext_clean = ext.upper().lstrip('.') if ext else 'Unknown'
-            distribution[ext_clean] = count
-        
-        return distribution
+        return StatsService._distribution('extension')
     
     @staticmethod
     def get_recent_activity(limit: int = 10) -> List[ActivityLog]:
         """Get recent file activities"""
+        # Include entries still waiting in the activity logger's buffer, read
+        # before the table so one written in between shows up at least once
+        pending = [ActivityLog(**entry) for entry in get_activity_logger().pending()]
         session = get_session()
-        return session.query(ActivityLog).order_by(
+        logged = session.query(ActivityLog).order_by(
             ActivityLog.timestamp.desc()
         ).limit(limit).all()
+        
+        written = {(a.file_id, a.activity_type, a.timestamp) for a in logged}
+        recent = logged + [a for a in pending if (a.file_id, a.activity_type, a.timestamp) not in written]
+        return sorted(recent, key=lambda a: a.timestamp, reverse=True)[:limit]
     
     @staticmethod
     def get_files_added_today() -> int:
         """Get number of files added today"""
-        session = get_session()
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        return session.query(File).filter(
-            File.date_added >= today_start
-        ).count()
+        return StatsService._stat('added_day', datetime.utcnow().date().isoformat())
     
     @staticmethod
     def get_files_added_this_week() -> int:
-        """Get number of files added this week"""
+        """Get number of files added in the last 7 days"""
         session = get_session()
-        week_start = datetime.utcnow() - timedelta(days=7)
-        
-        return session.query(File).filter(
-            File.date_added >= week_start
-        ).count()
+        total = session.query(func.sum(CatalogStat.value)).filter(
+            CatalogStat.kind == 'added_day',
+            CatalogStat.key >= StatsService._week_start()
+        ).scalar()
+        return total or 0
     
     @staticmethod
     def get_popular_tags(limit: int = 10) -> List[tuple]:
         """Get most popular tags"""
         session = get_session()
         
+        # Usage counts live on the vocabulary, so this reads one row per distinct tag
         results = session.query(
-            Tag.tag,
-            func.count(Tag.id).label('count')
-        ).group_by(Tag.tag).order_by(
-            func.count(Tag.id).desc()
+            Tag.name,
+            Tag.usage_count.label('count')
+        ).filter(Tag.usage_count > 0).order_by(
+            Tag.usage_count.desc()
         ).limit(limit).all()
         
         return results
@@ -105,25 +128,29 @@ class StatsService:
     @staticmethod
     def get_category_distribution() -> Dict[str, int]:
         """Get distribution of file categories"""
+        return StatsService._distribution('category')
+    
+    @staticmethod
+    def get_summary_stats() -> Dict:
+        """Get comprehensive summary statistics (one catalog_stats query)"""
         session = get_session()
+        today = datetime.utcnow().date().isoformat()
+        week_start = StatsService._week_start()
         
-        results = session.query(
-            File.category,
-            func.count(File.id)
-        ).group_by(File.category).all()
+        rows = session.query(CatalogStat.kind, CatalogStat.key, CatalogStat.value).filter(or_(
+            CatalogStat.kind.in_(('total', 'extension')),
+            and_(CatalogStat.kind == 'added_day', CatalogStat.key >= week_start)
+        )).all()
         
-        distribution = {}
-        for category, count in results:
-            cat_name = category if category else 'Uncategorized'
-            distribution[cat_name] = count
+        totals = {key: value for kind, key, value in rows if kind == 'total'}
+        added = {key: value for kind, key, value in rows if kind == 'added_day'}
+        file_types = StatsService._distribution(
+            'extension', [(key, value) for kind, key, value in rows if kind == 'extension']
+        )
         
-        return distribution
-    
-    @staticmethod
-    def get_summary_stats() -> Dict:
-        """Get comprehensive summary statistics"""
-        total_files = StatsService.get_total_files()
-        total_size = StatsService.get_total_size()
+        total_files = totals.get('files', 0)
+        total_size = totals.get('bytes', 0)
+        tagged_files = totals.get('tagged', 0)
         
         # Format size
         if total_size < 1024 * 1024:
@@ -137,9 +164,9 @@ class StatsService:
             'total_files': total_files,
             'total_size': total_size,
             'size_formatted': size_formatted,
-            'tagged_files': StatsService.get_tagged_files_count(),
-            'untagged_files': StatsService.get_untagged_files_count(),
-            'added_today': StatsService.get_files_added_today(),
-            'added_this_week': StatsService.get_files_added_this_week(),
-            'file_types': len(StatsService.get_file_type_distribution()),
+            'tagged_files': tagged_files,
+            'untagged_files': total_files - tagged_files,
+            'added_today': added.get(today, 0),
+            'added_this_week': sum(added.values()),
+            'file_types': len(file_types),
         }
@@ -5,10 +5,14 @@ from app.utils.file_utils import FileUtils
 from app.utils.content_reader import ContentReader
 from app.utils.duplicate_finder import DuplicateFinder
 from app.utils.theme_manager import ThemeManager
+from app.utils.directory_walker import DirectoryWalker
+from app.utils.path_rules import PathRules
 
 __all__ = [
     'FileUtils',
     'ContentReader', 
     'DuplicateFinder',
-    'ThemeManager'
+    'ThemeManager',
+    'DirectoryWalker',
+    'PathRules'
 ]
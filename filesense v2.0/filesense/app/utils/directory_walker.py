@@ -0,0 +1,217 @@
+"""
+Directory Walker - Stream files from a folder tree in a single pass
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator, List, Optional, Tuple
+from app.utils.path_rules import PathRules
+
+
+class DirectoryWalker:
+    """
+    Walk a folder tree with os.scandir and yield matching file entries.
+    Entries are DirEntry objects, so callers can use entry.stat() without
+    an extra system call on platforms that return stat data with readdir.
+    
+    With workers > 1, directories are listed concurrently by a bounded
+    thread pool, which hides per-call latency on network filesystems.
+    At most fan_out listings are in flight at once. With ordered=True,
+    entries are sorted by name and yielded in depth-first order, so the
+    output is the same for any number of workers.
+    
+    resume_after takes a directory path from an earlier ordered walk of the
+    same root; that directory and everything before it are skipped, which
+    lets an interrupted scan continue from its last checkpoint.
+    
+    rules (a PathRules) prunes excluded directories before they are listed
+    and drops excluded files; skipped counts the entries they removed.
+    """
+    
+    def __init__(self, root: str, extensions: Optional[Iterable[str]] = None,
+                 exclude_dirs: Optional[Iterable[str]] = None,
+                 skip_hidden: bool = False, recursive: bool = True,
+                 workers: int = 1, fan_out: Optional[int] = None,
+                 ordered: bool = False, stat: bool = False,
+                 resume_after: Optional[str] = None,
+                 rules: Optional[PathRules] = None):
+        self.root = root
+        self.extensions = {ext.lower() for ext in extensions} if extensions else None
+        self.exclude_dirs = set(exclude_dirs or ())
+        self.skip_hidden = skip_hidden
+        self.recursive = recursive
+        self.workers = max(1, workers)
+        self.fan_out = max(1, fan_out or self.workers * 2)
+        self.resume_after = resume_after
+        # Resuming relies on the deterministic order
+        self.ordered = ordered or resume_after is not None
+        # Stat files while listing so the cached result is ready for the caller
+        self.stat = stat
+        self.rules = rules or None
+        
+        # Live progress counters
+        self.files_found = 0
+        self.dirs_scanned = 0
+        self.dirs_pending = 0
+        self.skipped = 0
+    
+    @property
+    def estimated_total(self) -> int:
+        """Estimate total matching files from the files seen per directory so far"""
+        if not self.dirs_scanned:
+            return self.files_found
+        per_dir = self.files_found / self.dirs_scanned
+        return self.files_found + int(per_dir * self.dirs_pending)
+    
+    def walk(self) -> Iterator[os.DirEntry]:
+        """Yield file entries, pruning excluded directories before descending"""
+        self.dirs_pending = 1
+        
+        if self.ordered:
+            walk = self._walk_ordered()
+        elif self.workers > 1:
+            walk = self._walk_parallel()
+        else:
+            walk = self._walk_serial()
+        
+        for files, subdirs, skipped in walk:
+            self.dirs_scanned += 1
+            self.skipped += skipped
+            self.dirs_pending += len(subdirs) - 1
+            self.files_found += len(files)
+            yield from files
+    
+    def _list_dir(self, path: str) -> Tuple[List[os.DirEntry], List[str], int]:
+        """List one directory, returning (matching file entries, subdirectory paths, skipped count)"""
+        files = []
+        subdirs = []
+        skipped = 0
+        rules = self.rules
+        if rules:
+            # Rules match '/'-separated paths relative to the root
+            prefix = os.path.relpath(path, self.root).replace(os.sep, '/') + '/'
+            if prefix == './':
+                prefix = ''
+        
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    if self.skip_hidden and name.startswith('.'):
+                        continue
+                    
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.recursive:
+                                continue
+                            if name in self.exclude_dirs or (rules and rules.excludes_dir(prefix + name)):
+                                skipped += 1
+                            else:
+                                subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    
+                    if rules and rules.excludes_file(prefix + name):
+                        skipped += 1
+                        continue
+                    
+                    # Filter on the name alone so skipped files are never stat'ed
+                    if self.extensions is not None and \
+                            os.path.splitext(name)[1].lower() not in self.extensions:
+                        continue
+                    
+                    if self.stat:
+                        try:
+                            entry.stat()
+                        except OSError:
+                            continue
+                    
+                    files.append(entry)
+        except OSError as e:
+            print(f"Cannot read directory {path}: {e}")
+        
+        if self.ordered:
+            files.sort(key=lambda entry: entry.name)
+            subdirs.sort()
+        
+        return files, subdirs, skipped
+    
+    def _walk_serial(self) -> Iterator[Tuple[List[os.DirEntry], List[str], int]]:
+        """List directories one at a time"""
+        stack = [self.root]
+        while stack:
+            files, subdirs, skipped = self._list_dir(stack.pop())
+            stack.extend(subdirs)
+            yield files, subdirs, skipped
+    
+    def _walk_parallel(self) -> Iterator[Tuple[List[os.DirEntry], List[str], int]]:
+        """List directories concurrently, yielding each as soon as it completes"""
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='walker')
+        queued = deque([self.root])
+        running = set()
+        
+        try:
+            while queued or running:
+                while queued and len(running) < self.fan_out:
+                    running.add(executor.submit(self._list_dir, queued.pop()))
+                
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs, skipped = future.result()
+                    queued.extend(subdirs)
+                    yield files, subdirs, skipped
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _walk_ordered(self) -> Iterator[Tuple[List[os.DirEntry], List[str], int]]:
+        """Depth-first walk in name order, listing the next fan_out directories ahead of time"""
+        executor = None
+        if self.workers > 1:
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='walker')
+        stack = [self.root]
+        prefetched = {}
+        
+        try:
+            while stack:
+                path = stack.pop()
+                future = prefetched.pop(path, None)
+                files, subdirs, skipped = future.result() if future else self._list_dir(path)
+                if self.resume_after and self._is_ancestor(path, self.resume_after):
+                    files, subdirs = self._skip_done(files, subdirs)
+                stack.extend(reversed(subdirs))
+                
+                # Prefetch the directories that will be yielded next
+                if executor:
+                    for upcoming in reversed(stack[-self.fan_out:]):
+                        if upcoming not in prefetched:
+                            prefetched[upcoming] = executor.submit(self._list_dir, upcoming)
+                
+                yield files, subdirs, skipped
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _sort_key(self, path: str) -> Tuple[str, ...]:
+        """Position of a path in the ordered walk (depth-first, by name)"""
+        relative = os.path.relpath(path, self.root)
+        return () if relative == os.curdir else tuple(relative.split(os.sep))
+    
+    @staticmethod
+    def _is_ancestor(path: str, other: str) -> bool:
+        """True if path is other or one of its parent directories"""
+        return other == path or other.startswith(path.rstrip(os.sep) + os.sep)
+    
+    def _skip_done(self, files: List[os.DirEntry], subdirs: List[str]) -> Tuple[List[os.DirEntry], List[str]]:
+        """
+        Drop work finished before resume_after. Called for the checkpoint and its
+        parents: their own files were already yielded, and only subdirectories
+        after the checkpoint (or leading to it) still need walking.
+        """
+        cursor = self._sort_key(self.resume_after)
+        return [], [
+            d for d in subdirs
+            if self._is_ancestor(d, self.resume_after) or self._sort_key(d) > cursor
+        ]
@@ -7,11 +7,19 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Callable
 from collections import defaultdict
 from app.models import File, get_session
+from app.utils.directory_walker import DirectoryWalker
+from app.utils.path_rules import PathRules
 
 
 class DuplicateFinder:
     """Find duplicate files by content hash"""
     
+    # Directories listed concurrently when scanning a folder
+    SCAN_WORKERS = 4
+    
+    # Entries the rules excluded on each folder's last scan
+    skipped: Dict[str, int] = {}
+    
     @staticmethod
     def find_duplicates_in_database(progress_callback: Optional[Callable] = None) -> Dict[str, List[dict]]:
         """
@@ -65,35 +73,30 @@ class DuplicateFinder:
     
     @staticmethod
     def find_duplicates_in_folder(folder_path: str, recursive: bool = True,
-                                   progress_callback: Optional[Callable] = None) -> Dict[str, List[str]]:
+                                   progress_callback: Optional[Callable] = None,
+                                   workers: Optional[int] = None,
+                                   rules: Optional[PathRules] = None) -> Dict[str, List[str]]:
         """
-        Find duplicate files in a folder.
+        Find duplicate files in a folder, skipping paths excluded by rules
+        (defaults to PathRules.for_root(folder_path)); how many is kept in
+        DuplicateFinder.skipped[folder_path].
         Returns dict: {hash: [file_paths, ...]}
         """
         if not os.path.exists(folder_path):
             return {}
         
-        # Collect all files
-        files = []
-        if recursive:
-            for root, _, filenames in os.walk(folder_path):
-                for filename in filenames:
-                    files.append(os.path.join(root, filename))
-        else:
-            for item in os.listdir(folder_path):
-                path = os.path.join(folder_path, item)
-                if os.path.isfile(path):
-                    files.append(path)
+        workers = workers or DuplicateFinder.SCAN_WORKERS
         
-        # Group by size
+        # Group by size, using the stat cached while listing
+        if rules is None:
+            rules = PathRules.for_root(folder_path)
+        walker = DirectoryWalker(folder_path, recursive=recursive, workers=workers, stat=True, rules=rules)
         size_groups = defaultdict(list)
-        for file_path in files:
-            try:
-                size = os.path.getsize(file_path)
-                if size > 0:
-                    size_groups[size].append(file_path)
-            except (OSError, IOError):
-                pass
+        for entry in walker.walk():
+            size = entry.stat().st_size
+            if size > 0:
+                size_groups[size].append(entry.path)
+        DuplicateFinder.skipped[folder_path] = walker.skipped
         
         # Calculate hashes for potential duplicates
         hash_groups = defaultdict(list)
@@ -270,7 +273,7 @@ class DuplicateFinder:
                 hash1 = DuplicateFinder._calculate_hash(path1)
                 hash2 = DuplicateFinder._calculate_hash(path2)
                 result['identical'] = hash1 == hash2 and hash1 is not None
-            
+        
         except Exception as e:
             result['error'] = str(e)
         
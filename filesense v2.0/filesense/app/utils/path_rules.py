@@ -0,0 +1,155 @@
+"""
+Path Rules - Gitignore-style include/exclude rules for folder scans
+"""
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+class PathRules:
+    """
+    Include/exclude rules for one scan root, compiled once into regexes.
+    
+    Exclude patterns use .gitignore syntax: '*', '?', '[abc]' and '**'
+    globs, a leading '!' to re-include, a trailing '/' to match only
+    directories, and a '/' anywhere but the end to anchor the pattern to
+    the root. The last matching pattern wins. Excluded directories are
+    pruned, so nothing beneath them is listed.
+    
+    Include patterns use the same glob syntax and apply to files only:
+    when any are given, a file must match one of them to be kept. They
+    ignore case, so '*.pdf' keeps 'Report.PDF' as extension filters did.
+    """
+    
+    # Version control, dependency and cache folders that never hold user documents
+    DEFAULT_EXCLUDES = [
+        '.git/', '.svn/', '.hg/',
+        '__pycache__/', 'node_modules/',
+        '.cache/', '.tox/', '.venv/', '.mypy_cache/', '.pytest_cache/',
+    ]
+    
+    # Per-root rule file, read from the top of the scanned folder
+    IGNORE_FILE = '.filesenseignore'
+    
+    def __init__(self, excludes: Optional[Iterable[str]] = None,
+                 includes: Optional[Iterable[str]] = None):
+        self.excludes = [p for p in (self._clean(line) for line in excludes or ()) if p]
+        self.includes = [p for p in (self._clean(line) for line in includes or ()) if p]
+        
+        rules = [self._parse(pattern) for pattern in self.excludes]
+        self._negated = [negated for negated, _, _ in rules]
+        self._dir_regex = self._combine(rules, dirs=True)
+        self._file_regex = self._combine(rules, dirs=False)
+        self._include_regex = None
+        if self.includes:
+            self._include_regex = re.compile('|'.join(
+                self._translate(self._parse(p)[2], '/' in p.rstrip('/')) for p in self.includes
+            ), re.IGNORECASE)
+    
+    @classmethod
+    def for_root(cls, root: str, excludes: Optional[Iterable[str]] = None,
+                 includes: Optional[Iterable[str]] = None) -> 'PathRules':
+        """Build the rules for a scan root: defaults, then its ignore file, then excludes"""
+        patterns = list(cls.DEFAULT_EXCLUDES)
+        try:
+            with open(os.path.join(root, cls.IGNORE_FILE), 'r', encoding='utf-8') as f:
+                patterns.extend(f.read().splitlines())
+        except OSError:
+            pass
+        patterns.extend(excludes or ())
+        return cls(patterns, includes)
+    
+    def excludes_dir(self, relative_path: str) -> bool:
+        """Check if a directory (path relative to the root, '/'-separated) is pruned"""
+        return self._excluded(self._dir_regex, relative_path)
+    
+    def excludes_file(self, relative_path: str) -> bool:
+        """Check if a file (path relative to the root, '/'-separated) is skipped"""
+        if self._include_regex is not None and not self._include_regex.fullmatch(relative_path):
+            return True
+        return self._excluded(self._file_regex, relative_path)
+    
+    def _excluded(self, regex, relative_path: str) -> bool:
+        if regex is None:
+            return False
+        match = regex.fullmatch(relative_path)
+        if match is None:
+            return False
+        # Group r<i> is rule i; alternatives run last rule first, so it is the last match
+        return not self._negated[int(match.lastgroup[1:])]
+    
+    @staticmethod
+    def _clean(line: str) -> str:
+        """Drop comment lines and strip trailing whitespace from a rule line"""
+        if line.startswith('#'):
+            return ''
+        return line.rstrip()
+    
+    @staticmethod
+    def _parse(pattern: str) -> Tuple[bool, bool, str]:
+        """Split a pattern into (negated, directories only, glob)"""
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+        elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        return negated, dir_only, pattern.rstrip('/')
+    
+    @classmethod
+    def _combine(cls, rules: List[Tuple[bool, bool, str]], dirs: bool):
+        """Compile the rules that apply to files or directories into one regex"""
+        parts = [
+            f'(?P<r{index}>{cls._translate(glob, "/" in glob)})'
+            for index, (_, dir_only, glob) in reversed(list(enumerate(rules)))
+            if glob and (dirs or not dir_only)
+        ]
+        return re.compile('|'.join(parts)) if parts else None
+    
+    @staticmethod
+    def _translate(glob: str, anchored: bool) -> str:
+        """Translate a gitignore glob into a regex over '/'-separated relative paths"""
+        glob = glob.lstrip('/')
+        out = []
+        i = 0
+        n = len(glob)
+        while i < n:
+            c = glob[i]
+            if c == '*':
+                if glob.startswith('**/', i) and (i == 0 or glob[i - 1] == '/'):
+                    out.append('(?:.*/)?')
+                    i += 3
+                    continue
+                if glob.startswith('**', i) and i + 2 == n and (i == 0 or glob[i - 1] == '/'):
+                    out.append('.*')
+                    i += 2
+                    continue
+                out.append('[^/]*')
+            elif c == '?':
+                out.append('[^/]')
+            elif c == '[':
+                end = glob.find(']', i + 2)
+                if end == -1:
+                    out.append(re.escape(c))
+                else:
+                    chars = glob[i + 1:end]
+                    if chars[0] == '!':
+                        chars = '^' + chars[1:]
+                    out.append('[' + chars.replace('\\', '\\\\') + ']')
+                    i = end
+            elif c == '\\' and i + 1 < n:
+                i += 1
+                out.append(re.escape(glob[i]))
+            else:
+                out.append(re.escape(c))
+            i += 1
+        
+        pattern = ''.join(out)
+        # Unanchored patterns match a name at any depth
+        return pattern if anchored else '(?:.*/)?' + pattern
+    
+    def __bool__(self) -> bool:
+        return bool(self.excludes or self.includes)
+    
+    def __repr__(self):
+        return f"<PathRules(excludes={len(self.excludes)}, includes={len(self.includes)})>"
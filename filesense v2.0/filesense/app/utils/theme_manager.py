@@ -3,7 +3,7 @@ Theme Manager - Handle application themes and colors
 """
 import customtkinter as ctk
 from typing import Dict, Optional
-from app.models import Settings, get_session
+from app.models import Settings, get_session, write_scope
 
 
 class ThemeManager:
@@ -134,16 +134,14 @@ class ThemeManager:
     def save_theme_preference(self):
         """Save theme preference to database"""
         try:
-            session = get_session()
-            setting = session.query(Settings).filter_by(key='theme').first()
-            
-            if setting:
-                setting.value = self._current_theme
-            else:
-                setting = Settings(key='theme', value=self._current_theme)
-                session.add(setting)
-            
-            session.commit()
+            with write_scope() as session:
+                setting = session.query(Settings).filter_by(key='theme').first()
+                
+                if setting:
+                    setting.value = self._current_theme
+                else:
+                    setting = Settings(key='theme', value=self._current_theme)
+                    session.add(setting)
         except Exception as e:
             print(f"Error saving theme preference: {e}")
     
@@ -285,8 +285,8 @@ class AIAnalysisView(ctk.CTkFrame):
     
     def choose_file(self):
         """Show file chooser dialog"""
-        # Get all files
-        files = FileService.get_all_files()
+        # Most recently used files first; the list shows at most 100
+        files, _ = FileService.get_files_page(100, sort='last_accessed', descending=True)
         
         if not files:
             messagebox.showwarning(
@@ -306,7 +306,7 @@ class AIAnalysisView(ctk.CTkFrame):
         scroll = ctk.CTkScrollableFrame(dialog)
         scroll.pack(fill="both", expand=True, padx=20, pady=20)
         
-        for file in files[:100]:  # Limit to 100 files
+        for file in files:
             btn = ctk.CTkButton(
                 scroll,
                 text=f"{file.file_type_icon} {file.name}",
@@ -388,7 +388,7 @@ class AIAnalysisView(ctk.CTkFrame):
             
             # Update UI in main thread
             self.after(0, self.display_results)
-            
+        
         except Exception as e:
             self.after(0, lambda: messagebox.showerror(
                 "Analysis Error",
@@ -4,6 +4,7 @@ Batch Operations View - Batch file operations
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import threading
+from app.models import get_session, remove_session
 from app.services.file_service import FileService
 from app.services.ollama_service import OllamaService
 from app.views.dialogs import BatchTagDialog
@@ -211,8 +212,7 @@ class BatchOperationsView(ctk.CTkFrame):
     
     def select_untagged(self):
         """Select files without tags"""
-        all_files = FileService.get_all_files()
-        self.selected_files = [f for f in all_files if not f.tags]
+        self.selected_files = FileService.get_files_without_tags()
         self.update_selection_label()
     
     def select_by_type(self):
@@ -223,12 +223,8 @@ class BatchOperationsView(ctk.CTkFrame):
         dialog.transient(self)
         dialog.grab_set()
         
-        # File types
-        all_files = FileService.get_all_files()
-        types = {}
-        for f in all_files:
-            ext = f.extension or 'Unknown'
-            types[ext] = types.get(ext, 0) + 1
+        # File types, counted from the catalog statistics
+        types = FileService.get_extension_counts()
         
         label = ctk.CTkLabel(dialog, text="Select file types:", font=("Segoe UI", 14, "bold"))
         label.pack(pady=15)
@@ -242,7 +238,7 @@ class BatchOperationsView(ctk.CTkFrame):
             var = ctk.StringVar(value="off")
             cb = ctk.CTkCheckBox(
                 scroll,
-                text=f"{ext} ({count} files)",
+                text=f"{ext or 'Unknown'} ({count} files)",
                 variable=var,
                 onvalue="on",
                 offvalue="off"
@@ -252,7 +248,7 @@ class BatchOperationsView(ctk.CTkFrame):
         
         def apply():
             chosen = [ext for ext, var in selected_types if var.get() == "on"]
-            self.selected_files = [f for f in all_files if f.extension in chosen]
+            self.selected_files = [f for ext in chosen for f in FileService.iter_files(extension=ext)]
             self.update_selection_label()
             dialog.destroy()
         
@@ -308,28 +304,21 @@ class BatchOperationsView(ctk.CTkFrame):
         self.progress_bar.set(0)
         self.progress_title.configure(text="Moving files...")
         
+        # Worker threads have their own session, so hand them ids rather than File objects
+        targets = [(file.id, file.name) for file in self.selected_files]
+        
         def do_move():
+            import os
             success = 0
-            for i, file in enumerate(self.selected_files):
-                try:
-                    import shutil
-                    import os
-                    if os.path.exists(file.path):
-                        dest = os.path.join(folder, file.name)
-                        shutil.move(file.path, dest)
-                        
-                        # Update database
-                        file.path = dest
-                        from app.models import get_session
-                        session = get_session()
-                        session.commit()
-                        
+            try:
+                for i, (file_id, name) in enumerate(targets):
+                    if FileService.move_file(file_id, os.path.join(folder, name)):
                         success += 1
-                except Exception as e:
-                    print(f"Error moving {file.name}: {e}")
-                
-                progress = (i + 1) / len(self.selected_files)
-                self.after(0, lambda p=progress, n=file.name: self.update_progress(p, f"Moving: {n}"))
+                    
+                    progress = (i + 1) / len(targets)
+                    self.after(0, lambda p=progress, n=name: self.update_progress(p, f"Moving: {n}"))
+            finally:
+                remove_session()
             
             self.after(0, lambda: self.complete_operation(f"Moved {success} files"))
         
@@ -351,26 +340,27 @@ class BatchOperationsView(ctk.CTkFrame):
         self.progress_bar.set(0)
         self.progress_title.configure(text="AI Categorizing files...")
         
+        targets = [(file.id, file.name, file.path) for file in self.selected_files]
+        
         def do_categorize():
+            from app.utils.content_reader import ContentReader
             success = 0
-            for i, file in enumerate(self.selected_files):
-                try:
-                    from app.utils.content_reader import ContentReader
-                    content, _ = ContentReader.read_file(file.path, max_chars=2000)
-                    
-                    category = self.ollama.categorize_file(file.name, content)
+            try:
+                for i, (file_id, name, path) in enumerate(targets):
+                    try:
+                        content, _ = ContentReader.read_file(path, max_chars=2000)
+                        
+                        category = self.ollama.categorize_file(name, content)
+                        
+                        if category and FileService.update_file_category(file_id, category):
+                            success += 1
+                    except Exception as e:
+                        print(f"Error categorizing {name}: {e}")
                     
-                    if category:
-                        file.category = category
-                        from app.models import get_session
-                        session = get_session()
-                        session.commit()
-                        success += 1
-                except Exception as e:
-                    print(f"Error categorizing {file.name}: {e}")
-                
-                progress = (i + 1) / len(self.selected_files)
-                self.after(0, lambda p=progress, n=file.name: self.update_progress(p, f"Categorizing: {n}"))
+                    progress = (i + 1) / len(targets)
+                    self.after(0, lambda p=progress, n=name: self.update_progress(p, f"Categorizing: {n}"))
+            finally:
+                remove_session()
             
             self.after(0, lambda: self.complete_operation(f"Categorized {success} files"))
         
@@ -407,6 +397,8 @@ class BatchOperationsView(ctk.CTkFrame):
     
     def complete_operation(self, message):
         """Complete operation and hide progress"""
+        # Rows were changed from a worker thread's session; reload them on next access
+        get_session().expire_all()
         self.progress_frame.grid_remove()
         messagebox.showinfo("Complete", message)
         self.clear_selection()
@@ -2,6 +2,7 @@
 Dashboard View - Main landing page with statistics
 """
 import customtkinter as ctk
+from app.models import read_snapshot
 from app.services.stats_service import StatsService
 from app.services.file_service import FileService
 
@@ -75,8 +76,12 @@ class DashboardView(ctk.CTkFrame):
         grid_frame.grid_columnconfigure(1, weight=1)
         grid_frame.grid_rowconfigure(1, weight=1)
         
-        # Get statistics
-        stats = StatsService.get_summary_stats()
+        # Read everything the dashboard shows from one snapshot, so the cards
+        # and lists agree even while a scan is committing
+        with read_snapshot():
+            stats = StatsService.get_summary_stats()
+            recent_files = FileService.get_recent_files(10)
+            popular_tags = StatsService.get_popular_tags(15)
         
         # Stats cards row
         stats_row = ctk.CTkFrame(grid_frame, fg_color="transparent")
@@ -124,9 +129,6 @@ class DashboardView(ctk.CTkFrame):
         )
         recent_title.pack(fill="x", padx=20, pady=(20, 10))
         
-        # Get recent files
-        recent_files = FileService.get_recent_files(10)
-        
         if recent_files:
             for file in recent_files:
                 self.create_file_item(recent_frame, file)
@@ -156,8 +158,6 @@ class DashboardView(ctk.CTkFrame):
         )
         tags_title.pack(fill="x", padx=20, pady=(20, 10))
         
-        popular_tags = StatsService.get_popular_tags(15)
-        
         if popular_tags:
             for tag, count in popular_tags:
                 self.create_tag_item(tags_frame, tag, count)
@@ -260,7 +260,6 @@ class DashboardView(ctk.CTkFrame):
     
     def perform_search(self):
         """Perform search and navigate to search view"""
-        query = self.search_entry.get()
+        query = self.search_entry.get().strip()
         if query:
-            self.app.show_search()
-            # TODO: Pass search query to search view
+            self.app.show_search(query)
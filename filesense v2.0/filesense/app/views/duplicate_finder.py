@@ -4,6 +4,7 @@ Duplicate Finder View - Find and manage duplicate files
 import customtkinter as ctk
 from tkinter import messagebox
 import threading
+from app.models import remove_session
 from app.utils.duplicate_finder import DuplicateFinder
 from app.services.file_service import FileService
 
@@ -183,6 +184,7 @@ class DuplicateFinderView(ctk.CTkFrame):
                 f"Error during scan: {str(e)}"
             ))
         finally:
+            remove_session()
             self.after(0, lambda: self.scan_btn.configure(
                 state="normal",
                 text="🔍 Scan for Duplicates"
@@ -368,12 +370,11 @@ class DuplicateFinderView(ctk.CTkFrame):
                     deleted += 1
                     
                     # Remove from database
-                    from app.models import File, get_session
-                    session = get_session()
-                    file_record = session.query(File).filter_by(path=file_path).first()
-                    if file_record:
-                        session.delete(file_record)
-                        session.commit()
+                    from app.models import File, write_scope
+                    with write_scope() as session:
+                        file_record = session.query(File).filter_by(path=file_path).first()
+                        if file_record:
+                            session.delete(file_record)
             except Exception as e:
                 errors.append(f"{file_path}: {str(e)}")
         
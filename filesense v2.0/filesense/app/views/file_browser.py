@@ -6,17 +6,25 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
 from pathlib import Path
+from app.models import get_session, read_snapshot
 from app.services.file_service import FileService
+from app.services.scan_manager import get_scan_manager
 
 
 class FileBrowserView(ctk.CTkFrame):
     """File browser view with folder navigation"""
     
+    # Rows added per "Load more"
+    PAGE_SIZE = 200
+    
     def __init__(self, parent, app):
         super().__init__(parent, fg_color="#f5f5f5")
         self.app = app
         self.current_files = []
         self.selected_files = []
+        self.next_page = None  # Cursor for the page after the loaded rows
+        self.total_files = 0
+        self.load_more_btn = None
         
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
@@ -196,7 +204,7 @@ class FileBrowserView(ctk.CTkFrame):
             # Progress dialog
             progress_window = ctk.CTkToplevel(self)
             progress_window.title("Scanning Folder")
-            progress_window.geometry("400x150")
+            progress_window.geometry("400x200")
             progress_window.transient(self)
             progress_window.grab_set()
             
@@ -218,37 +226,92 @@ class FileBrowserView(ctk.CTkFrame):
             )
             status_label.pack(pady=5)
             
-            def update_progress(current, total, filename):
-                if total > 0:
-                    progress.set(current / total)
-                status_label.configure(text=f"Processing: {filename}")
-                progress_window.update()
+            # Pause / cancel controls
+            btn_frame = ctk.CTkFrame(progress_window, fg_color="transparent")
+            btn_frame.pack(pady=5)
+            
+            manager = get_scan_manager()
+            
+            def update_progress(task):
+                if not progress_window.winfo_exists():
+                    return
+                if task.total > 0:
+                    progress.set(task.processed / task.total)
+                if task.status == 'paused':
+                    status_label.configure(text=f"Paused at {task.processed} files")
+                else:
+                    status_label.configure(text=f"Processing: {task.current_file}")
             
-            # Scan in background
-            try:
-                added_files = FileService.scan_folder(folder, update_progress)
-                progress_window.destroy()
+            def toggle_pause():
+                task = manager.get_task(task_id)
+                if task.status == 'paused':
+                    if manager.resume(task_id):
+                        pause_btn.configure(text="Pause")
+                elif manager.pause(task_id):
+                    pause_btn.configure(text="Resume")
+                update_progress(task)
+            
+            def scan_done(task):
+                if progress_window.winfo_exists():
+                    progress_window.destroy()
                 
-                messagebox.showinfo(
-                    "Scan Complete",
-                    f"Added {len(added_files)} files to database!"
-                )
+                if task.status == 'completed':
+                    message = f"Added {len(task.result)} files to database!"
+                    failed = (task.counts or {}).get('failed', 0)
+                    if failed:
+                        message += f"\n\n{failed} files could not be added; see the log for details."
+                    messagebox.showinfo("Scan Complete", message)
+                elif task.status == 'cancelled':
+                    messagebox.showinfo(
+                        "Scan Cancelled",
+                        f"Scan stopped after {task.processed} files. "
+                        "Scanning this folder again continues where it left off."
+                    )
+                else:
+                    messagebox.showerror("Error", f"Failed to scan folder: {task.error}")
                 
+                # The scan wrote through its own session; reload rows it updated
+                get_session().expire_all()
                 self.refresh_files()
-            except Exception as e:
-                progress_window.destroy()
-                messagebox.showerror("Error", f"Failed to scan folder: {str(e)}")
+            
+            pause_btn = ctk.CTkButton(btn_frame, text="Pause", command=toggle_pause, width=100)
+            pause_btn.pack(side="left", padx=5)
+            
+            cancel_btn = ctk.CTkButton(
+                btn_frame,
+                text="Cancel",
+                command=lambda: manager.cancel(task_id),
+                fg_color="#EF4444",
+                hover_color="#dc2626",
+                width=100
+            )
+            cancel_btn.pack(side="left", padx=5)
+            progress_window.protocol("WM_DELETE_WINDOW", lambda: manager.cancel(task_id))
+            
+            # Scan on a background thread, ahead of any background rescans;
+            # callbacks arrive on that thread, so hand them to the Tk loop
+            task_id = manager.submit(
+                folder,
+                interactive=True,
+                on_progress=lambda task: self.after(0, update_progress, task),
+                on_done=lambda task: self.after(0, scan_done, task)
+            )
     
     def refresh_files(self):
         """Refresh file list"""
         # Clear current list
         for widget in self.files_scroll.winfo_children():
             widget.destroy()
+        self.current_files = []
+        self.next_page = None
+        self.load_more_btn = None
         
-        # Get all files
-        self.current_files = FileService.get_all_files()
+        # Get the first page; more are loaded on request
+        with read_snapshot():
+            files, self.next_page = FileService.get_files_page(self.PAGE_SIZE)
+            self.total_files = FileService.estimate_file_count()
         
-        if not self.current_files:
+        if not files:
             no_files = ctk.CTkLabel(
                 self.files_scroll,
                 text="No files in database. Click 'Scan Folder' to add files.",
@@ -258,9 +321,42 @@ class FileBrowserView(ctk.CTkFrame):
             no_files.pack(pady=50)
             return
         
+        self.show_files(files)
+    
+    def load_more_files(self):
+        """Append the next page of files"""
+        if self.next_page is None:
+            return
+        with read_snapshot():
+            files, self.next_page = FileService.get_files_page(self.PAGE_SIZE, self.next_page)
+            self.total_files = FileService.estimate_file_count()
+        self.show_files(files)
+    
+    def show_files(self, files):
+        """Add rows for a page of files and update the load more button"""
+        if self.load_more_btn is not None:
+            self.load_more_btn.destroy()
+            self.load_more_btn = None
+        
         # Create file rows
-        for file in self.current_files:
+        for file in files:
             self.create_file_row(file)
+        self.current_files.extend(files)
+        
+        if self.next_page is not None:
+            self.load_more_btn = ctk.CTkButton(
+                self.files_scroll,
+                text=f"Load more ({len(self.current_files):,} of {self.total_files:,} shown)",
+                command=self.load_more_files,
+                fg_color="white",
+                text_color="#2E86AB",
+                border_width=1,
+                border_color="#2E86AB",
+                hover_color="#e8f4f8",
+                font=("Segoe UI", 12),
+                height=32
+            )
+            self.load_more_btn.pack(pady=10)
     
     def create_file_row(self, file):
         """Create a file row in the list"""
@@ -253,7 +253,7 @@ class FileDetailView(ctk.CTkFrame):
             for tag in self.file.tags:
                 tag_chip = ctk.CTkButton(
                     self.tags_container,
-                    text=f"#{tag.tag}",
+                    text=f"#{tag.name}",
                     fg_color="#C7F0BD",
                     text_color="#2E86AB",
                     hover_color="#aae09e",
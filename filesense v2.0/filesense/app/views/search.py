@@ -2,22 +2,36 @@
 Search View - Search and filter files
 """
 import customtkinter as ctk
-from app.services.file_service import FileService
+from app.services.search_index import SearchIndex, SearchWorker
 
 
 class SearchView(ctk.CTkFrame):
-    """Search view for finding files"""
+    """Search view for finding files, searching as the user types"""
     
-    def __init__(self, parent, app):
+    # Wait for a pause in typing this long (ms) before searching
+    DEBOUNCE_MS = 250
+    # Result rows added per turn of the Tk event loop
+    RENDER_CHUNK = 20
+    
+    def __init__(self, parent, app, query=None):
         super().__init__(parent, fg_color="#f5f5f5")
         self.app = app
-        self.results = []
+        self.results = []  # (file id, snippet) of the shown results
+        self.query = ''  # Text the shown or pending results are for
+        self.worker = SearchWorker()
+        self.debounce_job = None
+        self.render_job = None
         
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
         
         self.create_header()
         self.create_content()
+        
+        # e.g. from the dashboard's search bar
+        if query:
+            self.search_entry.insert(0, query)
+            self.perform_search()
     
     def create_header(self):
         """Create page header"""
@@ -30,7 +44,15 @@ class SearchView(ctk.CTkFrame):
             font=("Segoe UI", 28, "bold"),
             text_color="#2E86AB"
         )
-        title.pack(anchor="w")
+        title.pack(side="left")
+        
+        self.status_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=("Segoe UI", 12),
+            text_color="#999"
+        )
+        self.status_label.pack(side="right")
     
     def create_content(self):
         """Create search content"""
@@ -55,6 +77,7 @@ class SearchView(ctk.CTkFrame):
         )
         self.search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 10))
         self.search_entry.bind('<Return>', lambda e: self.perform_search())
+        self.search_entry.bind('<KeyRelease>', self.on_key_release)
         
         search_btn = ctk.CTkButton(
             search_inner,
@@ -88,20 +111,58 @@ class SearchView(ctk.CTkFrame):
         )
         msg.pack(pady=50)
     
+    def on_key_release(self, event):
+        """Search once typing pauses, if the text changed"""
+        if self.debounce_job is not None:
+            self.after_cancel(self.debounce_job)
+        self.debounce_job = self.after(self.DEBOUNCE_MS, self.search_if_changed)
+    
+    def search_if_changed(self):
+        """Search for the entry's text unless its results are already shown or on the way"""
+        self.debounce_job = None
+        if self.search_entry.get().strip() != self.query:
+            self.perform_search()
+    
     def perform_search(self):
-        """Perform search"""
-        query = self.search_entry.get().strip()
+        """Search on the worker thread; results replace the current ones when they arrive"""
+        if self.debounce_job is not None:
+            self.after_cancel(self.debounce_job)
+            self.debounce_job = None
+        
+        self.query = self.search_entry.get().strip()
+        if not self.query:
+            self.worker.cancel()
+            self.clear_results()
+            self.status_label.configure(text="")
+            self.show_initial_message()
+            return
         
-        # Clear results
+        # Ranked matches with snippets, cached until the catalog changes; the
+        # worker cancels the previous search, or narrows its results
+        self.status_label.configure(text="Searching...")
+        self.worker.submit(self.query, lambda query, hits: self.after(0, self.show_results, query, hits))
+    
+    def destroy(self):
+        """Stop the search worker along with the view"""
+        self.worker.close()
+        super().destroy()
+    
+    def clear_results(self):
+        """Remove the shown results, including rows still waiting to be added"""
+        if self.render_job is not None:
+            self.after_cancel(self.render_job)
+            self.render_job = None
         for widget in self.results_scroll.winfo_children():
             widget.destroy()
-        
-        if not query:
-            self.show_initial_message()
+    
+    def show_results(self, query, hits):
+        """Replace the shown results with a search's hits, unless newer text has been searched since"""
+        if query != self.query:
             return
         
-        # Search files
-        self.results = FileService.search_files(query)
+        self.clear_results()
+        self.status_label.configure(text="")
+        self.results = hits
         
         if not self.results:
             no_results = ctk.CTkLabel(
@@ -123,11 +184,18 @@ class SearchView(ctk.CTkFrame):
         )
         count_label.pack(fill="x", padx=20, pady=(20, 10))
         
-        # Display results
-        for file in self.results:
-            self.create_result_item(file)
+        self.render_results(0)
+    
+    def render_results(self, start):
+        """Add a chunk of result rows, then yield to the event loop before the next"""
+        self.render_job = None
+        chunk = self.results[start:start + self.RENDER_CHUNK]
+        for file, snippet in SearchIndex.load_files(chunk):
+            self.create_result_item(file, snippet)
+        if start + self.RENDER_CHUNK < len(self.results):
+            self.render_job = self.after(1, self.render_results, start + self.RENDER_CHUNK)
     
-    def create_result_item(self, file):
+    def create_result_item(self, file, snippet=None):
         """Create a search result item"""
         item = ctk.CTkFrame(self.results_scroll, fg_color="#f9f9f9", corner_radius=8, cursor="hand2")
         item.pack(fill="x", padx=15, pady=5)
@@ -164,8 +232,22 @@ class SearchView(ctk.CTkFrame):
         )
         meta_label.pack(anchor="w")
         
+        # Skip snippets that only repeat the name
+        start, end = SearchIndex.HIGHLIGHT
+        if snippet and snippet.replace(start, '').replace(end, '') != file.name:
+            snippet_label = ctk.CTkLabel(
+                text_frame,
+                text=snippet,
+                font=("Segoe UI", 11),
+                text_color="#444",
+                anchor="w",
+                justify="left",
+                wraplength=700
+            )
+            snippet_label.pack(anchor="w")
+        
         if file.tags:
-            tags_text = " ".join([f"#{tag.tag}" for tag in file.tags[:3]])
+            tags_text = " ".join([f"#{tag.name}" for tag in file.tags[:3]])
             tags_label = ctk.CTkLabel(
                 text_frame,
                 text=tags_text,
@@ -2,10 +2,13 @@
 Settings View - Application settings with theme support
 """
 import customtkinter as ctk
+import threading
 from tkinter import messagebox, filedialog
 from app.services.ollama_service import OllamaService
+from app.services.file_service import FileService
+from app.services.activity_logger import RetentionPolicy, get_activity_logger
 from app.utils.theme_manager import ThemeManager, get_theme_manager
-from app.models import Settings, get_session
+from app.models import Settings, get_session, write_scope
 
 
 class SettingsView(ctk.CTkFrame):
@@ -347,9 +350,48 @@ class SettingsView(ctk.CTkFrame):
         content = ctk.CTkFrame(card, fg_color="transparent")
         content.pack(fill="x", padx=20, pady=15)
         
+        # Activity history retention
+        policy = RetentionPolicy.load()
+        retention_frame = ctk.CTkFrame(content, fg_color="transparent")
+        retention_frame.pack(fill="x", pady=(0, 15))
+        
+        ctk.CTkLabel(
+            retention_frame,
+            text="Keep activity (days):",
+            font=("Segoe UI", 12),
+            anchor="w"
+        ).pack(side="left")
+        
+        self.activity_days_entry = ctk.CTkEntry(retention_frame, width=70, height=38)
+        self.activity_days_entry.pack(side="left", padx=(10, 20))
+        self.activity_days_entry.insert(0, str(policy.max_age_days))
+        
+        ctk.CTkLabel(
+            retention_frame,
+            text="Max entries per file:",
+            font=("Segoe UI", 12),
+            anchor="w"
+        ).pack(side="left")
+        
+        self.activity_per_file_entry = ctk.CTkEntry(retention_frame, width=70, height=38)
+        self.activity_per_file_entry.pack(side="left", padx=(10, 20))
+        self.activity_per_file_entry.insert(0, str(policy.max_per_file))
+        
+        ctk.CTkButton(
+            retention_frame,
+            text="Save & Compact",
+            command=self.save_retention_settings,
+            fg_color="#6A994E",
+            height=38,
+            width=140
+        ).pack(side="right")
+        
+        buttons_frame = ctk.CTkFrame(content, fg_color="transparent")
+        buttons_frame.pack(fill="x")
+        
         # Export data
         export_btn = ctk.CTkButton(
-            content,
+            buttons_frame,
             text="📤 Export Data",
             command=self.export_data,
             fg_color="#2E86AB",
@@ -360,7 +402,7 @@ class SettingsView(ctk.CTkFrame):
         
         # Clear database
         clear_btn = ctk.CTkButton(
-            content,
+            buttons_frame,
             text="🗑️ Clear Database",
             command=self.clear_database,
             fg_color="#EF4444",
@@ -421,16 +463,14 @@ Built with:
     def save_setting(self, key: str, value: str):
         """Save a setting to database"""
         try:
-            session = get_session()
-            setting = session.query(Settings).filter_by(key=key).first()
-            
-            if setting:
-                setting.value = value
-            else:
-                setting = Settings(key=key, value=value)
-                session.add(setting)
-            
-            session.commit()
+            with write_scope() as session:
+                setting = session.query(Settings).filter_by(key=key).first()
+                
+                if setting:
+                    setting.value = value
+                else:
+                    setting = Settings(key=key, value=value)
+                    session.add(setting)
         except Exception as e:
             print(f"Error saving setting: {e}")
     
@@ -511,6 +551,22 @@ Built with:
         self.save_setting('include_hidden', self.hidden_var.get())
         messagebox.showinfo("Saved", "Scanning settings saved!")
     
+    def save_retention_settings(self):
+        """Save the activity retention policy and apply it in the background"""
+        try:
+            days = int(self.activity_days_entry.get())
+            per_file = int(self.activity_per_file_entry.get())
+        except ValueError:
+            messagebox.showerror("Invalid Value", "Enter whole numbers (0 keeps everything)")
+            return
+        
+        self.save_setting(RetentionPolicy.MAX_AGE_KEY, str(max(0, days)))
+        self.save_setting(RetentionPolicy.MAX_PER_FILE_KEY, str(max(0, per_file)))
+        
+        logger = get_activity_logger()
+        threading.Thread(target=logger.compact, daemon=True).start()
+        messagebox.showinfo("Saved", "Activity retention saved. Old history is being removed in the background.")
+    
     def export_data(self):
         """Export database data"""
         file_path = filedialog.asksaveasfilename(
@@ -524,30 +580,27 @@ Built with:
         
         try:
             import json
-            from app.models import File
             
-            session = get_session()
-            files = session.query(File).all()
-            
-            data = {
-                'files': [
-                    {
-                        'name': f.name,
-                        'path': f.path,
-                        'extension': f.extension,
-                        'size': f.size,
-                        'tags': f.tag_list,
-                        'summary': f.summary or f.ai_summary
+            # Stream the catalog a page at a time instead of loading it whole
+            count = 0
+            with open(file_path, 'w') as out:
+                out.write('{\n  "files": [')
+                for file in FileService.iter_files(with_tags=True):
+                    entry = {
+                        'name': file.name,
+                        'path': file.path,
+                        'extension': file.extension,
+                        'size': file.size,
+                        'tags': file.tag_list,
+                        'summary': file.summary or file.ai_summary
                     }
-                    for f in files
-                ]
-            }
-            
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-            
-            messagebox.showinfo("Export Complete", f"Exported {len(files)} files to {file_path}")
+                    out.write(',\n    ' if count else '\n    ')
+                    out.write(json.dumps(entry, default=str))
+                    count += 1
+                out.write('\n  ]\n}\n')
             
+            messagebox.showinfo("Export Complete", f"Exported {count} files to {file_path}")
+        
         except Exception as e:
             messagebox.showerror("Export Failed", f"Error: {str(e)}")
     
@@ -564,15 +617,16 @@ Built with:
             return
         
         try:
-            from app.models import File, Tag, ActivityLog
+            from sqlalchemy import delete
+            from app.models import File, Tag, file_tags, ActivityLog
             
-            session = get_session()
-            session.query(ActivityLog).delete()
-            session.query(Tag).delete()
-            session.query(File).delete()
-            session.commit()
+            with write_scope() as session:
+                session.query(ActivityLog).delete()
+                session.execute(delete(file_tags))
+                session.query(Tag).delete()
+                session.query(File).delete()
             
             messagebox.showinfo("Database Cleared", "All data has been removed.")
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clear database: {str(e)}")
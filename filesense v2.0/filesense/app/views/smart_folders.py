@@ -257,6 +257,8 @@ class SmartFoldersView(ctk.CTkFrame):
             options.append("Recursive")
         if folder.extensions:
             options.append(f"Types: {', '.join(folder.extensions[:3])}")
+        if folder.exclude_patterns:
+            options.append(f"Excludes: {', '.join(folder.exclude_patterns[:3])}")
         if folder.auto_tag:
             options.append("Auto-tag")
         
@@ -319,14 +321,14 @@ class SmartFoldersView(ctk.CTkFrame):
         """Show folder configuration dialog"""
         dialog = ctk.CTkToplevel(self)
         dialog.title("Configure Watched Folder")
-        dialog.geometry("450x400")
+        dialog.geometry("450x480")
         dialog.transient(self)
         dialog.grab_set()
         
         # Center dialog
         dialog.update_idletasks()
         x = self.winfo_rootx() + (self.winfo_width() - 450) // 2
-        y = self.winfo_rooty() + (self.winfo_height() - 400) // 2
+        y = self.winfo_rooty() + (self.winfo_height() - 480) // 2
         dialog.geometry(f"+{x}+{y}")
         
         # Get existing config if editing
@@ -386,6 +388,21 @@ class SmartFoldersView(ctk.CTkFrame):
         if existing and existing.extensions:
             ext_entry.insert(0, ", ".join(existing.extensions))
         
+        # Exclude rules (gitignore-style)
+        exclude_label = ctk.CTkLabel(
+            content,
+            text="Paths to exclude (comma-separated, .gitignore style):",
+            font=("Segoe UI", 11),
+            text_color="#666"
+        )
+        exclude_label.pack(anchor="w", pady=(0, 5))
+        
+        exclude_entry = ctk.CTkEntry(content, placeholder_text="build/, *.tmp, !keep.tmp", height=35)
+        exclude_entry.pack(fill="x", pady=(0, 15))
+        
+        if existing and existing.exclude_patterns:
+            exclude_entry.insert(0, ", ".join(existing.exclude_patterns))
+        
         # Buttons
         btn_frame = ctk.CTkFrame(content, fg_color="transparent")
         btn_frame.pack(fill="x", pady=(20, 0))
@@ -398,11 +415,14 @@ class SmartFoldersView(ctk.CTkFrame):
                 extensions = [e.strip().lower() for e in ext_text.split(",")]
                 extensions = [e if e.startswith('.') else f'.{e}' for e in extensions if e]
             
+            exclude_patterns = [p.strip() for p in exclude_entry.get().split(",") if p.strip()]
+            
             folder = WatchedFolder(
                 path=folder_path,
                 recursive=recursive_var.get() == "on",
                 extensions=extensions,
-                auto_tag=auto_tag_var.get() == "on"
+                auto_tag=auto_tag_var.get() == "on",
+                exclude_patterns=exclude_patterns
             )
             
             if existing_index is not None:
@@ -473,12 +493,13 @@ class SmartFoldersView(ctk.CTkFrame):
         # Add enabled folders to watcher
         for folder in self.watched_folders:
             if folder.enabled:
-                self.watcher.add_folder(folder.path)
+                self.watcher.add_folder(folder.path, folder.rules)
         
         if self.watcher.watched_folders:
             self.watcher.start()
+            skipped = sum(self.watcher.skipped.values())
             self.status_indicator.configure(
-                text="● Watching",
+                text=f"● Watching ({skipped} excluded)" if skipped else "● Watching",
                 text_color="#6A994E"
             )
             self.toggle_btn.configure(
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Synthetic Corpus Generator
+Builds a reproducible folder tree of text, docx, xlsx and pdf files for
+benchmarking scans, indexing, duplicate finding and search. The same seed
+and options always produce the same names, contents and timestamps.
+
+Office and PDF files are written directly (minimal OOXML parts in a zip,
+a single-page PDF), so no document libraries are needed to generate them.
+
+Usage:
+    python benchmarks/corpus.py OUTPUT_DIR [--files 2000] [--depth 3] [--fan-out 4]
+"""
+import os
+import sys
+import math
+import random
+import zipfile
+import argparse
+from typing import Dict, List, Optional
+
+# Words used for file names and contents, so search benchmarks have hits
+VOCABULARY = [
+    'budget', 'report', 'invoice', 'meeting', 'project', 'summary', 'draft',
+    'contract', 'schedule', 'analysis', 'research', 'proposal', 'review',
+    'quarterly', 'annual', 'marketing', 'sales', 'client', 'design', 'notes',
+    'roadmap', 'payroll', 'inventory', 'forecast', 'audit', 'training',
+    'policy', 'release', 'feedback', 'survey', 'timeline', 'estimate',
+]
+
+DEFAULT_MIX = {'txt': 0.55, 'docx': 0.15, 'xlsx': 0.15, 'pdf': 0.15}
+
+# Fixed timestamp so stat-based fingerprints are reproducible
+FIXED_MTIME = 1700000000
+_ZIP_DATE = (2023, 11, 14, 22, 13, 20)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse 'txt=0.5,pdf=0.5' into a weight per file type"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip().lower()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown file type '{kind}' (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[kind] = float(weight)
+    return mix
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(6, 14))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Lines of vocabulary sentences, roughly size characters long"""
+    lines = []
+    length = 0
+    while length < size:
+        line = _sentence(rng)
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines) + '\n'
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _write_zip(path: str, parts: Dict[str, str]):
+    """Write a zip with fixed entry timestamps so output is byte-identical per seed"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            info = zipfile.ZipInfo(name, date_time=_ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+
+
+def write_txt(path: str, rng: random.Random, size: int):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(_text(rng, size))
+
+
+def write_docx(path: str, rng: random.Random, size: int):
+    paragraphs = ''.join(
+        f'<w:p><w:r><w:t>{_xml_escape(line)}</w:t></w:r></w:p>'
+        for line in _text(rng, size).splitlines()
+    )
+    _write_zip(path, {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/>'
+            '</Relationships>'
+        ),
+        'word/document.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ),
+    })
+
+
+def write_xlsx(path: str, rng: random.Random, size: int):
+    rows = []
+    length = 0
+    row_index = 1
+    while length < size:
+        cells = [
+            f'<c r="A{row_index}" t="inlineStr"><is><t>{rng.choice(VOCABULARY)}</t></is></c>',
+            f'<c r="B{row_index}"><v>{rng.randint(1, 100000)}</v></c>',
+            f'<c r="C{row_index}" t="inlineStr"><is><t>{_xml_escape(_sentence(rng))}</t></is></c>',
+        ]
+        row = f'<row r="{row_index}">{"".join(cells)}</row>'
+        rows.append(row)
+        length += len(row)
+        row_index += 1
+    _write_zip(path, {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/worksheets/sheet1.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'<sheetData>{"".join(rows)}</sheetData></worksheet>'
+        ),
+    })
+
+
+def write_pdf(path: str, rng: random.Random, size: int):
+    """Single-page PDF with the text drawn in Helvetica"""
+    lines = _text(rng, size).splitlines()
+    text_ops = ['BT', '/F1 10 Tf', '12 TL', '40 800 Td']
+    for line in lines:
+        escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        text_ops.append(f'({escaped}) Tj T*')
+    text_ops.append('ET')
+    stream = '\n'.join(text_ops).encode('latin-1')
+    
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+    ]
+    
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+WRITERS = {'txt': write_txt, 'docx': write_docx, 'xlsx': write_xlsx, 'pdf': write_pdf}
+
+
+def _directories(root: str, depth: int, fan_out: int) -> List[str]:
+    """All directories of a tree with fan_out subdirectories per level, down to depth"""
+    dirs = [root]
+    level = [root]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fan_out):
+                path = os.path.join(parent, f"{VOCABULARY[(d * fan_out + i) % len(VOCABULARY)]}_{d}{i}")
+                next_level.append(path)
+        dirs.extend(next_level)
+        level = next_level
+    return dirs
+
+
+def generate_corpus(root: str, files: int = 2000, depth: int = 3, fan_out: int = 4,
+                    median_kb: float = 8.0, size_sigma: float = 1.0, max_kb: float = 2048.0,
+                    duplicate_ratio: float = 0.1, mix: Optional[Dict[str, float]] = None,
+                    seed: int = 42) -> dict:
+    """
+    Build the corpus under root and return a manifest of what was written.
+    Sizes follow a log-normal distribution around median_kb (capped at
+    max_kb); duplicate_ratio of the files are byte-for-byte copies of an
+    earlier file of the same type.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = sorted(mix)
+    weights = [mix[kind] for kind in kinds]
+    
+    dirs = _directories(root, depth, fan_out)
+    for path in dirs:
+        os.makedirs(path, exist_ok=True)
+    
+    originals: Dict[str, List[str]] = {kind: [] for kind in kinds}
+    by_type = {kind: 0 for kind in kinds}
+    total_bytes = 0
+    duplicates = 0
+    
+    for index in range(files):
+        kind = rng.choices(kinds, weights)[0]
+        directory = rng.choice(dirs)
+        name = f"{rng.choice(VOCABULARY)}_{rng.choice(VOCABULARY)}_{index:06d}.{kind}"
+        path = os.path.join(directory, name)
+        
+        if originals[kind] and rng.random() < duplicate_ratio:
+            with open(rng.choice(originals[kind]), 'rb') as f:
+                data = f.read()
+            with open(path, 'wb') as f:
+                f.write(data)
+            duplicates += 1
+        else:
+            size_kb = min(max_kb, median_kb * math.exp(rng.gauss(0, size_sigma)))
+            WRITERS[kind](path, rng, max(64, int(size_kb * 1024)))
+            originals[kind].append(path)
+        
+        os.utime(path, (FIXED_MTIME, FIXED_MTIME + index))
+        by_type[kind] += 1
+        total_bytes += os.path.getsize(path)
+    
+    return {
+        'root': root,
+        'seed': seed,
+        'files': files,
+        'directories': len(dirs),
+        'depth': depth,
+        'fan_out': fan_out,
+        'median_kb': median_kb,
+        'size_sigma': size_sigma,
+        'duplicate_ratio': duplicate_ratio,
+        'duplicates': duplicates,
+        'bytes': total_bytes,
+        'by_type': by_type,
+    }
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser):
+    """Register the corpus options shared by the benchmark scripts"""
+    parser.add_argument('--files', type=int, default=2000, help='number of files')
+    parser.add_argument('--depth', type=int, default=3, help='directory levels below the root')
+    parser.add_argument('--fan-out', type=int, default=4, help='subdirectories per directory')
+    parser.add_argument('--median-kb', type=float, default=8.0, help='median file size')
+    parser.add_argument('--size-sigma', type=float, default=1.0, help='log-normal spread of file sizes')
+    parser.add_argument('--max-kb', type=float, default=2048.0, help='largest generated file')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='fraction of files that are copies')
+    parser.add_argument('--mix', type=parse_mix, default=None,
+                        help='file type weights, e.g. txt=0.55,docx=0.15,xlsx=0.15,pdf=0.15')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def corpus_options(args: argparse.Namespace) -> dict:
+    """generate_corpus keyword arguments from parsed add_corpus_arguments options"""
+    return {
+        'files': args.files,
+        'depth': args.depth,
+        'fan_out': args.fan_out,
+        'median_kb': args.median_kb,
+        'size_sigma': args.size_sigma,
+        'max_kb': args.max_kb,
+        'duplicate_ratio': args.duplicate_ratio,
+        'mix': args.mix,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='directory to create the corpus in')
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    
+    if os.path.exists(args.output) and os.listdir(args.output):
+        sys.exit(f"{args.output} is not empty")
+    
+    manifest = generate_corpus(args.output, **corpus_options(args))
+    print(f"Wrote {manifest['files']} files ({manifest['bytes'] / (1024 * 1024):.1f} MB, "
+          f"{manifest['duplicates']} duplicates) in {manifest['directories']} directories")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Query Plan Check
+Runs the catalog's hot service queries against a throwaway database,
+captures the SQL they send to SQLite, and asserts via EXPLAIN QUERY PLAN
+that each one is answered from an index: no full table scans and no
+temporary sort for ORDER BY.
+
+Exits non-zero if any query falls back to a scan, so it can gate changes
+to the models or the service queries.
+
+Usage:
+    python benchmarks/query_plan_check.py [--rows 2000] [--verbose]
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed_catalog(session, rows):
+    """Fill the catalog with enough rows that the planner has a choice"""
+    from app.models import File, Tag, ActivityLog
+    
+    now = datetime.utcnow()
+    extensions = ['.txt', '.pdf', '.docx', '.xlsx', '.png']
+    tags = [Tag(name=f'tag{i}') for i in range(11)]
+    for i in range(rows):
+        file = File(
+            name=f'file_{i}{extensions[i % 5]}', path=f'/plan/{i}{extensions[i % 5]}',
+            extension=extensions[i % 5], size=i * 100, category=f'cat{i % 7}',
+            date_added=now - timedelta(hours=i), last_accessed=now - timedelta(minutes=i)
+        )
+        file.tags.append(tags[i % 11])
+        file.activities.append(ActivityLog(activity_type='Added', timestamp=now - timedelta(minutes=i)))
+        session.add(file)
+    session.commit()
+
+
+def hot_queries():
+    """Name -> callable running one service query"""
+    from app.services.file_service import FileService
+    from app.services.stats_service import StatsService
+    
+    return {
+        'FileService.get_recent_files': lambda: FileService.get_recent_files(),
+        'FileService.get_files_by_extension': lambda: FileService.get_files_by_extension('.pdf'),
+        'FileService.get_files_by_category': lambda: FileService.get_files_by_category('cat3'),
+        'FileService.get_files_by_tag': lambda: FileService.get_files_by_tag('tag5'),
+        'FileService.get_files_page (name)': lambda: FileService.get_files_page(
+            50, ('file_1500.txt', 1500), sort='name'),
+        'FileService.get_files_page (date_added, descending)': lambda: FileService.get_files_page(
+            50, (datetime.utcnow() - timedelta(hours=1000), 1000), sort='date_added', descending=True),
+        'StatsService.get_popular_tags': lambda: StatsService.get_popular_tags(),
+        'StatsService.get_files_added_today': lambda: StatsService.get_files_added_today(),
+        'StatsService.get_recent_activity': lambda: StatsService.get_recent_activity(),
+    }
+
+
+def plan_problems(plan):
+    """Plan lines that mean a full scan or an unindexed sort"""
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN ') and 'USING' not in detail:
+            problems.append(detail)
+        elif 'USE TEMP B-TREE FOR ORDER BY' in detail:
+            problems.append(detail)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='files to seed the catalog with')
+    parser.add_argument('--verbose', action='store_true', help='print every plan line')
+    args = parser.parse_args()
+    
+    # Point the catalog at a throwaway database
+    work_dir = tempfile.mkdtemp(prefix='filesense_plan_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    
+    from sqlalchemy import event
+    from app.models import database, init_database
+    
+    session = init_database()
+    seed_catalog(session, args.rows)
+    
+    statements = []
+    
+    @event.listens_for(database._engine, 'before_cursor_execute')
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    failures = 0
+    for name, query in hot_queries().items():
+        statements.clear()
+        query()
+        captured = list(statements)
+        
+        problems = []
+        with database._engine.connect() as conn:
+            for statement, parameters in captured:
+                plan = [row[-1] for row in conn.exec_driver_sql(
+                    'EXPLAIN QUERY PLAN ' + statement, parameters
+                )]
+                if args.verbose:
+                    for detail in plan:
+                        print(f"    {detail}")
+                problems.extend(plan_problems(plan))
+        
+        if not captured:
+            print(f"  ?? {name}: no query captured")
+            failures += 1
+        elif problems:
+            print(f"  ❌ {name}: {'; '.join(problems)}")
+            failures += 1
+        else:
+            print(f"  ✅ {name}")
+    
+    print(f"\n{len(hot_queries()) - failures}/{len(hot_queries())} queries use an index")
+    database._engine.dispose()
+    shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
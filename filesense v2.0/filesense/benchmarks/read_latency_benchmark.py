@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Read Latency During Scan Benchmark
+Scans a synthetic corpus (see corpus.py) on a background thread while
+reader threads repeatedly run the dashboard's queries: summary statistics,
+recent files, popular tags and the first file list page. One reader wraps
+each refresh in read_snapshot(), the other reads statement by statement as
+the views did before.
+
+For each reader it reports refresh latency percentiles and torn reads:
+refreshes where the trigger-maintained file total disagrees with a count of
+the files table, because a scan batch committed between the two queries.
+Snapshot refreshes must never be torn.
+
+Exits non-zero if a snapshot refresh was torn or its p99 latency exceeds
+--max-p99-ms, so it can gate changes to the session or scan code.
+
+Usage:
+    python benchmarks/read_latency_benchmark.py [--files 20000] [--max-p99-ms 250]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import generate_corpus, add_corpus_arguments, corpus_options
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def reader(snapshot, stop, results):
+    """Refresh the dashboard's data until stop is set, timing each refresh"""
+    from sqlalchemy import func
+    from app.models import File, get_session, read_snapshot, remove_session
+    from app.services.file_service import FileService
+    from app.services.stats_service import StatsService
+    
+    latencies = []
+    torn = 0
+    session = get_session()
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            with read_snapshot() if snapshot else nullcontext():
+                stats = StatsService.get_summary_stats()
+                FileService.get_recent_files(10)
+                StatsService.get_popular_tags(15)
+                FileService.get_files_page(200)
+                counted = session.query(func.count(File.id)).scalar()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if counted != stats['total_files']:
+                torn += 1
+    finally:
+        remove_session()
+    
+    results['snapshot' if snapshot else 'autocommit'] = {
+        'refreshes': len(latencies),
+        'torn_reads': torn,
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+        'max_ms': round(max(latencies), 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_arguments(parser)
+    parser.set_defaults(files=20000)
+    parser.add_argument('--max-p99-ms', type=float, default=250.0, help='fail above this snapshot p99')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    # Point the catalog at a throwaway database
+    work_dir = tempfile.mkdtemp(prefix='filesense_reads_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    corpus_root = os.path.join(work_dir, 'corpus')
+    
+    try:
+        print(f"Generating {args.files} files...")
+        generate_corpus(corpus_root, **corpus_options(args))
+        
+        from app.models import init_database, remove_session
+        from app.services.file_service import FileService
+        init_database()
+        
+        scan_done = threading.Event()
+        scan_result = {}
+        
+        def scan():
+            start = time.perf_counter()
+            try:
+                scan_result['files'] = len(FileService.scan_folder(corpus_root))
+            finally:
+                scan_result['seconds'] = round(time.perf_counter() - start, 2)
+                remove_session()
+                scan_done.set()
+        
+        results = {}
+        readers = [threading.Thread(target=reader, args=(snapshot, scan_done, results))
+                   for snapshot in (True, False)]
+        scanner = threading.Thread(target=scan)
+        scanner.start()
+        for thread in readers:
+            thread.start()
+        scanner.join()
+        for thread in readers:
+            thread.join()
+        
+        print(f"\nScanned {scan_result.get('files')} files in {scan_result['seconds']}s while reading\n")
+        print(f"  {'reader':<12} {'refreshes':>9} {'torn':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name in ('snapshot', 'autocommit'):
+            r = results[name]
+            print(f"  {name:<12} {r['refreshes']:>9} {r['torn_reads']:>6} {r['p50_ms']:>8} "
+                  f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'read_latency_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'scan': scan_result,
+                    'results': results,
+                }, f, indent=2)
+            print(f"\nResults written to {args.output}")
+        
+        snapshot = results['snapshot']
+        failed = snapshot['torn_reads'] or not snapshot['refreshes'] or snapshot['p99_ms'] > args.max_p99_ms
+    finally:
+        from app.models import database
+        if database._engine is not None:
+            database._engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
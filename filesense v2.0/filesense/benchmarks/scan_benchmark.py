@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Scan / Index / Search Benchmark
+Generates a synthetic corpus (see corpus.py), then times the desktop
+FileService scans, DuplicateFinder and search, and the web app's
+scan_folder and search_files against it. Each phase records wall time,
+peak traced Python memory and process RSS, and the run is written as
+JSON so results can be compared between commits.
+
+Both apps run against throwaway databases in a temporary directory; the
+user's ~/.filesense and the web app's data/ folder are never touched.
+
+Usage:
+    python benchmarks/scan_benchmark.py [--files 2000] [--output results.json]
+    python benchmarks/scan_benchmark.py --corpus /path/to/existing/tree --phases desktop_scan web_scan
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import importlib.util
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DESKTOP_DIR = os.path.dirname(BENCHMARK_DIR)
+WEB_APP = os.path.normpath(os.path.join(DESKTOP_DIR, '..', '..', 'filesense', 'FileSense', 'app.py'))
+
+sys.path.insert(0, DESKTOP_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY, generate_corpus, add_corpus_arguments, corpus_options
+
+PHASES = [
+    'desktop_scan', 'desktop_rescan', 'desktop_duplicates_folder',
+    'desktop_duplicates_db', 'desktop_search',
+    'web_scan', 'web_rescan', 'web_search',
+]
+
+
+def max_rss_mb():
+    """Peak resident set size of this process so far, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def measure(name, func, trace_memory=True):
+    """Run one phase, returning its timing/memory record"""
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        error = None
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    record = {
+        'phase': name,
+        'seconds': round(elapsed, 4),
+        'peak_traced_mb': round(peak / (1024 * 1024), 2) if peak is not None else None,
+        'max_rss_mb': max_rss_mb(),
+    }
+    if isinstance(result, dict):
+        record.update(result)
+    if error:
+        record['error'] = error
+    
+    status = error or ', '.join(f"{k}={v}" for k, v in record.items()
+                                if k not in ('phase', 'seconds', 'peak_traced_mb', 'max_rss_mb'))
+    print(f"  {name:<28} {elapsed:9.3f}s  peak {record['peak_traced_mb']} MB  {status}")
+    return record
+
+
+def load_web_app(path):
+    """Import the web app module by path (its name clashes with the desktop app package)"""
+    spec = importlib.util.spec_from_file_location('filesense_web', os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def search_queries(count, seed):
+    """Reproducible single and two-word queries drawn from the corpus vocabulary"""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        words = rng.sample(VOCABULARY, 2 if i % 3 == 0 else 1)
+        queries.append(' '.join(words))
+    return queries
+
+
+def desktop_phases(root, queries):
+    """Phase name -> callable for the desktop app (imported lazily, after HOME is redirected)"""
+    from app.services.file_service import FileService
+    from app.utils.duplicate_finder import DuplicateFinder
+    
+    def scan():
+        return {'files': len(FileService.scan_folder(root))}
+    
+    def rescan():
+        return FileService.rescan_folder(root)
+    
+    def duplicates_folder():
+        groups = DuplicateFinder.find_duplicates_in_folder(root)
+        return {'groups': len(groups)}
+    
+    def duplicates_db():
+        groups = DuplicateFinder.find_duplicates_in_database()
+        return {'groups': len(groups)}
+    
+    def search():
+        hits = sum(len(FileService.search_files(query)) for query in queries)
+        return {'queries': len(queries), 'hits': hits}
+    
+    return {
+        'desktop_scan': scan,
+        'desktop_rescan': rescan,
+        'desktop_duplicates_folder': duplicates_folder,
+        'desktop_duplicates_db': duplicates_db,
+        'desktop_search': search,
+    }
+
+
+def web_phases(web, root, queries):
+    """Phase name -> callable for the web app"""
+    
+    def scan():
+        web.scan_folder(root)
+        return {'files': web.indexing_status['progress'], 'skipped': web.indexing_status.get('skipped', 0)}
+    
+    def rescan():
+        web.scan_folder(root)
+        return {'files': web.indexing_status['progress']}
+    
+    def search():
+        hits = sum(len(web.search_files(query)) for query in queries)
+        return {'queries': len(queries), 'hits': hits}
+    
+    return {'web_scan': scan, 'web_rescan': rescan, 'web_search': search}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_arguments(parser)
+    parser.add_argument('--corpus', help='benchmark an existing folder instead of generating one')
+    parser.add_argument('--keep', action='store_true', help='keep the generated corpus and databases')
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=PHASES)
+    parser.add_argument('--queries', type=int, default=50, help='search queries per search phase')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='skip memory tracing, which slows allocation-heavy phases')
+    parser.add_argument('--web-app', default=WEB_APP, help='path to the web app.py')
+    parser.add_argument('--output', default='scan_benchmark_results.json', help='JSON results file')
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='filesense_bench_')
+    trace_memory = not args.no_tracemalloc
+    
+    # Point both apps at databases inside the work dir
+    os.environ['HOME'] = os.environ['USERPROFILE'] = os.path.join(work_dir, 'home')
+    os.makedirs(os.environ['HOME'])
+    
+    try:
+        if args.corpus:
+            root = os.path.abspath(args.corpus)
+            corpus = {'root': root, 'generated': False}
+            print(f"Using existing corpus {root}")
+        else:
+            root = os.path.join(work_dir, 'corpus')
+            start = time.perf_counter()
+            corpus = generate_corpus(root, **corpus_options(args))
+            corpus['generated'] = True
+            corpus['generate_seconds'] = round(time.perf_counter() - start, 3)
+            print(f"Generated {corpus['files']} files ({corpus['bytes'] / (1024 * 1024):.1f} MB, "
+                  f"{corpus['duplicates']} duplicates) in {corpus['generate_seconds']}s")
+        
+        queries = search_queries(args.queries, args.seed)
+        phases = {}
+        if any(name.startswith('desktop_') for name in args.phases):
+            phases.update(desktop_phases(root, queries))
+        if any(name.startswith('web_') for name in args.phases):
+            web = load_web_app(args.web_app)
+            web.app.config['DATABASE'] = os.path.join(work_dir, 'web.db')
+            web.init_db()
+            # Measure the indexer itself, not the Ollama round trips
+            db = web.get_db()
+            db.execute("UPDATE settings SET value = 'false' WHERE key IN ('auto_tag', 'auto_summarize')")
+            db.commit()
+            db.close()
+            phases.update(web_phases(web, root, queries))
+        
+        print()
+        results = [measure(name, phases[name], trace_memory) for name in PHASES if name in args.phases]
+        
+        report = {
+            'benchmark': 'scan_benchmark',
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'sqlite': sqlite3.sqlite_version,
+                'tracemalloc': trace_memory,
+            },
+            'corpus': corpus,
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    finally:
+        if args.keep:
+            print(f"Kept work directory {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
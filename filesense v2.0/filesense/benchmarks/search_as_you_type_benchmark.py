@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Search-As-You-Type Benchmark
+Replays typing into the search view: every query is typed one character
+at a time and each prefix is sent to a SearchWorker, which narrows the
+previous results when the text only grows instead of searching again.
+
+For each keystroke it reports:
+- the UI thread's share: submit(), and loading one chunk of result files
+  as SearchView renders them
+- the worker's time from submit() to results, against a full, uncached
+  search for the same text, overall and for keystrokes it could narrow;
+  the two must find the same files
+
+It also times cancellation: a search that never finishes on its own is
+submitted, then replaced, and the replacement's results must still
+arrive promptly.
+
+The catalog is seeded with --docs files whose names, summaries and
+content are drawn from the corpus vocabulary.
+
+Exits non-zero if the worker's files differ from a full search, or the
+UI thread's p99 work per keystroke or the cancellation takes longer than
+--max-ui-ms.
+
+Usage:
+    python benchmarks/search_as_you_type_benchmark.py [--docs 100000] [--queries 30] [--max-ui-ms 16]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def seed_documents(docs, rng, batch_size=5000):
+    """Insert docs files with names, summaries and content made of corpus words"""
+    from sqlalchemy import insert, update, bindparam
+    from app.models import File, file_search, session_scope
+    
+    now = datetime.utcnow()
+    for first in range(0, docs, batch_size):
+        rows, contents = [], []
+        for i in range(first, min(docs, first + batch_size)):
+            name = '_'.join(rng.sample(VOCABULARY, 2)) + f'_{i}.txt'
+            rows.append({
+                'name': name, 'path': f'/bench/{i % 97}/{name}', 'extension': '.txt', 'size': 1000,
+                'date_added': now - timedelta(minutes=i), 'last_modified': now, 'last_accessed': now,
+                'summary': ' '.join(rng.choices(VOCABULARY, k=12)) if i % 4 == 0 else None,
+            })
+            contents.append(' '.join(rng.choices(VOCABULARY, k=rng.randint(40, 200))))
+        
+        with session_scope() as session:
+            ids = session.execute(insert(File).returning(File.id), rows).scalars().all()
+            session.execute(
+                update(file_search).where(file_search.c.rowid == bindparam('file_id'))
+                .values(content=bindparam('text')),
+                [{'file_id': file_id, 'text': text} for file_id, text in zip(ids, contents)]
+            )
+
+
+def typed_queries(rng, count):
+    """Texts to type: one or two words, or the tail of a file name"""
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(VOCABULARY))
+        elif kind < 0.8:
+            queries.append(' '.join(rng.sample(VOCABULARY, 2)))
+        else:
+            queries.append(f'{rng.choice(VOCABULARY)}_{rng.randint(1, 999)}')
+    return queries
+
+
+def replay_typing(worker, queries, chunk):
+    """Per-keystroke timings of the UI thread, the worker and full searches, counting keystrokes whose files differ"""
+    from app.models import get_session
+    from app.services.search_index import SearchIndex
+    
+    delivered = {}
+    arrived = threading.Event()
+    
+    def on_results(query, hits):
+        delivered['hits'] = hits
+        arrived.set()
+    
+    timings = {name: [] for name in ('submit', 'render', 'worker', 'full', 'worker_narrowed', 'full_narrowed')}
+    mismatches = 0
+    for text in queries:
+        previous = None
+        for length in range(1, len(text) + 1):
+            prefix = text[:length]
+            arrived.clear()
+            start = time.perf_counter()
+            worker.submit(prefix, on_results)
+            timings['submit'].append((time.perf_counter() - start) * 1000)
+            arrived.wait(30)
+            worker_ms = (time.perf_counter() - start) * 1000
+            
+            start = time.perf_counter()
+            full = SearchIndex._hits(get_session(), prefix, worker.limit)
+            full_ms = (time.perf_counter() - start) * 1000
+            
+            start = time.perf_counter()
+            SearchIndex.load_files(delivered['hits'][:chunk])
+            timings['render'].append((time.perf_counter() - start) * 1000)
+            
+            timings['worker'].append(worker_ms)
+            timings['full'].append(full_ms)
+            # The previous text's search found everything, so the worker narrowed it
+            if previous is not None and len(previous[1]) < worker.limit and SearchIndex.extends(previous[0], prefix):
+                timings['worker_narrowed'].append(worker_ms)
+                timings['full_narrowed'].append(full_ms)
+            previous = (prefix, full)
+            
+            if {file_id for file_id, _ in delivered['hits']} != {file_id for file_id, _ in full}:
+                mismatches += 1
+    
+    return {
+        'keystrokes': len(timings['worker']),
+        'narrowed': len(timings['worker_narrowed']),
+        'mismatches': mismatches,
+        **{f'{name}_{stat}_ms': round(percentile(values, pct), 2) if values else None
+           for name, values in timings.items() for stat, pct in (('p50', 50), ('p99', 99))},
+    }
+
+
+def time_cancellation(worker):
+    """Milliseconds from replacing a never-ending search to the replacement's results"""
+    from sqlalchemy import text
+    from app.models import get_session
+    from app.services.search_index import SearchIndex
+    
+    search_hits = SearchIndex.search_hits
+    
+    def stuck(query, limit=100):
+        if query == 'stuck':
+            get_session().execute(text(
+                "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT count(*) FROM n"
+            )).scalar()
+        return search_hits(query, limit)
+    
+    arrived = threading.Event()
+    SearchIndex.search_hits = staticmethod(stuck)
+    try:
+        worker.submit('stuck', lambda query, hits: None)
+        time.sleep(0.2)
+        start = time.perf_counter()
+        worker.submit(VOCABULARY[0], lambda query, hits: arrived.set())
+        arrived.wait(30)
+        return round((time.perf_counter() - start) * 1000, 2) if arrived.is_set() else None
+    finally:
+        SearchIndex.search_hits = staticmethod(search_hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=30, help='queries typed a character at a time')
+    parser.add_argument('--chunk', type=int, default=20, help='result rows SearchView renders at a time')
+    parser.add_argument('--max-ui-ms', type=float, default=16.0,
+                        help='fail above this UI thread p99 per keystroke, or cancellation time')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    # Point the catalog at a throwaway database
+    work_dir = tempfile.mkdtemp(prefix='filesense_typing_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    rng = random.Random(args.seed)
+    
+    worker = None
+    try:
+        from app.models import init_database
+        from app.services.search_cache import get_search_cache
+        from app.services.search_index import SearchWorker
+        init_database()
+        
+        print(f"Seeding {args.docs} documents...")
+        start = time.perf_counter()
+        seed_documents(args.docs, rng)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+        
+        # Every prefix is new to the cache, so hits there don't flatter the worker
+        get_search_cache().max_entries = 0
+        worker = SearchWorker()
+        results = replay_typing(worker, typed_queries(rng, args.queries), args.chunk)
+        results['cancel_ms'] = time_cancellation(worker)
+        
+        print(f"  {'':<24} {'p50 ms':>8} {'p99 ms':>8}   ({results['keystrokes']} keystrokes, "
+              f"{results['narrowed']} narrowed)")
+        for name, label in (('submit', 'UI: submit'), ('render', 'UI: load a chunk'),
+                            ('worker', 'worker, all'), ('full', 'full search, all'),
+                            ('worker_narrowed', 'worker, narrowed'), ('full_narrowed', 'full search, narrowed')):
+            print(f"  {label:<24} {results[f'{name}_p50_ms']!s:>8} {results[f'{name}_p99_ms']!s:>8}")
+        print(f"\n{results['mismatches']} keystrokes found different files than a full search")
+        print(f"Replacing a running search took {results['cancel_ms']} ms")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'search_as_you_type_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'results': results,
+                }, f, indent=2)
+            print(f"\nResults written to {args.output}")
+        
+        ui_ms = results['submit_p99_ms'] + results['render_p99_ms']
+        failed = (results['mismatches'] or results['cancel_ms'] is None
+                  or results['cancel_ms'] > args.max_ui_ms or ui_ms > args.max_ui_ms)
+    finally:
+        if worker is not None:
+            worker.close()
+        from app.models import database
+        if database._engine is not None:
+            database._engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
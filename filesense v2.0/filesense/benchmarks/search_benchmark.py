@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Benchmark
+Measures the FTS5 search index in two parts:
+
+1. Indexing: scans a synthetic corpus (see corpus.py) and runs the content
+   indexer over it, reporting files read per second and checking that
+   words only present inside documents are found.
+2. Querying: seeds the catalog with --docs files whose names, summaries,
+   tags and content are drawn from a Zipf-distributed vocabulary, then
+   times SearchIndex.search() for rare, common, prefix and multi-word
+   queries, with snippets.
+
+Exits non-zero if a query class's p99 latency exceeds --max-p99-ms or the
+indexer missed content, so it can gate changes to the index or the queries.
+
+Usage:
+    python benchmarks/search_benchmark.py [--docs 100000] [--files 500] [--max-p99-ms 50]
+"""
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY, generate_corpus, add_corpus_arguments, corpus_options
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_vocabulary(rng, size):
+    """The corpus words followed by pronounceable made-up ones"""
+    consonants, vowels = 'bcdfghklmnprstvz', 'aeiou'
+    words = list(VOCABULARY)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def benchmark_indexing(corpus_root):
+    """Scan a corpus and index its content, returning timings and a hit check"""
+    from app.services.file_service import FileService
+    from app.services.search_index import SearchIndex, ContentIndexer
+    
+    start = time.perf_counter()
+    scanned = len(FileService.scan_folder(corpus_root))
+    scan_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    indexed = ContentIndexer(batch_pause=0).index_pending()
+    index_seconds = time.perf_counter() - start
+    
+    # Corpus file names are numbered; these words only occur inside documents
+    found = {word: len(SearchIndex.search(word, 10)) for word in ('payroll', 'forecast', 'inventory')}
+    return {
+        'files': scanned,
+        'scan_seconds': round(scan_seconds, 2),
+        'indexed': indexed,
+        'index_seconds': round(index_seconds, 2),
+        'files_per_second': round(indexed / index_seconds) if index_seconds else None,
+        'pending_after': SearchIndex.pending_count(),
+        'content_hits': found,
+    }
+
+
+def seed_documents(docs, vocabulary, rng, batch_size=5000):
+    """
+    Insert docs files with Zipf-distributed names, summaries, tags and
+    content, returning the seconds taken and the file names
+    """
+    from sqlalchemy import insert, update, bindparam
+    from app.models import File, file_search, get_session, session_scope
+    from app.services.file_service import FileService
+    
+    # Cumulative weights, so choices() doesn't add up the vocabulary on every call
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    
+    def words(count):
+        return rng.choices(vocabulary, cum_weights=cumulative, k=count)
+    
+    names = []
+    
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    for first in range(0, docs, batch_size):
+        rows, contents = [], []
+        for i in range(first, min(docs, first + batch_size)):
+            name = '_'.join(words(rng.randint(1, 3))) + f'_{i}.txt'
+            names.append(name)
+            rows.append({
+                'name': name, 'path': f'/bench/{i % 97}/{name}', 'extension': '.txt', 'size': 1000,
+                'date_added': now - timedelta(minutes=i), 'last_modified': now, 'last_accessed': now,
+                'summary': ' '.join(words(12)) if i % 4 == 0 else None,
+            })
+            contents.append(' '.join(words(rng.randint(40, 400))))
+        
+        with session_scope() as session:
+            ids = session.execute(insert(File).returning(File.id), rows).scalars().all()
+            session.execute(
+                update(file_search).where(file_search.c.rowid == bindparam('file_id'))
+                .values(content=bindparam('text')),
+                [{'file_id': file_id, 'text': text} for file_id, text in zip(ids, contents)]
+            )
+    seed_seconds = time.perf_counter() - start
+    
+    # Put ten tags on 1% of the files each, so tag matches are in the mix
+    session = get_session()
+    file_ids = [row[0] for row in session.query(File.id).filter(File.path.like('/bench/%'))]
+    for tag in vocabulary[100:110]:
+        FileService.batch_add_tags(rng.sample(file_ids, len(file_ids) // 100), [tag])
+    return seed_seconds, names
+
+
+def query_mix(vocabulary, names, rng, count):
+    """Query class -> list of queries"""
+    common = vocabulary[:20]
+    middle = vocabulary[200:2000]
+    rare = vocabulary[-2000:]
+    return {
+        'rare word': [rng.choice(rare) for _ in range(count)],
+        'mid-frequency word': [rng.choice(middle) for _ in range(count)],
+        'common word': [rng.choice(common) for _ in range(count)],
+        'prefix': [rng.choice(middle)[:3] for _ in range(count)],
+        'two words': [f'{rng.choice(middle)} {rng.choice(vocabulary[:500])}' for _ in range(count)],
+        # A word of a file's name and its number, as in 'invoice 1234'
+        'name and number': [' '.join(name[:-4].split('_')[::-1][:2]) for name in rng.sample(names, count)],
+    }
+
+
+def benchmark_queries(queries, limit):
+    """Time SearchIndex.search() per query class"""
+    from app.services.search_index import SearchIndex
+    
+    results = {}
+    for name, texts in queries.items():
+        latencies, hits = [], 0
+        for query in texts:
+            start = time.perf_counter()
+            found = SearchIndex.search(query, limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += bool(found)
+        results[name] = {
+            'queries': len(texts),
+            'with_hits': hits,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_arguments(parser)
+    parser.set_defaults(files=500)
+    parser.add_argument('--docs', type=int, default=100000, help='documents to seed for the query timings')
+    parser.add_argument('--vocabulary', type=int, default=20000, help='distinct words in seeded documents')
+    parser.add_argument('--queries', type=int, default=200, help='queries per class')
+    parser.add_argument('--limit', type=int, default=100, help='results per query')
+    parser.add_argument('--max-p99-ms', type=float, default=50.0, help='fail above this p99 in any class')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    # Point the catalog at a throwaway database
+    work_dir = tempfile.mkdtemp(prefix='filesense_search_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    corpus_root = os.path.join(work_dir, 'corpus')
+    rng = random.Random(args.seed)
+    
+    try:
+        print(f"Generating {args.files} files...")
+        generate_corpus(corpus_root, **corpus_options(args))
+        
+        from app.models import init_database
+        init_database()
+        
+        indexing = benchmark_indexing(corpus_root)
+        print(f"\nIndexed content of {indexing['indexed']} files in {indexing['index_seconds']}s "
+              f"({indexing['files_per_second']} files/s), content hits {indexing['content_hits']}")
+        
+        vocabulary = make_vocabulary(rng, args.vocabulary)
+        print(f"\nSeeding {args.docs} documents...")
+        seed_seconds, names = seed_documents(args.docs, vocabulary, rng)
+        print(f"Seeded in {seed_seconds:.1f}s ({args.docs / seed_seconds:.0f} docs/s)\n")
+        
+        results = benchmark_queries(query_mix(vocabulary, names, rng, args.queries), args.limit)
+        print(f"  {'query':<20} {'hits':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, r in results.items():
+            print(f"  {name:<20} {r['with_hits']:>4}/{r['queries']:<4} {r['p50_ms']:>8} "
+                  f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'search_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'indexing': indexing,
+                    'seed_seconds': round(seed_seconds, 2),
+                    'results': results,
+                }, f, indent=2)
+            print(f"\nResults written to {args.output}")
+        
+        failed = (indexing['pending_after'] or not all(indexing['content_hits'].values())
+                  or any(r['p99_ms'] > args.max_p99_ms for r in results.values()))
+    finally:
+        from app.models import database
+        if database._engine is not None:
+            database._engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Search Cache Benchmark
+Replays a search workload against both editions with their result caches
+(the desktop SearchCache behind SearchIndex.search(), the web app's behind
+search_files() and fetch_files()) and compares it with the same workload
+run uncached.
+
+Queries are drawn from --distinct queries with Zipf-distributed
+popularity, as repeated searches, polling and navigation produce. Every
+--write-every lookups a file is tagged, which starts a new catalog
+generation; each cached answer is checked against a fresh query, so a
+stale hit shows up as a mismatch.
+
+Exits non-zero if any cached answer differs from the uncached one.
+
+Usage:
+    python benchmarks/search_cache_benchmark.py [--files 50000] [--lookups 2000] [--write-every 200]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import itertools
+import importlib.util
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DESKTOP_DIR = os.path.dirname(BENCHMARK_DIR)
+WEB_APP = os.path.normpath(os.path.join(DESKTOP_DIR, '..', '..', 'filesense', 'FileSense', 'app.py'))
+
+sys.path.insert(0, DESKTOP_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY
+
+
+def load_web_app(path):
+    """Import the web app module by path (its name clashes with the desktop app package)"""
+    spec = importlib.util.spec_from_file_location('filesense_web', os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def median(values):
+    """Middle value of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def make_names(start, stop):
+    """Deterministic file names for rows start..stop"""
+    rng = random.Random(start)
+    return [f'{rng.choice(VOCABULARY)}_{rng.choice(VOCABULARY)}_{i}.txt' for i in range(start, stop)]
+
+
+def seed_desktop(files, batch_size=20000):
+    """Fill the desktop catalog"""
+    from sqlalchemy import insert
+    from app.models import File, session_scope
+    
+    now = datetime.utcnow()
+    for first in range(0, files, batch_size):
+        rows = [{'name': name, 'path': f'/bench/{i % 500}/{name}', 'extension': '.txt', 'size': 1000,
+                 'date_added': now, 'last_modified': now, 'last_accessed': now}
+                for i, name in enumerate(make_names(first, min(files, first + batch_size)), first)]
+        with session_scope() as session:
+            session.execute(insert(File), rows)
+
+
+def seed_web(web, files, batch_size=20000):
+    """Fill the web catalog"""
+    now = datetime.now()
+    db = web.get_db()
+    try:
+        for first in range(0, files, batch_size):
+            db.executemany(
+                'INSERT INTO files (path, filename, extension, size, modified_date) VALUES (?, ?, ?, ?, ?)',
+                [(f'/bench/{i % 500}/{name}', name, '.txt', 1000, now - timedelta(minutes=i))
+                 for i, name in enumerate(make_names(first, min(files, first + batch_size)), first)]
+            )
+            db.commit()
+    finally:
+        db.close()
+
+
+def workload(rng, distinct, lookups):
+    """lookups queries drawn from distinct ones, the most popular first"""
+    queries = [' '.join(rng.sample(VOCABULARY, rng.randint(1, 2))) for _ in range(distinct)]
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, distinct + 1)))
+    return rng.choices(queries, cum_weights=cumulative, k=lookups)
+
+
+def desktop_edition():
+    """(cached search, uncached search, write) for the desktop catalog"""
+    from app.models import get_session
+    from app.services import FileService, SearchIndex
+    
+    def ids(results):
+        return [(f.id, snippet) for f, snippet in results]
+    
+    def uncached(query):
+        return list(SearchIndex._hits(get_session(), query, 100))
+    
+    def write(file_id, tag):
+        FileService.batch_add_tags([file_id], [tag])
+    
+    return (lambda q: ids(SearchIndex.search(q))), uncached, write
+
+
+def web_edition(web):
+    """(cached search, uncached search, write) for the web catalog"""
+    def cached(query):
+        ranked = web.search_files(query)
+        listed = web.fetch_files(query=query)
+        return [row['id'] for row in ranked], [row['id'] for row in listed]
+    
+    def uncached(query):
+        cache, web._search_cache = web._search_cache, web.SearchCache(0, 0)
+        try:
+            ranked = web.search_files(query)
+            listed = web.fetch_files(query=query)
+        finally:
+            web._search_cache = cache
+        return [row['id'] for row in ranked], [row['id'] for row in listed]
+    
+    def write(file_id, tag):
+        web.apply_tags_to_file(file_id, [tag])
+    
+    return cached, uncached, write
+
+
+def replay(edition, queries, write_every, files, rng):
+    """Time a workload cached and uncached, counting cached answers that differ"""
+    cached, uncached, write = edition
+    timings = {'cached': [], 'uncached': []}
+    mismatches = 0
+    for i, query in enumerate(queries):
+        if i and i % write_every == 0:
+            write(rng.randint(1, files), rng.choice(VOCABULARY))
+        for name, search in (('cached', cached), ('uncached', uncached)):
+            start = time.perf_counter()
+            result = search(query)
+            timings[name].append((time.perf_counter() - start) * 1000)
+            if name == 'cached':
+                answer = result
+        mismatches += answer != result
+    return {
+        'cached_ms': round(median(timings['cached']), 3),
+        'uncached_ms': round(median(timings['uncached']), 3),
+        'cached_total_s': round(sum(timings['cached']) / 1000, 2),
+        'uncached_total_s': round(sum(timings['uncached']) / 1000, 2),
+        'mismatches': mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=50000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--distinct', type=int, default=200, help='distinct queries in the workload')
+    parser.add_argument('--write-every', type=int, default=200, help='lookups between catalog writes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--web-app', default=WEB_APP, help='path to the web app.py')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    # Point both catalogs at throwaway databases
+    work_dir = tempfile.mkdtemp(prefix='filesense_cache_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    rng = random.Random(args.seed)
+    
+    results = {}
+    try:
+        from app.models import init_database
+        from app.services import get_search_cache
+        init_database()
+        web = load_web_app(args.web_app)
+        web.app.config['DATABASE'] = os.path.join(work_dir, 'web.db')
+        web.init_db()
+        
+        print(f"Seeding {args.files} files in each edition...")
+        seed_desktop(args.files)
+        seed_web(web, args.files)
+        queries = workload(rng, args.distinct, args.lookups)
+        
+        for name, edition, cache in (('desktop', desktop_edition(), get_search_cache()),
+                                     ('web', web_edition(web), web.get_search_cache())):
+            results[name] = replay(edition, queries, args.write_every, args.files, rng)
+            results[name]['cache'] = cache.stats()
+        
+        print(f"\n  {'edition':<8} {'cached ms':>10} {'uncached ms':>12} {'hit rate':>9} {'evictions':>10} "
+              f"{'invalidated':>12} {'stale':>6}   (median per lookup)")
+        for name, r in results.items():
+            cache = r['cache']
+            print(f"  {name:<8} {r['cached_ms']:>10} {r['uncached_ms']:>12} {cache['hit_rate']:>9} "
+                  f"{cache['evictions']:>10} {cache['invalidations']:>12} {r['mismatches']:>6}")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'search_cache_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'results': results,
+                }, f, indent=2)
+            print(f"\nResults written to {args.output}")
+    finally:
+        from app.models import database
+        if database._engine is not None:
+            database._engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if any(r['mismatches'] for r in results.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
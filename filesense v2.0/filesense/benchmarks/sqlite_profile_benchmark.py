@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+SQLite Profile Benchmark
+Compares catalog write and read throughput under each SQLITE_PROFILES entry
+(see app/models/database.py). Every profile gets a fresh database created
+through create_sqlite_engine, so the numbers include the connect hook.
+
+Phases:
+    batch_insert    file rows inserted in scan-sized transactions
+    single_commits  one row per transaction, like tag and activity writes
+    point_lookups   lookups by path
+    name_search     LIKE searches on the file name
+    aggregate       file counts grouped by extension
+    read_during_write  reads from a second connection while a writer commits
+
+Usage:
+    python benchmarks/sqlite_profile_benchmark.py [--rows 50000] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.exc import OperationalError
+from app.models.database import Base, File, SQLITE_PROFILES, create_sqlite_engine
+
+WORDS = ['budget', 'report', 'invoice', 'meeting', 'project', 'summary', 'draft', 'notes']
+EXTENSIONS = ['.txt', '.pdf', '.docx', '.xlsx', '.png', '.py']
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        ext = rng.choice(EXTENSIONS)
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i:07d}{ext}"
+        rows.append({
+            'name': name,
+            'path': f"/bench/{i % 997:03d}/{name}",
+            'extension': ext,
+            'size': rng.randint(100, 10_000_000),
+            'date_added': now,
+            'last_modified': now,
+            'last_accessed': now,
+        })
+    return rows
+
+
+def timed(func):
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    return {'seconds': round(elapsed, 4), 'operations': count,
+            'per_second': round(count / elapsed, 1) if elapsed else None}
+
+
+def run_profile(profile, work_dir, args):
+    db_path = os.path.join(work_dir, f'{profile}.db')
+    engine = create_sqlite_engine(db_path, profile)
+    Base.metadata.create_all(engine)
+    files = File.__table__
+    rows = make_rows(args.rows, args.seed)
+    rng = random.Random(args.seed)
+    results = {}
+    
+    def batch_insert():
+        with engine.connect() as conn:
+            for i in range(0, len(rows), args.batch_size):
+                conn.execute(insert(files), rows[i:i + args.batch_size])
+                conn.commit()
+        return len(rows)
+    
+    def single_commits():
+        extra = make_rows(args.single_commits, args.seed + 1)
+        with engine.connect() as conn:
+            for row in extra:
+                row['path'] = '/single' + row['path']
+                conn.execute(insert(files), row)
+                conn.commit()
+        return len(extra)
+    
+    def point_lookups():
+        paths = [rng.choice(rows)['path'] for _ in range(args.lookups)]
+        with engine.connect() as conn:
+            for path in paths:
+                conn.execute(select(files.c.id).where(files.c.path == path)).first()
+        return len(paths)
+    
+    def name_search():
+        with engine.connect() as conn:
+            for _ in range(args.searches):
+                conn.execute(select(files.c.id).where(files.c.name.like(f"%{rng.choice(WORDS)}%"))
+                             .limit(50)).all()
+        return args.searches
+    
+    def aggregate():
+        with engine.connect() as conn:
+            for _ in range(args.aggregates):
+                conn.execute(select(files.c.extension, func.count()).group_by(files.c.extension)).all()
+        return args.aggregates
+    
+    def read_during_write():
+        extra = make_rows(args.rows // 5, args.seed + 2)
+        done = threading.Event()
+        errors = []
+        
+        def writer():
+            try:
+                with engine.connect() as conn:
+                    for i in range(0, len(extra), args.batch_size):
+                        batch = extra[i:i + args.batch_size]
+                        for row in batch:
+                            row['path'] = '/concurrent' + row['path']
+                        conn.execute(insert(files), batch)
+                        conn.commit()
+            except OperationalError as e:
+                errors.append(str(e.orig))
+            finally:
+                done.set()
+        
+        reads = 0
+        thread = threading.Thread(target=writer)
+        thread.start()
+        with engine.connect() as conn:
+            while not done.is_set():
+                try:
+                    conn.execute(select(func.count()).select_from(files)).scalar()
+                    conn.rollback()
+                    reads += 1
+                except OperationalError as e:
+                    errors.append(str(e.orig))
+        thread.join()
+        results['read_during_write_errors'] = len(errors)
+        return reads
+    
+    for name, func_ in [('batch_insert', batch_insert), ('single_commits', single_commits),
+                        ('point_lookups', point_lookups), ('name_search', name_search),
+                        ('aggregate', aggregate), ('read_during_write', read_during_write)]:
+        results[name] = timed(func_)
+        print(f"  {profile:<12} {name:<18} {results[name]['seconds']:8.3f}s  "
+              f"{results[name]['per_second']:>12} ops/s")
+    
+    with engine.connect() as conn:
+        results['pragmas'] = {
+            pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+            for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+        }
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=list(SQLITE_PROFILES), default=list(SQLITE_PROFILES))
+    parser.add_argument('--rows', type=int, default=50000, help='rows for the batched insert')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per transaction')
+    parser.add_argument('--single-commits', type=int, default=500, help='one-row transactions')
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--searches', type=int, default=200)
+    parser.add_argument('--aggregates', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--dir', help='directory for the databases (default: a temp dir); '
+                                      'use the drive the catalog lives on for realistic fsync costs')
+    parser.add_argument('--output', default='sqlite_profile_results.json', help='JSON results file')
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='filesense_sqlite_', dir=args.dir)
+    try:
+        results = {profile: run_profile(profile, work_dir, args) for profile in args.profiles}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    report = {
+        'benchmark': 'sqlite_profile_benchmark',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'options': {k: v for k, v in vars(args).items() if k != 'output'},
+        'profiles': {name: SQLITE_PROFILES[name] for name in args.profiles},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Substring Search Benchmark
+Compares substring name searches through the trigram index against the
+LIKE '%...%' scans they replace, in both editions:
+
+- desktop: files whose name contains the text (FileService's name filter,
+  SearchIndex.name_contains) against File.name LIKE
+- web: fetch_files() against its former LOWER(filename/path/summary) LIKE query
+
+The catalogs grow through each of --sizes in turn; at every size it times
+selective substrings (a slice of one file's name), common ones (part of a
+frequent word) and misses, for the first page of results and for all
+matches, and checks both paths return the same files.
+
+Exits non-zero if the two paths disagree.
+
+Usage:
+    python benchmarks/substring_search_benchmark.py [--sizes 10000 100000 1000000] [--queries 20]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DESKTOP_DIR = os.path.dirname(BENCHMARK_DIR)
+WEB_APP = os.path.normpath(os.path.join(DESKTOP_DIR, '..', '..', 'filesense', 'FileSense', 'app.py'))
+
+sys.path.insert(0, DESKTOP_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY
+
+EXTENSIONS = ['.pdf', '.docx', '.xlsx', '.txt', '.png']
+
+# The web app's file list query before the trigram index
+WEB_LIKE_SQL = """
+    SELECT f.*, GROUP_CONCAT(t.tag_name, ',') as tags, s.summary
+    FROM files f
+    LEFT JOIN file_tags ft ON f.id = ft.file_id
+    LEFT JOIN tags t ON ft.tag_id = t.id
+    LEFT JOIN summaries s ON f.id = s.file_id
+    WHERE (LOWER(f.filename) LIKE ? OR LOWER(f.path) LIKE ? OR LOWER(s.summary) LIKE ?)
+    GROUP BY f.id ORDER BY f.modified_date DESC LIMIT ?
+"""
+
+
+def load_web_app(path):
+    """Import the web app module by path (its name clashes with the desktop app package)"""
+    spec = importlib.util.spec_from_file_location('filesense_web', os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def median(values):
+    """Middle value of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def make_names(start, stop):
+    """Deterministic (name, folder) pairs for rows start..stop"""
+    rng = random.Random(start)
+    return [(f'{rng.choice(VOCABULARY)}_{rng.choice(VOCABULARY)}_{2015 + i % 10}_{i}{EXTENSIONS[i % 5]}',
+             f'/bench/{rng.choice(VOCABULARY)}/{i % 1000}')
+            for i in range(start, stop)]
+
+
+def grow_desktop(start, stop, batch_size=20000):
+    """Add rows start..stop to the desktop catalog"""
+    from sqlalchemy import insert
+    from app.models import File, session_scope
+    
+    now = datetime.utcnow()
+    for first in range(start, stop, batch_size):
+        rows = [{'name': name, 'path': f'{folder}/{name}', 'extension': name[name.rindex('.'):],
+                 'size': 1000, 'date_added': now, 'last_modified': now, 'last_accessed': now}
+                for name, folder in make_names(first, min(stop, first + batch_size))]
+        with session_scope() as session:
+            session.execute(insert(File), rows)
+
+
+def grow_web(web, start, stop, batch_size=20000):
+    """Add rows start..stop to the web catalog"""
+    now = datetime.now()
+    db = web.get_db()
+    try:
+        for first in range(start, stop, batch_size):
+            db.executemany(
+                'INSERT INTO files (path, filename, extension, size, modified_date) VALUES (?, ?, ?, ?, ?)',
+                [(f'{folder}/{name}', name, name[name.rindex('.'):], 1000, now - timedelta(minutes=i))
+                 for i, (name, folder) in enumerate(make_names(first, min(stop, first + batch_size)), first)]
+            )
+            db.commit()
+    finally:
+        db.close()
+
+
+def query_classes(size, count, rng):
+    """Query class -> substrings to search for"""
+    selective = []
+    for name, _ in (make_names(i, i + 1)[0] for i in rng.sample(range(size), count)):
+        # A slice through the year and number, e.g. 'get_2019_48'
+        cut = name.index('_20') - rng.randint(1, 3)
+        selective.append(name[cut:cut + rng.randint(8, 12)])
+    return {
+        'selective': selective,
+        'common': [rng.choice(VOCABULARY)[1:5] for _ in range(count)],
+        'miss': [f'qz{rng.randint(100, 999)}x' for _ in range(count)],
+    }
+
+
+def timed(function):
+    """(milliseconds, result) of one call"""
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def desktop_paths(session):
+    """Path name -> (first page, all matches) query functions for the desktop catalog"""
+    from app.models import File
+    from app.services.search_index import SearchIndex
+    
+    def page(clause):
+        return lambda q: [f.id for f in session.query(File).filter(clause(q)).order_by(File.id).limit(50)]
+    
+    def every(clause):
+        return lambda q: {row[0] for row in session.query(File.id).filter(clause(q))}
+    
+    like = lambda q: File.name.like(f'%{q}%')
+    return {
+        'LIKE': (page(like), every(like)),
+        'trigram': (page(SearchIndex.name_contains), every(SearchIndex.name_contains)),
+    }
+
+
+def web_paths(web):
+    """Path name -> (first page, all matches) query functions for the web catalog"""
+    def like_rows(q, limit):
+        db = web.get_db()
+        try:
+            pattern = f'%{q.lower()}%'
+            return [row['id'] for row in db.execute(WEB_LIKE_SQL, (pattern, pattern, pattern, limit))]
+        finally:
+            db.close()
+    
+    def trigram_rows(q, limit):
+        return [row['id'] for row in web.fetch_files(query=q, limit=limit)]
+    
+    return {
+        'LIKE': (lambda q: like_rows(q, 50), lambda q: set(like_rows(q, -1))),
+        'trigram': (lambda q: trigram_rows(q, 50), lambda q: set(trigram_rows(q, -1))),
+    }
+
+
+def measure(paths, classes):
+    """Time every path on every query class, counting queries where the paths disagree"""
+    results, mismatches = {}, 0
+    for class_name, queries in classes.items():
+        row = {}
+        for path_name, (page, every) in paths.items():
+            row[path_name] = {
+                'page_ms': round(median([timed(lambda: page(q))[0] for q in queries]), 2),
+                'all_ms': round(median([timed(lambda: every(q))[0] for q in queries]), 2),
+            }
+        for q in queries:
+            if paths['LIKE'][1](q) != paths['trigram'][1](q):
+                mismatches += 1
+        row['matches'] = median([len(paths['trigram'][1](q)) for q in queries])
+        results[class_name] = row
+    return results, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=20, help='queries per class')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--web-app', default=WEB_APP, help='path to the web app.py')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    # Point both catalogs at throwaway databases
+    work_dir = tempfile.mkdtemp(prefix='filesense_substring_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = work_dir
+    rng = random.Random(args.seed)
+    
+    results, mismatches = {}, 0
+    try:
+        from app.models import init_database, get_session
+        init_database()
+        web = load_web_app(args.web_app)
+        web.app.config['DATABASE'] = os.path.join(work_dir, 'web.db')
+        web.init_db()
+        
+        size_so_far = 0
+        for size in sorted(args.sizes):
+            print(f"\nGrowing both catalogs to {size} files...")
+            start = time.perf_counter()
+            grow_desktop(size_so_far, size)
+            grow_web(web, size_so_far, size)
+            size_so_far = size
+            print(f"  added in {time.perf_counter() - start:.1f}s")
+            
+            classes = query_classes(size, args.queries, rng)
+            session = get_session()
+            results[size] = {}
+            for edition, paths in (('desktop', desktop_paths(session)), ('web', web_paths(web))):
+                results[size][edition], wrong = measure(paths, classes)
+                mismatches += wrong
+            
+            print(f"  {'edition':<8} {'query':<10} {'matches':>8} {'LIKE page':>10} {'tri page':>9} "
+                  f"{'LIKE all':>9} {'tri all':>8} {'speedup':>8}   (median ms)")
+            for edition, by_class in results[size].items():
+                for class_name, r in by_class.items():
+                    like, tri = r['LIKE'], r['trigram']
+                    speedup = like['all_ms'] / tri['all_ms'] if tri['all_ms'] else float('inf')
+                    print(f"  {edition:<8} {class_name:<10} {r['matches']:>8} {like['page_ms']:>10} "
+                          f"{tri['page_ms']:>9} {like['all_ms']:>9} {tri['all_ms']:>8} {speedup:>7.1f}x")
+        
+        print(f"\n{'No' if not mismatches else mismatches} queries where LIKE and the trigram index disagree")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'substring_search_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'results': results,
+                    'mismatches': mismatches,
+                }, f, indent=2)
+            print(f"Results written to {args.output}")
+    finally:
+        from app.models import database
+        if database._engine is not None:
+            database._engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
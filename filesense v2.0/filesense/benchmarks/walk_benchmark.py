@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Directory Walk Benchmark
+Compares the old os.walk + os.stat traversal with DirectoryWalker on a
+synthetic tree, adding a fixed delay to every readdir/stat call to
+simulate a network filesystem (NFS/SMB).
+
+Usage:
+    python benchmarks/walk_benchmark.py [--latency-ms 2] [--dirs 200] [--files-per-dir 10]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.directory_walker import DirectoryWalker
+
+
+class SlowEntry:
+    """DirEntry wrapper whose stat() pays the simulated latency"""
+    
+    def __init__(self, entry, latency):
+        self._entry = entry
+        self._latency = latency
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+    
+    def is_dir(self, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+    
+    def is_file(self, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+    
+    def is_symlink(self):
+        return self._entry.is_symlink()
+    
+    def stat(self, follow_symlinks=True):
+        if self._stat is None:
+            time.sleep(self._latency)
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+class SlowScandir:
+    """os.scandir replacement that sleeps once per directory listing"""
+    
+    def __init__(self, real_scandir, latency):
+        self.real_scandir = real_scandir
+        self.latency = latency
+    
+    def __call__(self, path='.'):
+        time.sleep(self.latency)
+        it = self.real_scandir(path)
+        return _SlowIterator(it, self.latency)
+
+
+class _SlowIterator:
+    def __init__(self, it, latency):
+        self._it = it
+        self._latency = latency
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        return SlowEntry(next(self._it), self._latency)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self._it.close()
+    
+    def close(self):
+        self._it.close()
+
+
+def build_tree(root, dirs, files_per_dir, fan_out=5):
+    """Create a tree of `dirs` directories, each holding `files_per_dir` small files"""
+    paths = [root]
+    created = 0
+    index = 0
+    while created < dirs:
+        parent = paths[index // fan_out]
+        path = os.path.join(parent, f"dir_{created:05d}")
+        os.makedirs(path)
+        paths.append(path)
+        for i in range(files_per_dir):
+            with open(os.path.join(path, f"file_{i:03d}.txt"), 'w') as f:
+                f.write(f"{created}-{i}")
+        created += 1
+        index += 1
+
+
+def walk_baseline(root, latency):
+    """The previous traversal: os.walk, then os.stat per file"""
+    count = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            time.sleep(latency)
+            os.stat(os.path.join(dirpath, filename))
+            count += 1
+    return count
+
+
+def walk_with(root, workers, ordered=False):
+    """Traverse with DirectoryWalker, reading each file's stat like the scanners do"""
+    walker = DirectoryWalker(root, workers=workers, ordered=ordered, stat=True)
+    count = 0
+    for entry in walker.walk():
+        entry.stat()
+        count += 1
+    return count
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    count = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {count:>7} files  {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='simulated latency per readdir/stat call')
+    parser.add_argument('--dirs', type=int, default=200, help='number of directories')
+    parser.add_argument('--files-per-dir', type=int, default=10, help='files in each directory')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+    
+    latency = args.latency_ms / 1000.0
+    root = tempfile.mkdtemp(prefix='filesense_walk_')
+    
+    try:
+        build_tree(root, args.dirs, args.files_per_dir)
+        print(f"Tree: {args.dirs} dirs x {args.files_per_dir} files, {args.latency_ms} ms per call\n")
+        
+        real_scandir = os.scandir
+        os.scandir = SlowScandir(real_scandir, latency)
+        try:
+            baseline = timed("os.walk + os.stat (previous)", walk_baseline, root, latency)
+            for workers in args.workers:
+                elapsed = timed(f"DirectoryWalker workers={workers}", walk_with, root, workers)
+                print(f"  {'':<38} speedup x{baseline / elapsed:.1f}")
+            elapsed = timed(f"DirectoryWalker ordered workers={max(args.workers)}",
+                            walk_with, root, max(args.workers), True)
+            print(f"  {'':<38} speedup x{baseline / elapsed:.1f}")
+        finally:
+            os.scandir = real_scandir
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Web Search Benchmark
+Times the web app's search_files() against the per-keyword search it
+replaced, as queries grow from one keyword to --max-keywords.
+
+The former search ran one four-table LEFT JOIN ... GROUP BY per keyword and
+merged the results with a list scan; the current one answers every keyword
+with a single ranked query on the file_search index, topped up with
+filename substring matches from file_trigrams. The catalog is seeded
+with --files files whose names, tags and summaries are drawn from the
+corpus vocabulary plus rarer made-up words.
+
+Exits non-zero if the current search's median latency for any keyword count
+exceeds --max-ms.
+
+Usage:
+    python benchmarks/web_search_benchmark.py [--files 100000] [--max-keywords 8] [--queries 20]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DESKTOP_DIR = os.path.dirname(BENCHMARK_DIR)
+WEB_APP = os.path.normpath(os.path.join(DESKTOP_DIR, '..', '..', 'filesense', 'FileSense', 'app.py'))
+
+sys.path.insert(0, BENCHMARK_DIR)
+
+from corpus import VOCABULARY
+
+
+def load_web_app(path):
+    """Import the web app module by path (its name clashes with the desktop app package)"""
+    spec = importlib.util.spec_from_file_location('filesense_web', os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def median(values):
+    """Middle value of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def legacy_search_files(web, query, limit=20):
+    """The web search as it was: one grouped join per keyword, deduplicated by list scans"""
+    db = web.get_db()
+    keywords = query.lower().split()
+    results = []
+    for keyword in keywords:
+        rows = db.execute('''
+            SELECT DISTINCT f.*, GROUP_CONCAT(t.tag_name, ',') as tags, s.summary
+            FROM files f
+            LEFT JOIN file_tags ft ON f.id = ft.file_id
+            LEFT JOIN tags t ON ft.tag_id = t.id
+            LEFT JOIN summaries s ON f.id = s.file_id
+            WHERE LOWER(f.filename) LIKE ? OR LOWER(s.summary) LIKE ? OR LOWER(t.tag_name) LIKE ?
+            GROUP BY f.id
+            LIMIT ?
+        ''', (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%', limit)).fetchall()
+        for row in rows:
+            if row['id'] not in [r['id'] for r in results]:
+                results.append(dict(row))
+    db.close()
+    return results[:limit]
+
+
+def make_words(rng, count):
+    """Made-up words that each occur in only a few files"""
+    consonants, vowels = 'bcdfghklmnprstvz', 'aeiou'
+    return [''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(3)) for _ in range(count)]
+
+
+def seed(web, files, rng, batch_size=20000):
+    """Fill the web catalog with files, tags on a third of them and summaries on a fifth"""
+    rare = make_words(rng, max(100, files // 20))
+    vocabulary = VOCABULARY + rare
+    now = datetime.now()
+    db = web.get_db()
+    try:
+        db.executemany('INSERT OR IGNORE INTO tags (tag_name) VALUES (?)', [(word,) for word in vocabulary])
+        tag_ids = dict(db.execute('SELECT tag_name, id FROM tags'))
+        for first in range(0, files, batch_size):
+            rows, links, summaries = [], [], []
+            for i in range(first, min(files, first + batch_size)):
+                name = f'{rng.choice(VOCABULARY)}_{rng.choice(rare)}_{i}.txt'
+                rows.append((i + 1, f'/bench/{i % 500}/{name}', name, '.txt', 1000, now - timedelta(minutes=i)))
+                if i % 3 == 0:
+                    links.extend({(i + 1, tag_ids[rng.choice(vocabulary)]) for _ in range(2)})
+                if i % 5 == 0:
+                    summaries.append((i + 1, ' '.join(rng.choice(vocabulary) for _ in range(15))))
+            db.executemany('INSERT INTO files (id, path, filename, extension, size, modified_date) '
+                           'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            db.executemany('INSERT OR IGNORE INTO file_tags (file_id, tag_id) VALUES (?, ?)', links)
+            db.executemany('INSERT INTO summaries (file_id, summary) VALUES (?, ?)', summaries)
+            db.commit()
+    finally:
+        db.close()
+    return vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--max-keywords', type=int, default=8)
+    parser.add_argument('--queries', type=int, default=20, help='queries per keyword count')
+    parser.add_argument('--max-ms', type=float, default=20.0, help='fail above this median for any keyword count')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--web-app', default=WEB_APP, help='path to the web app.py')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='filesense_websearch_')
+    rng = random.Random(args.seed)
+    results = {}
+    try:
+        web = load_web_app(args.web_app)
+        web.app.config['DATABASE'] = os.path.join(work_dir, 'web.db')
+        web.init_db()
+        
+        print(f"Seeding {args.files} files...")
+        start = time.perf_counter()
+        vocabulary = seed(web, args.files, rng)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+        
+        print(f"  {'keywords':>8} {'legacy ms':>10} {'ranked ms':>10} {'speedup':>8}   (median)")
+        for count in range(1, args.max_keywords + 1):
+            queries = [' '.join(rng.sample(vocabulary, count)) for _ in range(args.queries)]
+            timings = {}
+            for name, search in (('legacy', lambda q: legacy_search_files(web, q)),
+                                 ('ranked', lambda q: web.search_files(q))):
+                latencies = []
+                for query in queries:
+                    start = time.perf_counter()
+                    search(query)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                timings[name] = round(median(latencies), 2)
+            results[count] = timings
+            print(f"  {count:>8} {timings['legacy']:>10} {timings['ranked']:>10} "
+                  f"{timings['legacy'] / timings['ranked']:>7.1f}x")
+        
+        slowest = max(timings['ranked'] for timings in results.values())
+        print(f"\nSlowest ranked median: {slowest} ms")
+        
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'benchmark': 'web_search_benchmark',
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'options': {k: v for k, v in vars(args).items() if k != 'output'},
+                    'results': results,
+                }, f, indent=2)
+            print(f"Results written to {args.output}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    sys.exit(1 if slowest > args.max_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
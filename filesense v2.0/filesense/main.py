@@ -5,6 +5,7 @@ Main application entry point
 """
 import sys
 import os
+import logging
 import customtkinter as ctk
 from app.views.dashboard import DashboardView
 from app.views.search import SearchView
@@ -18,6 +19,8 @@ from app.views.settings import SettingsView
 from app.views.duplicate_finder import DuplicateFinderView
 from app.views.smart_folders import SmartFoldersView
 from app.models import init_database
+from app.services.activity_logger import get_activity_logger
+from app.services.search_index import get_content_indexer
 
 class FileSenseApp(ctk.CTk):
     """Main FileSense Application"""
@@ -39,6 +42,12 @@ class FileSenseApp(ctk.CTk):
         # Initialize database
         init_database()
         
+        # Trim old activity history in the background
+        get_activity_logger().start_compactor()
+        
+        # Fill in the full-text index with the content of new and changed files
+        get_content_indexer().start()
+        
         # Configure grid
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -172,10 +181,10 @@ class FileSenseApp(ctk.CTk):
         self.current_view.grid(row=0, column=0, sticky="nsew")
         self.set_active_button(self.btn_dashboard)
     
-    def show_search(self):
-        """Show search view"""
+    def show_search(self, query=None):
+        """Show search view, running query if given"""
         self.clear_main_frame()
-        self.current_view = SearchView(self.main_frame, self)
+        self.current_view = SearchView(self.main_frame, self, query)
         self.current_view.grid(row=0, column=0, sticky="nsew")
         self.set_active_button(self.btn_search)
     
@@ -244,11 +253,14 @@ class FileSenseApp(ctk.CTk):
     
     def on_closing(self):
         """Handle application close"""
+        get_activity_logger().close()
         self.destroy()
 
 
 def main():
     """Main application entry point"""
+    # Scan progress and failures are logged, next to the console's other messages
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
     app = FileSenseApp()
     app.mainloop()
 
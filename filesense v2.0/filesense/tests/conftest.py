@@ -0,0 +1,34 @@
+"""
+Shared fixtures: every test gets its own throwaway catalog
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """A migrated, empty catalog under a temporary home directory; yields this thread's session"""
+    from app.models import database
+    from app.services import activity_logger, search_cache
+    
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    monkeypatch.setattr(database, '_engine', None)
+    monkeypatch.setattr(database, '_sessions', None)
+    monkeypatch.setattr(activity_logger, '_activity_logger', None)
+    monkeypatch.setattr(search_cache, '_search_cache', None)
+    
+    session = database.init_database()
+    try:
+        yield session
+    finally:
+        if activity_logger._activity_logger is not None:
+            activity_logger._activity_logger.close()
+        database.remove_session()
+        database._engine.dispose()
@@ -0,0 +1,112 @@
+"""
+Buffered activity logging, retention and compaction
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import File, ActivityLog, Settings, get_session, session_scope
+from app.services.activity_logger import ActivityLogger, RetentionPolicy
+
+
+@pytest.fixture
+def files(catalog):
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': f'f{i}', 'path': f'/f{i}'} for i in range(3)])
+    return [file_id for file_id, in get_session().query(File.id).order_by(File.id)]
+
+
+@pytest.fixture
+def logger():
+    logger = ActivityLogger(flush_interval=60, chunk_size=3, chunk_pause=0)
+    yield logger
+    logger.close()
+
+
+def add_entries(file_id, ages_in_days, activity_type='Opened'):
+    now = datetime.utcnow()
+    with session_scope() as session:
+        session.execute(insert(ActivityLog), [
+            {'file_id': file_id, 'activity_type': activity_type, 'description': f'{age}',
+             'timestamp': now - timedelta(days=age)} for age in ages_in_days
+        ])
+
+
+def remaining(file_id):
+    """Ages in days of a file's entries, newest first"""
+    return [int(description) for description, in get_session().query(ActivityLog.description).filter(
+        ActivityLog.file_id == file_id).order_by(ActivityLog.timestamp.desc())]
+
+
+def test_entries_are_buffered_until_flushed(files, logger):
+    for i in range(5):
+        logger.log(files[0], 'Tagged', f'{i}')
+    assert len(logger.pending()) == 5
+    assert remaining(files[0]) == []
+    
+    assert logger.flush() == 5
+    assert logger.pending() == []
+    assert sorted(remaining(files[0])) == [0, 1, 2, 3, 4]
+
+
+def test_close_writes_the_buffer(files):
+    logger = ActivityLogger(flush_interval=60)
+    logger.log(files[0], 'Tagged', '7')
+    logger.log(files[1], 'Moved', '8')
+    logger.close()
+    assert remaining(files[0]) == [7]
+    assert remaining(files[1]) == [8]
+
+
+def test_full_buffer_wakes_the_writer(files):
+    logger = ActivityLogger(batch_size=3, flush_interval=60)
+    try:
+        for i in range(3):
+            logger.log(files[0], 'Tagged', f'{i}')
+        deadline = time.monotonic() + 5
+        while logger.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(remaining(files[0])) == 3
+    finally:
+        logger.close()
+
+
+def test_compaction_drops_expired_entries(files, logger):
+    add_entries(files[0], [1, 10, 40, 400, 500])
+    removed = logger.compact(RetentionPolicy(max_age_days=30, max_per_file=0))
+    assert removed['expired'] == 3
+    assert remaining(files[0]) == [1, 10]
+
+
+def test_compaction_keeps_the_newest_entries_per_file(files, logger):
+    add_entries(files[0], range(10))
+    add_entries(files[1], range(3))
+    removed = logger.compact(RetentionPolicy(max_age_days=0, max_per_file=4))
+    assert removed['over_limit'] == 6
+    assert remaining(files[0]) == [0, 1, 2, 3]
+    assert remaining(files[1]) == [0, 1, 2]
+
+
+def test_compaction_drops_entries_of_deleted_files(files, logger):
+    add_entries(files[2], [1, 2])
+    add_entries(files[0], [1])
+    with session_scope() as session:
+        session.query(File).filter(File.id == files[2]).delete()
+    removed = logger.compact(RetentionPolicy(max_age_days=0, max_per_file=0))
+    assert removed == {'expired': 0, 'over_limit': 0, 'orphaned': 2}
+    assert remaining(files[0]) == [1]
+
+
+def test_policy_comes_from_settings(catalog):
+    policy = RetentionPolicy.load()
+    assert (policy.max_age_days, policy.max_per_file) == (RetentionPolicy.DEFAULT_MAX_AGE_DAYS,
+                                                          RetentionPolicy.DEFAULT_MAX_PER_FILE)
+    
+    with session_scope() as session:
+        session.add(Settings(key=RetentionPolicy.MAX_AGE_KEY, value='90'))
+        session.add(Settings(key=RetentionPolicy.MAX_PER_FILE_KEY, value='lots'))
+    policy = RetentionPolicy.load()
+    assert (policy.max_age_days, policy.max_per_file) == (90, RetentionPolicy.DEFAULT_MAX_PER_FILE)
+    assert RetentionPolicy(-5, -1).max_age_days == 0
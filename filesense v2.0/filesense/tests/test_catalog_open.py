@@ -0,0 +1,54 @@
+"""
+Opening the catalog: unreadable files are moved aside, locked ones are not
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models import database, create_sqlite_engine, migrate
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # A rollback journal rather than WAL, so an exclusive lock keeps readers out
+    monkeypatch.setattr(database, 'SQLITE_PROFILE', 'default')
+    return tmp_path / 'filesense.db'
+
+
+def open_catalog(path):
+    engine = database._create_catalog_engine(str(path))
+    try:
+        with engine.connect() as conn:
+            return conn.exec_driver_sql("SELECT name FROM files").scalars().all()
+    finally:
+        engine.dispose()
+
+
+def test_locked_catalog_is_left_in_place(db_path):
+    engine = create_sqlite_engine(str(db_path))
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO files (name, path) VALUES ('a.txt', '/a.txt')")
+    engine.dispose()
+    
+    holder = sqlite3.connect(str(db_path))
+    holder.execute("BEGIN EXCLUSIVE")
+    try:
+        with pytest.raises(OperationalError):
+            open_catalog(db_path)
+    finally:
+        holder.rollback()
+        holder.close()
+    
+    assert [p.name for p in db_path.parent.iterdir() if '.corrupt-' in p.name] == []
+    assert open_catalog(db_path) == ['a.txt']
+
+
+def test_unreadable_catalog_is_moved_aside(db_path):
+    db_path.write_bytes(b'not a database, just text' * 100)
+    
+    assert open_catalog(db_path) == []
+    backups = [p for p in db_path.parent.iterdir() if '.corrupt-' in p.name]
+    assert len(backups) == 1
+    assert backups[0].read_bytes().startswith(b'not a database')
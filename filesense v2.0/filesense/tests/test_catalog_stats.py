@@ -0,0 +1,97 @@
+"""
+Trigger-maintained catalog_stats counters agree with the tables they summarize
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text, update
+
+from app.models import File, get_session, session_scope
+from app.services.file_service import FileService
+from app.services.stats_service import StatsService
+
+AGGREGATES = """
+    SELECT 'total', 'files', COUNT(*) FROM files
+    UNION ALL SELECT 'total', 'bytes', COALESCE(SUM(size), 0) FROM files
+    UNION ALL SELECT 'total', 'tagged', COUNT(DISTINCT file_id) FROM file_tags WHERE file_id IN (SELECT id FROM files)
+    UNION ALL SELECT 'extension', COALESCE(extension, ''), COUNT(*) FROM files GROUP BY 2
+    UNION ALL SELECT 'category', COALESCE(category, ''), COUNT(*) FROM files GROUP BY 2
+    UNION ALL SELECT 'added_day', COALESCE(date(date_added), ''), COUNT(*) FROM files GROUP BY 2
+"""
+
+
+def assert_counters_match():
+    session = get_session()
+    expected = {(kind, key): value for kind, key, value in session.execute(text(AGGREGATES))}
+    counters = {(kind, key): value for kind, key, value in session.execute(
+        text("SELECT kind, key, value FROM catalog_stats"))}
+    assert counters == expected
+
+
+@pytest.fixture
+def files(catalog):
+    """Ten files over three extensions, two categories and three days; yields their ids"""
+    now = datetime.utcnow()
+    with session_scope() as session:
+        session.execute(insert(File), [{
+            'name': f'f{i}', 'path': f'/f{i}', 'size': 100 * i,
+            'extension': ('.pdf', '.txt', None)[i % 3], 'category': ('work', None)[i % 2],
+            'date_added': now - timedelta(days=i % 3),
+        } for i in range(10)])
+    assert_counters_match()
+    return [file_id for file_id, in get_session().query(File.id).order_by(File.id)]
+
+
+def test_inserts_and_updates(files):
+    with session_scope() as session:
+        session.execute(update(File).where(File.id == files[0]).values(
+            size=5000, extension='.docx', category='home', date_added=datetime.utcnow() - timedelta(days=30)))
+        session.execute(update(File).where(File.id.in_(files[1:4])).values(extension=None, size=None))
+    assert_counters_match()
+    
+    FileService.update_file_category(files[5], 'archive')
+    assert_counters_match()
+
+
+def test_deletes(files):
+    assert FileService.delete_file(files[0])
+    assert_counters_match()
+    
+    with session_scope() as session:
+        session.execute(text("DELETE FROM files WHERE id IN (:a, :b)"), {'a': files[1], 'b': files[2]})
+    assert_counters_match()
+    assert StatsService.get_total_files() == 7
+
+
+def test_tagging(files):
+    FileService.batch_add_tags(files[:4], ['red', 'blue'])
+    FileService.batch_add_tags(files[2:6], ['red'])
+    assert_counters_match()
+    assert StatsService.get_tagged_files_count() == 6
+    
+    FileService.remove_tag_from_file(files[0], 'red')
+    FileService.remove_tag_from_file(files[4], 'red')
+    assert_counters_match()
+    
+    FileService.rename_tag('red', 'blue')
+    assert_counters_match()
+    
+    FileService.delete_file(files[1])
+    assert_counters_match()
+    assert StatsService.get_tagged_files_count() == 4
+    assert StatsService.get_untagged_files_count() == 5
+    
+    # A plain DELETE takes the file's tag links along
+    with session_scope() as session:
+        session.execute(text("DELETE FROM files WHERE id = :id"), {'id': files[2]})
+    assert_counters_match()
+    assert StatsService.get_tagged_files_count() == 3
+
+
+def test_service_figures_read_the_counters(files):
+    assert StatsService.get_total_files() == 10
+    assert StatsService.get_total_size() == sum(range(10)) * 100
+    assert StatsService.get_file_type_distribution() == {'PDF': 4, 'TXT': 3, 'Unknown': 3}
+    assert StatsService.get_category_distribution() == {'work': 5, 'Uncategorized': 5}
+    assert StatsService.get_files_added_today() == 4
+    assert StatsService.get_files_added_this_week() == 10
@@ -0,0 +1,18 @@
+"""
+Finding duplicate files in a folder
+"""
+from app.utils.duplicate_finder import DuplicateFinder
+from app.utils.path_rules import PathRules
+
+
+def test_duplicates_outside_excluded_paths(tmp_path):
+    for name in ('a.txt', 'b.txt', 'c.log'):
+        (tmp_path / name).write_text('same', encoding='utf-8')
+    (tmp_path / 'build').mkdir()
+    (tmp_path / 'build' / 'd.txt').write_text('same', encoding='utf-8')
+    (tmp_path / 'other.txt').write_text('different', encoding='utf-8')
+    
+    duplicates = DuplicateFinder.find_duplicates_in_folder(str(tmp_path), rules=PathRules(['*.log', 'build/']))
+    assert [sorted(paths) for paths in duplicates.values()] == [[str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')]]
+    # c.log and the build folder
+    assert DuplicateFinder.skipped[str(tmp_path)] == 2
@@ -0,0 +1,61 @@
+"""
+The file_search full-text index follows file and tag changes
+"""
+import pytest
+from sqlalchemy import insert
+
+from app.models import File, file_search, get_session, session_scope
+from app.services.file_service import FileService
+from app.services.search_index import SearchIndex
+
+
+@pytest.fixture
+def files(catalog):
+    """a.txt tagged alpha, b.txt tagged beta and alpha, c.txt untagged; yields name -> id"""
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': name, 'path': f'/{name}'} for name in ('a.txt', 'b.txt', 'c.txt')])
+    ids = dict(get_session().query(File.name, File.id))
+    FileService.batch_add_tags([ids['a.txt']], ['alpha'])
+    FileService.batch_add_tags([ids['b.txt']], ['beta', 'alpha'])
+    return ids
+
+
+def found(query):
+    return sorted(f.name for f, _ in SearchIndex.search(query))
+
+
+def indexed_tags(file_id):
+    return get_session().query(file_search.c.tags).filter(file_search.c.rowid == file_id).scalar()
+
+
+def test_tags_are_searchable(files):
+    assert found('alpha') == ['a.txt', 'b.txt']
+    assert found('beta') == ['b.txt']
+    
+    FileService.remove_tag_from_file(files['b.txt'], 'alpha')
+    assert found('alpha') == ['a.txt']
+
+
+def test_renamed_tag_is_searchable(files):
+    FileService.rename_tag('beta', 'gamma')
+    assert found('gamma') == ['b.txt']
+    assert found('beta') == []
+
+
+def test_merged_tags_are_searchable(files):
+    assert FileService.rename_tag('alpha', 'beta')
+    
+    assert found('beta') == ['a.txt', 'b.txt']
+    assert found('alpha') == []
+    assert indexed_tags(files['a.txt']) == 'beta'
+    assert indexed_tags(files['b.txt']) == 'beta'
+
+
+def test_renamed_and_deleted_files_leave_the_index(files):
+    with session_scope() as session:
+        session.get(File, files['c.txt']).name = 'charlie.txt'
+    assert found('charlie') == ['charlie.txt']
+    
+    FileService.delete_file(files['c.txt'])
+    assert found('charlie') == []
+    assert indexed_tags(files['c.txt']) is None
@@ -0,0 +1,69 @@
+"""
+Keyset pagination through the catalog
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import File, session_scope
+from app.services.file_service import FileService
+
+
+@pytest.fixture
+def files(catalog):
+    """53 files with repeated names, two extensions and some without a date added"""
+    now = datetime(2024, 1, 1)
+    rows = [{
+        'name': f'doc_{i % 7}.{"pdf" if i % 2 else "txt"}', 'path': f'/page/{i}',
+        'extension': '.pdf' if i % 2 else '.txt', 'size': i,
+        'date_added': None if i % 5 == 0 else now - timedelta(days=i % 11),
+        'last_accessed': now - timedelta(hours=i),
+    } for i in range(53)]
+    with session_scope() as session:
+        session.execute(insert(File), rows)
+    return catalog.query(File).all()
+
+
+def expected(files, sort, descending):
+    """Ids in sort order, NULLs first, ties broken by id"""
+    def key(f):
+        value = getattr(f, sort)
+        return (value is not None, value if value is not None else 0, f.id)
+    ordered = [f.id for f in sorted(files, key=key)]
+    return ordered[::-1] if descending else ordered
+
+
+def page_through(limit, **filters):
+    ids = []
+    pages = 0
+    after = None
+    while True:
+        page, after = FileService.get_files_page(limit, after, **filters)
+        assert len(page) <= limit
+        ids.extend(f.id for f in page)
+        pages += 1
+        if after is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize('sort', sorted(FileService.PAGE_SORTS))
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('limit', [1, 10, 53, 100])
+def test_pages_cover_the_catalog_in_order(files, sort, descending, limit):
+    ids, pages = page_through(limit, sort=sort, descending=descending)
+    assert ids == expected(files, sort, descending)
+    assert pages == len(files) // limit + 1
+
+
+def test_filters_apply_to_every_page(files):
+    ids, _ = page_through(4, sort='date_added', extension='.pdf')
+    assert ids == expected([f for f in files if f.extension == '.pdf'], 'date_added', False)
+    
+    ids, _ = page_through(4, sort='name', name='doc_3')
+    assert ids == expected([f for f in files if 'doc_3' in f.name], 'name', False)
+
+
+def test_iter_files_streams_every_file(files):
+    streamed = [f.id for f in FileService.iter_files(page_size=7, sort='last_accessed', descending=True)]
+    assert streamed == expected(files, 'last_accessed', True)
@@ -0,0 +1,74 @@
+"""
+Versioned, in-place schema migrations
+"""
+import pytest
+
+from app.models import create_sqlite_engine, migrate, SCHEMA_VERSION, MigrationError
+from app.models import migrations
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_sqlite_engine(str(tmp_path / 'catalog.db'))
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def version_of(engine):
+    with engine.connect() as conn:
+        return migrations.get_schema_version(conn)
+
+
+def test_new_catalog_runs_every_step(engine):
+    assert migrate(engine) == SCHEMA_VERSION
+    assert version_of(engine) == SCHEMA_VERSION
+    # Already current, so nothing runs again
+    assert migrate(engine) == SCHEMA_VERSION
+
+
+def test_unversioned_catalog_keeps_its_files_and_tags(engine):
+    with engine.begin() as conn:
+        for statement in migrations.BASELINE_TABLES:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO files (id, name, path, extension, size) VALUES "
+            "(1, 'a.pdf', '/a.pdf', '.pdf', 100), (2, 'b.txt', '/b.txt', '.txt', 50)"
+        )
+        # Duplicate tags, and a tag on a file that no longer exists
+        conn.exec_driver_sql(
+            "INSERT INTO tags (file_id, tag) VALUES (1, 'work'), (1, 'work'), (2, 'work'), (2, 'home'), (9, 'gone')"
+        )
+    
+    assert migrate(engine) == SCHEMA_VERSION
+    
+    with engine.connect() as conn:
+        assert dict(conn.exec_driver_sql("SELECT name, usage_count FROM tags").all()) == {'work': 2, 'home': 1}
+        assert sorted(conn.exec_driver_sql("SELECT file_id FROM file_tags").scalars()) == [1, 2, 2]
+        totals = dict(conn.exec_driver_sql("SELECT key, value FROM catalog_stats WHERE kind = 'total'").all())
+        assert totals == {'files': 2, 'bytes': 150, 'tagged': 2}
+        assert 'failed' in migrations._columns(conn, 'scan_jobs')
+
+
+def test_failed_step_leaves_the_previous_version(engine, monkeypatch):
+    migrate(engine)
+    
+    def broken(conn):
+        conn.exec_driver_sql("CREATE TABLE half_done (id INTEGER)")
+        raise ValueError('boom')
+    
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [(SCHEMA_VERSION + 1, 'broken', broken)])
+    monkeypatch.setattr(migrations, 'SCHEMA_VERSION', SCHEMA_VERSION + 1)
+    with pytest.raises(MigrationError):
+        migrate(engine)
+    
+    assert version_of(engine) == SCHEMA_VERSION
+    with engine.connect() as conn:
+        assert 'half_done' not in conn.exec_driver_sql("SELECT name FROM sqlite_master").scalars().all()
+
+
+def test_newer_catalog_is_left_alone(engine):
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    assert migrate(engine) == SCHEMA_VERSION + 1
@@ -0,0 +1,95 @@
+"""
+Gitignore-style include/exclude rules for folder scans
+"""
+from app.utils.path_rules import PathRules
+
+
+def test_default_excludes_prune_tool_folders():
+    rules = PathRules(PathRules.DEFAULT_EXCLUDES)
+    assert rules.excludes_dir('.git')
+    assert rules.excludes_dir('project/node_modules')
+    assert not rules.excludes_dir('documents')
+    assert not rules.excludes_file('project/.git')
+
+
+def test_last_matching_pattern_wins():
+    rules = PathRules(['*.log', '!keep.log'])
+    assert rules.excludes_file('debug.log')
+    assert rules.excludes_file('logs/debug.log')
+    assert not rules.excludes_file('logs/keep.log')
+
+
+def test_directory_only_patterns_skip_files():
+    rules = PathRules(['build/'])
+    assert rules.excludes_dir('build')
+    assert rules.excludes_dir('src/build')
+    assert not rules.excludes_file('build')
+
+
+def test_slash_anchors_a_pattern_to_the_root():
+    rules = PathRules(['/drafts', 'docs/*.tmp'])
+    assert rules.excludes_dir('drafts')
+    assert not rules.excludes_dir('work/drafts')
+    assert rules.excludes_file('docs/a.tmp')
+    assert not rules.excludes_file('work/docs/a.tmp')
+    assert not rules.excludes_file('docs/sub/a.tmp')
+
+
+def test_double_star_matches_any_depth():
+    rules = PathRules(['archive/**/old'])
+    assert rules.excludes_dir('archive/old')
+    assert rules.excludes_dir('archive/2019/q1/old')
+    assert not rules.excludes_dir('old')
+
+
+def test_comments_and_blank_lines_are_ignored():
+    rules = PathRules(['# notes', '', '\\#literal'])
+    assert rules.excludes == ['\\#literal']
+    assert not rules.excludes_file('notes')
+    assert rules.excludes_file('#literal')
+
+
+def test_includes_keep_only_matching_files_in_any_case():
+    rules = PathRules(includes=['*.pdf', '*.docx'])
+    assert not rules.excludes_file('Report.PDF')
+    assert not rules.excludes_file('letters/cover.docx')
+    assert rules.excludes_file('notes.txt')
+    # Includes never prune directories
+    assert not rules.excludes_dir('letters')
+
+
+def test_excludes_apply_after_includes():
+    rules = PathRules(['private/'], includes=['*.pdf'])
+    assert rules.excludes_dir('private')
+    assert rules.excludes_file('notes.txt')
+    assert not rules.excludes_file('public/report.pdf')
+
+
+def test_for_root_reads_the_ignore_file(tmp_path):
+    (tmp_path / PathRules.IGNORE_FILE).write_text('*.bak\n# comment\nscratch/\n', encoding='utf-8')
+    rules = PathRules.for_root(str(tmp_path), excludes=['*.tmp'])
+    assert rules.excludes_dir('.git')
+    assert rules.excludes_dir('scratch')
+    assert rules.excludes_file('old.bak')
+    assert rules.excludes_file('x.tmp')
+    assert not rules.excludes_file('report.pdf')
+
+
+def test_empty_rules_are_falsy():
+    assert not PathRules()
+    assert PathRules(includes=['*.pdf'])
+
+
+def test_scan_skips_excluded_paths(catalog, tmp_path):
+    from app.services.file_service import FileService
+    
+    root = tmp_path / 'docs'
+    for relative in ('Report.PDF', 'notes.txt', '.git/HEAD.pdf', 'old/letter.pdf'):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * 10)
+    
+    rules = PathRules.for_root(str(root), excludes=['old/'], includes=['*.pdf'])
+    FileService.scan_folder(str(root), rules=rules)
+    
+    assert sorted(f.name for f in FileService.get_all_files()) == ['Report.PDF']
@@ -0,0 +1,38 @@
+"""
+The catalog's hot service queries are answered from an index
+(the pytest form of benchmarks/query_plan_check.py)
+"""
+import pytest
+from sqlalchemy import event
+
+from query_plan_check import seed_catalog, hot_queries, plan_problems
+
+
+@pytest.fixture
+def seeded(catalog):
+    seed_catalog(catalog, 2000)
+    return catalog
+
+
+@pytest.mark.parametrize('name', sorted(hot_queries()))
+def test_hot_query_uses_an_index(seeded, name):
+    from app.models import database
+    
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(database._engine, 'before_cursor_execute', capture)
+    try:
+        hot_queries()[name]()
+    finally:
+        event.remove(database._engine, 'before_cursor_execute', capture)
+    
+    assert statements, f"{name} sent no query"
+    with database._engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+            assert any('USING' in detail for detail in plan), plan
+            assert not plan_problems(plan), plan
@@ -0,0 +1,41 @@
+"""
+Dashboard refreshes under read_snapshot() stay consistent and quick while a
+scan writes (the pytest form of benchmarks/read_latency_benchmark.py)
+"""
+import threading
+
+from corpus import generate_corpus
+from read_latency_benchmark import reader
+
+MAX_P99_MS = 250.0
+
+
+def test_snapshot_reads_during_scan(catalog, tmp_path):
+    from app.models import remove_session
+    from app.services.file_service import FileService
+    
+    corpus_root = tmp_path / 'corpus'
+    generate_corpus(str(corpus_root), files=1500)
+    
+    scan_done = threading.Event()
+    scanned = []
+    
+    def scan():
+        try:
+            scanned.extend(FileService.scan_folder(str(corpus_root)))
+        finally:
+            remove_session()
+            scan_done.set()
+    
+    results = {}
+    threads = [threading.Thread(target=scan), threading.Thread(target=reader, args=(True, scan_done, results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    snapshot = results['snapshot']
+    assert scanned
+    assert snapshot['refreshes']
+    assert snapshot['torn_reads'] == 0
+    assert snapshot['p99_ms'] <= MAX_P99_MS
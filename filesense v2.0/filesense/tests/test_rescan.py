@@ -0,0 +1,45 @@
+"""
+Incremental rescans pick up new, changed and deleted files and skip the rest
+"""
+import os
+
+from app.models import File, get_session
+from app.services.file_service import FileService
+
+
+def catalogued():
+    return {os.path.basename(path): size for path, size in get_session().query(File.path, File.size)}
+
+
+def test_rescan_syncs_changes(catalog, tmp_path):
+    for relative in ('a.txt', 'b.txt', 'c.txt', 'sub/e.txt', 'sub/f.txt'):
+        path = tmp_path / relative
+        path.parent.mkdir(exist_ok=True)
+        path.write_text('12345', encoding='utf-8')
+    FileService.scan_folder(str(tmp_path))
+    assert catalogued() == {'a.txt': 5, 'b.txt': 5, 'c.txt': 5, 'e.txt': 5, 'f.txt': 5}
+    
+    (tmp_path / 'a.txt').write_text('1234567890', encoding='utf-8')
+    stat = os.stat(tmp_path / 'b.txt')
+    os.utime(tmp_path / 'b.txt', ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    (tmp_path / 'c.txt').unlink()
+    (tmp_path / 'sub' / 'd.txt').write_text('123', encoding='utf-8')
+    
+    counts = FileService.rescan_folder(str(tmp_path), batch_size=2)
+    assert {key: counts[key] for key in ('inserted', 'updated', 'removed', 'unchanged', 'failed')} == {
+        'inserted': 1, 'updated': 2, 'removed': 1, 'unchanged': 2, 'failed': 0}
+    assert catalogued() == {'a.txt': 10, 'b.txt': 5, 'd.txt': 3, 'e.txt': 5, 'f.txt': 5}
+    
+    counts = FileService.rescan_folder(str(tmp_path))
+    assert (counts['inserted'], counts['updated'], counts['removed'], counts['unchanged']) == (0, 0, 0, 5)
+
+
+def test_rescan_keeps_rows_under_excluded_folders(catalog, tmp_path):
+    (tmp_path / 'keep').mkdir()
+    (tmp_path / 'keep' / 'a.txt').write_text('x', encoding='utf-8')
+    FileService.scan_folder(str(tmp_path))
+    
+    (tmp_path / '.filesenseignore').write_text('keep/\n', encoding='utf-8')
+    counts = FileService.rescan_folder(str(tmp_path))
+    assert counts['removed'] == 0
+    assert catalogued() == {'a.txt': 1}
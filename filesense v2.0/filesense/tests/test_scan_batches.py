@@ -0,0 +1,40 @@
+"""
+Batched scan inserts, and files that fail to write
+"""
+import os
+
+from app.models import File, get_session
+from app.services.file_service import FileService
+
+
+def test_scan_inserts_every_file_across_batches(catalog, tmp_path):
+    for i in range(12):
+        (tmp_path / f'f{i}.txt').write_text('x', encoding='utf-8')
+    
+    files = FileService.scan_folder(str(tmp_path), batch_size=5)
+    
+    assert len(files) == 12
+    assert get_session().query(File).count() == 12
+    counts = FileService.get_scan_counts(str(tmp_path))
+    assert counts['inserted'] == 12
+    assert counts['failed'] == 0
+    
+    # Scanning again finds them all catalogued
+    FileService.scan_folder(str(tmp_path), batch_size=5)
+    assert get_session().query(File).count() == 12
+
+
+def test_failing_file_does_not_lose_its_batch(catalog, tmp_path):
+    for i in range(12):
+        (tmp_path / f'f{i}.txt').write_text('x', encoding='utf-8')
+    # A name that can't be stored as UTF-8 text fails its batch's commit
+    with open(os.path.join(os.fsencode(tmp_path), b'bad\xff.txt'), 'w') as f:
+        f.write('x')
+    
+    files = FileService.scan_folder(str(tmp_path), batch_size=5)
+    
+    assert len(files) == 12
+    assert get_session().query(File).count() == 12
+    counts = FileService.get_scan_counts(str(tmp_path))
+    assert counts['inserted'] == 12
+    assert counts['failed'] == 1
@@ -0,0 +1,143 @@
+"""
+Prioritized, cancellable background scans
+"""
+import threading
+import time
+
+import pytest
+
+from app.services.file_service import FileService
+from app.services.scan_manager import ScanManager
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def gated_scans(catalog, monkeypatch):
+    """Replace scans with ones that run until their folder's gate opens; yields folder -> gate"""
+    gates = {}
+    
+    def scan_folder(folder_path, progress_callback=None, control=None, **kwargs):
+        gate = gates.setdefault(folder_path, threading.Event())
+        processed = 0
+        while not gate.is_set():
+            control()
+            processed += 1
+            progress_callback(processed, 0, folder_path)
+            time.sleep(0.005)
+        if folder_path == 'broken':
+            raise OSError('disk gone')
+        return []
+    
+    monkeypatch.setattr(FileService, 'scan_folder', staticmethod(scan_folder))
+    monkeypatch.setattr(FileService, 'get_scan_counts', staticmethod(lambda folder_path, incremental=False: {}))
+    yield gates
+    for gate in gates.values():
+        gate.set()
+
+
+def open_gate(gates, folder):
+    gates.setdefault(folder, threading.Event()).set()
+
+
+def test_interactive_scan_preempts_background_scan(gated_scans):
+    manager = ScanManager(max_concurrent=1)
+    background = manager.get_task(manager.submit('background'))
+    wait_for(lambda: background.status == 'running')
+    
+    interactive = manager.get_task(manager.submit('interactive', interactive=True))
+    wait_for(lambda: interactive.status == 'running')
+    assert background.status == 'paused'
+    
+    open_gate(gated_scans, 'interactive')
+    wait_for(lambda: interactive.status == 'completed')
+    wait_for(lambda: background.status == 'running')
+    
+    open_gate(gated_scans, 'background')
+    wait_for(lambda: background.status == 'completed')
+
+
+def test_queued_tasks_start_in_priority_order(gated_scans):
+    manager = ScanManager(max_concurrent=1)
+    started = []
+    
+    def note_start(task):
+        if task.folder not in started:
+            started.append(task.folder)
+    
+    first = manager.get_task(manager.submit('first', interactive=True))
+    wait_for(lambda: first.status == 'running')
+    manager.submit('later', on_progress=note_start)
+    manager.submit('sooner', interactive=True, on_progress=note_start)
+    
+    for folder in ('first', 'sooner', 'later'):
+        open_gate(gated_scans, folder)
+        wait_for(lambda: all(t.is_finished for t in manager.get_tasks() if t.folder == folder))
+    assert started == ['sooner', 'later']
+
+
+def test_cancel_queued_and_running_tasks(gated_scans):
+    manager = ScanManager(max_concurrent=1)
+    done = []
+    running = manager.get_task(manager.submit('running', on_done=done.append))
+    wait_for(lambda: running.status == 'running')
+    queued = manager.get_task(manager.submit('queued', on_done=done.append))
+    
+    assert manager.cancel(queued.id)
+    assert queued.status == 'cancelled'
+    assert manager.cancel(running.id)
+    wait_for(lambda: running.status == 'cancelled')
+    assert done == [queued, running]
+    assert not manager.cancel(running.id)
+    assert manager.get_tasks(include_finished=False) == []
+
+
+def test_pause_and_resume(gated_scans):
+    manager = ScanManager(max_concurrent=1)
+    task = manager.get_task(manager.submit('folder'))
+    wait_for(lambda: task.status == 'running')
+    
+    assert manager.pause(task.id)
+    wait_for(lambda: task.status == 'paused')
+    processed = task.processed
+    time.sleep(0.05)
+    assert task.processed == processed
+    
+    assert manager.resume(task.id)
+    wait_for(lambda: task.processed > processed)
+    open_gate(gated_scans, 'folder')
+    wait_for(lambda: task.status == 'completed')
+
+
+def test_failed_scan_records_its_error(gated_scans):
+    manager = ScanManager()
+    open_gate(gated_scans, 'broken')
+    task = manager.get_task(manager.submit('broken'))
+    wait_for(lambda: task.is_finished)
+    assert task.status == 'failed'
+    assert task.error == 'disk gone'
+
+
+def test_scan_reports_counts(catalog, tmp_path):
+    for i in range(5):
+        (tmp_path / f'file_{i}.txt').write_text('hello', encoding='utf-8')
+    
+    manager = ScanManager()
+    scan = manager.get_task(manager.submit(str(tmp_path)))
+    wait_for(lambda: scan.is_finished, timeout=30)
+    assert scan.status == 'completed'
+    assert len(scan.result) == 5
+    assert scan.counts['inserted'] == 5
+    assert scan.counts['failed'] == 0
+    
+    (tmp_path / 'file_5.txt').write_text('new', encoding='utf-8')
+    rescan = manager.get_task(manager.submit(str(tmp_path), incremental=True))
+    wait_for(lambda: rescan.is_finished, timeout=30)
+    assert rescan.status == 'completed'
+    assert rescan.counts['inserted'] == 1
+    assert rescan.counts['unchanged'] == 5
@@ -0,0 +1,59 @@
+"""
+Interrupted scans resume from their checkpoint
+"""
+import pytest
+
+from app.models import File, ScanJob, get_session
+from app.services.file_service import FileService
+
+
+class Stop(Exception):
+    pass
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Four folders of six files each"""
+    for folder in range(4):
+        (tmp_path / f'd{folder}').mkdir()
+        for i in range(6):
+            (tmp_path / f'd{folder}' / f'f{i}.txt').write_text('x', encoding='utf-8')
+    return tmp_path
+
+
+def counting_control(stop_at=None):
+    """control() for a scan: counts the files walked and raises Stop before file stop_at"""
+    calls = []
+    
+    def control():
+        calls.append(None)
+        if len(calls) == stop_at:
+            raise Stop()
+    return control, calls
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_interrupted_scan_resumes_where_it_stopped(catalog, tree, incremental):
+    scan = FileService.rescan_folder if incremental else FileService.scan_folder
+    
+    # Stops in d3. Three batches were committed, but the walk had not left d2
+    # when the last one was, so the checkpoint is d1 and d2 is walked again
+    control, _ = counting_control(stop_at=21)
+    with pytest.raises(Stop):
+        scan(str(tree), batch_size=6, control=control)
+    
+    job = get_session().query(ScanJob).filter_by(status='running').one()
+    assert job.cursor == str(tree / 'd1')
+    assert job.processed == 12
+    assert get_session().query(File).count() == 18
+    
+    control, walked = counting_control()
+    scan(str(tree), batch_size=6, control=control)
+    
+    # Only the folders after the checkpoint were walked again
+    assert len(walked) == 12
+    assert get_session().query(File).count() == 24
+    counts = FileService.get_scan_counts(str(tree), incremental)
+    assert counts['inserted'] == 24
+    assert counts['failed'] == 0
+    assert get_session().query(ScanJob).filter_by(status='running').count() == 0
@@ -0,0 +1,90 @@
+"""
+Search result cache, invalidated by catalog generations
+"""
+from sqlalchemy import insert
+
+from app.models import File, session_scope, write_scope, catalog_generation
+from app.services.search_cache import SearchCache
+
+
+def cached(cache, key, value, calls):
+    def compute():
+        calls.append(key)
+        return value
+    return cache.get_or_compute(key, compute)
+
+
+def test_hits_until_the_catalog_changes(catalog):
+    cache = SearchCache()
+    calls = []
+    key = SearchCache.make_key(' Report ', extension='.pdf')
+    assert key == SearchCache.make_key('report', extension='.pdf')
+    
+    assert cached(cache, key, [1, 2], calls) == [1, 2]
+    assert cached(cache, key, [1, 2], calls) == [1, 2]
+    assert len(calls) == 1
+    
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': 'a.txt', 'path': '/a.txt'}])
+    
+    assert cached(cache, key, [1, 2, 3], calls) == [1, 2, 3]
+    assert len(calls) == 2
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_commits_without_writes_keep_the_cache(catalog):
+    generation = catalog_generation()
+    catalog.query(File).all()
+    catalog.commit()
+    with write_scope():
+        pass
+    assert catalog_generation() == generation
+
+
+def test_uncommitted_changes_bypass_the_cache(catalog):
+    cache = SearchCache()
+    calls = []
+    catalog.add(File(name='b.txt', path='/b.txt'))
+    assert catalog_generation() is None
+    cached(cache, 'q', 'pending', calls)
+    cached(cache, 'q', 'pending', calls)
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+    catalog.rollback()
+    assert catalog_generation() is not None
+
+
+def test_least_recently_used_entries_are_evicted(catalog):
+    cache = SearchCache(max_entries=2)
+    calls = []
+    cached(cache, 'a', 1, calls)
+    cached(cache, 'b', 2, calls)
+    cached(cache, 'a', 1, calls)
+    cached(cache, 'c', 3, calls)
+    cached(cache, 'a', 1, calls)
+    cached(cache, 'b', 2, calls)
+    assert calls == ['a', 'b', 'c', 'b']
+    assert cache.stats()['evictions'] == 2
+
+
+def test_byte_limit_bounds_the_cache(catalog):
+    cache = SearchCache(max_bytes=2000)
+    calls = []
+    cached(cache, 'huge', 'x' * 5000, calls)
+    cached(cache, 'huge', 'x' * 5000, calls)
+    assert calls == ['huge', 'huge']
+    
+    for i in range(20):
+        cached(cache, i, 'y' * 100, calls)
+    stats = cache.stats()
+    assert 0 < stats['entries'] < 20
+    assert stats['bytes'] <= 2000
+
+
+def test_search_sees_new_files(catalog):
+    from app.services.search_index import SearchIndex
+    
+    assert SearchIndex.search('quarterly') == []
+    with write_scope() as session:
+        session.add(File(name='quarterly_report.pdf', path='/quarterly_report.pdf', extension='.pdf'))
+    assert [f.name for f, _ in SearchIndex.search('quarterly')] == ['quarterly_report.pdf']
@@ -0,0 +1,69 @@
+"""
+Search ranking, the newest-first fallback past RANK_LIMIT, and refining earlier results
+"""
+import pytest
+from sqlalchemy import insert
+
+from app.models import File, get_session, session_scope
+from app.services.search_index import SearchIndex
+
+
+@pytest.fixture
+def files(catalog):
+    """Six files, inserted so their ids follow this order; yields name -> id"""
+    names = ['budget.xlsx', 'budget report.docx', 'report.pdf', 'annual report 2023.pdf',
+             'reporting notes.txt', 'holiday.jpg']
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': name, 'path': f'/docs/{name}'} for name in names])
+    return dict(get_session().query(File.name, File.id))
+
+
+def names(hits):
+    files = {file_id: name for name, file_id in get_session().query(File.name, File.id)}
+    return [files[file_id] for file_id, _ in hits]
+
+
+def test_matches_are_ranked(files):
+    hits = SearchIndex.search_hits('report')
+    assert sorted(names(hits)) == ['annual report 2023.pdf', 'budget report.docx',
+                                   'report.pdf', 'reporting notes.txt']
+    # bm25 favours the shortest name holding the word
+    assert names(hits)[0] == 'report.pdf'
+
+
+def test_too_many_matches_list_the_newest(files, monkeypatch):
+    monkeypatch.setattr(SearchIndex, 'RANK_LIMIT', 2)
+    
+    assert names(SearchIndex.search_hits('report')) == ['reporting notes.txt', 'annual report 2023.pdf',
+                                                        'report.pdf', 'budget report.docx']
+    assert names(SearchIndex.search_hits('report', limit=2)) == ['reporting notes.txt',
+                                                                 'annual report 2023.pdf']
+
+
+def test_refine_narrows_earlier_hits(files):
+    previous = SearchIndex.search_hits('repo')
+    assert SearchIndex.extends('repo', 'report 20')
+    
+    refined = SearchIndex.refine('report 20', previous)
+    assert names(refined) == names(SearchIndex.search_hits('report 20')) == ['annual report 2023.pdf']
+    # Snippets are the earlier query's
+    assert refined[0] in previous
+
+
+def test_refine_keeps_order_and_substring_matches(files):
+    previous = SearchIndex.search_hits('budg')
+    
+    refined = SearchIndex.refine('budget', previous)
+    assert refined == previous
+    # 'ting n' only matches as a substring of the name
+    previous = SearchIndex.search_hits('ting')
+    assert names(SearchIndex.refine('ting n', previous)) == ['reporting notes.txt']
+
+
+def test_refine_skips_files_removed_since(files):
+    previous = SearchIndex.search_hits('report')
+    with session_scope() as session:
+        session.delete(session.get(File, files['report.pdf']))
+    
+    refined = SearchIndex.refine('report', previous)
+    assert refined == [hit for hit in previous if hit[0] != files['report.pdf']]
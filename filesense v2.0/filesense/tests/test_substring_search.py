@@ -0,0 +1,60 @@
+"""
+Substring search through the file_trigrams index
+"""
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.models import File, file_trigrams, get_session, session_scope
+from app.services.file_service import FileService
+from app.services.search_index import SearchIndex
+
+
+@pytest.fixture
+def files(catalog):
+    """report.pdf, Passport Scan.png and notes.txt; yields name -> id"""
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': name, 'path': f'/docs/{name}'}
+                                       for name in ('report.pdf', 'Passport Scan.png', 'notes.txt')])
+    return dict(get_session().query(File.name, File.id))
+
+
+def found(query):
+    return sorted(f.name for f, _ in SearchIndex.search(query))
+
+
+def named(query):
+    return sorted(name for name, in get_session().query(File.name).filter(SearchIndex.name_contains(query)))
+
+
+def trigram_rows(query):
+    return get_session().execute(
+        select(func.count()).select_from(file_trigrams).where(file_trigrams.c.name.match(query))
+    ).scalar()
+
+
+def test_substrings_match_inside_words(files):
+    # 'port' is no prefix of a word in either name
+    assert found('port') == ['Passport Scan.png', 'report.pdf']
+    assert found('PORT.P') == ['report.pdf']
+    assert named('sport') == ['Passport Scan.png']
+
+
+def test_short_substrings_fall_back_to_like(files):
+    assert SearchIndex.substring_query('rt') is None
+    assert named('rt') == ['Passport Scan.png', 'report.pdf']
+
+
+def test_deleted_files_leave_the_trigram_index(files):
+    assert trigram_rows('"port"') == 2
+    
+    FileService.delete_file(files['report.pdf'])
+    assert trigram_rows('"port"') == 1
+    assert found('port') == ['Passport Scan.png']
+
+
+def test_renamed_files_match_their_new_name(files):
+    with session_scope() as session:
+        session.get(File, files['notes.txt']).name = 'export.csv'
+    
+    assert found('port') == ['Passport Scan.png', 'export.csv', 'report.pdf']
+    assert trigram_rows('"notes"') == 0
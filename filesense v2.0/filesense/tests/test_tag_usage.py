@@ -0,0 +1,52 @@
+"""
+Trigger-maintained tag usage counts agree with the file_tags links
+"""
+import pytest
+from sqlalchemy import insert, text
+
+from app.models import File, Tag, get_session, session_scope
+from app.services.file_service import FileService
+
+
+def checked_usage_counts():
+    """usage_count per tag name, after checking each against a COUNT of its links"""
+    session = get_session()
+    expected = dict(session.execute(text(
+        "SELECT tags.name, COUNT(file_tags.file_id) FROM tags "
+        "LEFT JOIN file_tags ON file_tags.tag_id = tags.id GROUP BY tags.id")).all())
+    assert dict(session.query(Tag.name, Tag.usage_count)) == expected
+    return expected
+
+
+@pytest.fixture
+def files(catalog):
+    with session_scope() as session:
+        session.execute(insert(File), [{'name': f'f{i}', 'path': f'/f{i}'} for i in range(6)])
+    return [file_id for file_id, in get_session().query(File.id).order_by(File.id)]
+
+
+def test_tagging_and_untagging(files):
+    FileService.batch_add_tags(files[:4], ['red', 'blue'])
+    # Tagging again changes nothing
+    FileService.batch_add_tags(files[:2], ['red'])
+    assert checked_usage_counts() == {'red': 4, 'blue': 4}
+    
+    FileService.remove_tag_from_file(files[0], 'red')
+    FileService.remove_tag_from_file(files[0], 'red')
+    assert checked_usage_counts() == {'red': 3, 'blue': 4}
+    
+    FileService.delete_file(files[1])
+    assert checked_usage_counts() == {'red': 2, 'blue': 3}
+
+
+def test_rename_and_merge(files):
+    FileService.batch_add_tags(files[:3], ['red'])
+    FileService.batch_add_tags(files[2:5], ['blue'])
+    
+    FileService.rename_tag('red', 'crimson')
+    assert checked_usage_counts() == {'crimson': 3, 'blue': 3}
+    
+    # files[2] carries both, so it ends up with one link to blue
+    FileService.rename_tag('crimson', 'blue')
+    assert checked_usage_counts() == {'blue': 5}
+    assert get_session().execute(text("SELECT COUNT(*) FROM file_tags")).scalar() == 5
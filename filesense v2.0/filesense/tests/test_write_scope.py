@@ -0,0 +1,115 @@
+"""
+Serialized catalog writes through write_scope() and session_scope()
+"""
+import threading
+
+import pytest
+
+from app.models import File, database, get_session, remove_session, session_scope, write_scope
+
+
+def names():
+    return sorted(name for name, in get_session().query(File.name))
+
+
+def test_commits_on_exit_and_rolls_back_on_error(catalog):
+    with write_scope() as session:
+        session.add(File(name='kept.txt', path='/kept.txt'))
+    
+    with pytest.raises(ValueError):
+        with write_scope() as session:
+            session.add(File(name='dropped.txt', path='/dropped.txt'))
+            raise ValueError()
+    
+    assert names() == ['kept.txt']
+
+
+def test_nested_write_scope_joins_the_outer_one(catalog):
+    with pytest.raises(ValueError):
+        with write_scope() as outer:
+            outer.add(File(name='a.txt', path='/a.txt'))
+            with write_scope() as inner:
+                assert inner is outer
+                inner.add(File(name='b.txt', path='/b.txt'))
+            # The inner block didn't commit, so this takes both files back
+            raise ValueError()
+    assert names() == []
+
+
+def test_second_session_on_a_writing_thread_is_refused(catalog):
+    with write_scope():
+        with pytest.raises(RuntimeError):
+            with session_scope():
+                pass
+    # The lock was released on the way out
+    with session_scope() as session:
+        session.add(File(name='a.txt', path='/a.txt'))
+    assert names() == ['a.txt']
+
+
+def test_waiting_writer_times_out(catalog, monkeypatch):
+    monkeypatch.setattr(database, 'WRITE_LOCK_TIMEOUT', 0.2)
+    holding, release = threading.Event(), threading.Event()
+    
+    def holder():
+        with session_scope():
+            holding.set()
+            release.wait(5)
+    
+    thread = threading.Thread(target=holder)
+    thread.start()
+    try:
+        holding.wait(5)
+        with pytest.raises(TimeoutError):
+            with write_scope():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_concurrent_writers_take_turns(catalog):
+    errors = []
+    
+    def writer(n):
+        try:
+            for i in range(20):
+                with write_scope() as session:
+                    session.add(File(name=f'{n}_{i}.txt', path=f'/{n}/{i}.txt'))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            remove_session()
+    
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(names()) == 80
+
+
+def test_background_reads_skip_the_write_lock(catalog, monkeypatch):
+    from app.services.activity_logger import RetentionPolicy
+    from app.services.search_index import ContentIndexer
+    
+    monkeypatch.setattr(database, 'WRITE_LOCK_TIMEOUT', 0.2)
+    holding, release = threading.Event(), threading.Event()
+    
+    def holder():
+        with session_scope():
+            holding.set()
+            release.wait(5)
+    
+    thread = threading.Thread(target=holder)
+    thread.start()
+    try:
+        holding.wait(5)
+        assert RetentionPolicy.load().max_per_file == RetentionPolicy.DEFAULT_MAX_PER_FILE
+        # Nothing is queued, so it only reads
+        assert ContentIndexer().index_pending() == 0
+    finally:
+        release.set()
+        thread.join()
@@ -5,18 +5,25 @@ Main Application File with Ollama Integration
 
 import os
 import sys
+import stat as stat_module
 import json
 import sqlite3
 import hashlib
 import mimetypes
 import subprocess
 import threading
+import queue
 import time
 import shutil
 import platform
+import re
+import heapq
+import itertools
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, g
 from werkzeug.utils import secure_filename
 import requests
 
@@ -24,13 +31,42 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'filesense-local-ai-search'
 app.config['DATABASE'] = 'data/filesense.db'
 app.config['OLLAMA_URL'] = 'http://localhost:11434'
+app.config['INDEX_WORKERS'] = os.cpu_count() or 4
+app.config['INDEX_BATCH_SIZE'] = 200
+app.config['MAX_CONCURRENT_SCANS'] = 1
+app.config['SQLITE_PROFILE'] = os.environ.get('FILESENSE_DB_PROFILE', 'performance')
+app.config['DB_POOL_SIZE'] = 8  # Idle connections kept for reuse
+app.config['DB_STATEMENT_CACHE'] = 256  # Prepared statements cached per connection
+app.config['SEARCH_RANK_LIMIT'] = 5000  # Searches rank at most this many of their newest matches
+app.config['SEARCH_CACHE_ENTRIES'] = 256  # Search and file list results kept until the catalog changes
+app.config['SEARCH_CACHE_BYTES'] = 8 * 1024 * 1024  # Estimated size cap for those results
+# .gitignore-style rules applied before the 'exclude_patterns' setting and a root's .filesenseignore
+app.config['DEFAULT_EXCLUDES'] = ['.*', 'node_modules/', '__pycache__/']
+app.config['IGNORE_FILE'] = '.filesenseignore'
+
+# PRAGMAs applied to every connection. WAL with synchronous=NORMAL can lose the
+# last few commits on power loss but never corrupts, and skips an fsync per commit.
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,  # 64 MiB
+        'mmap_size': 268435456,  # 256 MiB
+        'temp_store': 'MEMORY'
+    }
+}
 
 # Global state
 indexing_status = {
     'active': False,
     'progress': 0,
     'total': 0,
-    'current_file': ''
+    'current_file': '',
+    'files_per_sec': 0,
+    'mb_per_sec': 0,
+    'skipped': 0
 }
 
 ollama_status = {
@@ -44,8 +80,9 @@ ollama_status = {
 def init_db():
     """Initialize SQLite database"""
     conn = sqlite3.connect(app.config['DATABASE'])
+    apply_sqlite_profile(conn)
     c = conn.cursor()
-
+    
     # Ensure foreign keys are enforced for relational integrity
     c.execute('PRAGMA foreign_keys = ON;')
     
@@ -59,7 +96,31 @@ def init_db():
                   modified_date DATETIME,
                   created_date DATETIME,
                   file_hash TEXT,
-                  indexed_date DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+                  indexed_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+                  mtime_ns INTEGER,
+                  inode INTEGER)''')
+    
+    # Add stat fingerprint columns to databases created before they existed
+    columns = [row[1] for row in c.execute('PRAGMA table_info(files)').fetchall()]
+    for column in ('mtime_ns', 'inode'):
+        if column not in columns:
+            c.execute(f'ALTER TABLE files ADD COLUMN {column} INTEGER')
+    
+    # Trigram index over names and paths for substring search. It reads the
+    # text back from files (external content), so triggers keep it in step
+    has_trigrams = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'file_trigrams'").fetchone()
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS file_trigrams
+                 USING fts5(filename, path, content='files', content_rowid='id', tokenize='trigram')''')
+    if not has_trigrams:
+        c.execute("INSERT INTO file_trigrams (file_trigrams) VALUES ('rebuild')")
+    
+    remove_old = '''INSERT INTO file_trigrams (file_trigrams, rowid, filename, path)
+                    VALUES ('delete', OLD.id, OLD.filename, OLD.path);'''
+    add_new = 'INSERT INTO file_trigrams (rowid, filename, path) VALUES (NEW.id, NEW.filename, NEW.path);'
+    c.execute(f'CREATE TRIGGER IF NOT EXISTS file_trigrams_insert AFTER INSERT ON files BEGIN {add_new} END')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS file_trigrams_update AFTER UPDATE OF filename, path ON files
+                  BEGIN {remove_old} {add_new} END''')
+    c.execute(f'CREATE TRIGGER IF NOT EXISTS file_trigrams_delete AFTER DELETE ON files BEGIN {remove_old} END')
     
     # Tags table
     c.execute('''CREATE TABLE IF NOT EXISTS tags
@@ -85,6 +146,66 @@ def init_db():
                   generated_date DATETIME DEFAULT CURRENT_TIMESTAMP,
                   FOREIGN KEY(file_id) REFERENCES files(id) ON DELETE CASCADE)''')
     
+    # Word index over filenames, tags and summaries for ranked search. It keeps
+    # its own copy of the text, which triggers on the four tables maintain
+    tag_names = ("coalesce((SELECT GROUP_CONCAT(t.tag_name, ' ') FROM file_tags ft "
+                 "JOIN tags t ON t.id = ft.tag_id WHERE ft.file_id = {}), '')")
+    has_search = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'file_search'").fetchone()
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS file_search
+                 USING fts5(filename, tags, summary, prefix='2 3', tokenize='unicode61 remove_diacritics 2')''')
+    if not has_search:
+        # ORDER BY rank weighs a filename match highest, then tags, then the summary
+        c.execute("INSERT INTO file_search (file_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 3.0)')")
+        c.execute(f'''INSERT INTO file_search (rowid, filename, tags, summary)
+                      SELECT f.id, f.filename, {tag_names.format('f.id')}, coalesce(s.summary, '')
+                      FROM files f LEFT JOIN summaries s ON s.file_id = f.id''')
+    
+    search_triggers = {
+        'file_search_insert': ('AFTER INSERT ON files',
+                               "INSERT INTO file_search (rowid, filename, tags, summary) "
+                               "VALUES (NEW.id, NEW.filename, '', '');"),
+        'file_search_update': ('AFTER UPDATE OF filename ON files',
+                               'UPDATE file_search SET filename = NEW.filename WHERE rowid = NEW.id;'),
+        'file_search_delete': ('AFTER DELETE ON files',
+                               'DELETE FROM file_search WHERE rowid = OLD.id;'),
+        'file_search_tag_insert': ('AFTER INSERT ON file_tags',
+                                   f"UPDATE file_search SET tags = {tag_names.format('NEW.file_id')} "
+                                   "WHERE rowid = NEW.file_id;"),
+        'file_search_tag_delete': ('AFTER DELETE ON file_tags',
+                                   f"UPDATE file_search SET tags = {tag_names.format('OLD.file_id')} "
+                                   "WHERE rowid = OLD.file_id;"),
+        'file_search_tag_rename': ('AFTER UPDATE OF tag_name ON tags',
+                                   f"UPDATE file_search SET tags = {tag_names.format('file_search.rowid')} "
+                                   "WHERE rowid IN (SELECT file_id FROM file_tags WHERE tag_id = NEW.id);"),
+        # INSERT OR REPLACE skips delete triggers, so the insert trigger has the final say
+        'file_search_summary_insert': ('AFTER INSERT ON summaries',
+                                       "UPDATE file_search SET summary = coalesce(NEW.summary, '') "
+                                       "WHERE rowid = NEW.file_id;"),
+        'file_search_summary_update': ('AFTER UPDATE OF summary ON summaries',
+                                       "UPDATE file_search SET summary = coalesce(NEW.summary, '') "
+                                       "WHERE rowid = NEW.file_id;"),
+        'file_search_summary_delete': ('AFTER DELETE ON summaries',
+                                       "UPDATE file_search SET summary = '' WHERE rowid = OLD.file_id;"),
+    }
+    for name, (event, body) in search_triggers.items():
+        c.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+    
+    # Scan checkpoints so an interrupted scan can resume
+    c.execute('''CREATE TABLE IF NOT EXISTS scan_jobs
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  root TEXT NOT NULL,
+                  cursor TEXT,
+                  progress INTEGER DEFAULT 0,
+                  status TEXT DEFAULT 'running',
+                  error TEXT,
+                  started_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+                  updated_date DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+    
+    # Add the error column to databases created before it existed
+    columns = [row[1] for row in c.execute('PRAGMA table_info(scan_jobs)').fetchall()]
+    if 'error' not in columns:
+        c.execute('ALTER TABLE scan_jobs ADD COLUMN error TEXT')
+    
     # Settings table
     c.execute('''CREATE TABLE IF NOT EXISTS settings
                  (key TEXT PRIMARY KEY,
@@ -94,6 +215,7 @@ def init_db():
     default_settings = {
         'ollama_model': 'llama3.2:3b',
         'scan_folders': json.dumps([]),
+        'exclude_patterns': json.dumps([]),
         'auto_tag': 'true',
         'auto_summarize': 'false'
     }
@@ -104,12 +226,159 @@ def init_db():
     conn.commit()
     conn.close()
 
+def apply_sqlite_profile(conn, profile=None):
+    """Run the configured SQLite profile's PRAGMAs on a new connection"""
+    for pragma, value in SQLITE_PROFILES[profile or app.config['SQLITE_PROFILE']].items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool"""
+    pool = None
+    
+    def commit(self):
+        # sqlite3 only opens a transaction for a write
+        if not self.in_transaction or self.pool is None:
+            super().commit()
+            return
+        # Bump before, so nothing cached earlier is served once the write may be
+        # visible, and after, so nothing read while it was landing is kept
+        self.pool.bump_generation()
+        try:
+            super().commit()
+        finally:
+            self.pool.bump_generation()
+    
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+    
+    def discard(self):
+        """Really close the connection"""
+        super().close()
+
+class ConnectionPool:
+    """Reusable connections to one database, each used by one thread at a time
+    
+    Every get_db() on a thread returns that thread's connection, so helpers
+    called while a request or scan already holds one share it instead of
+    opening their own. Once each caller has closed it, the connection goes
+    to the idle list for the next request or indexer thread, keeping its
+    PRAGMAs and its prepared statement cache. Uncommitted changes are rolled
+    back on the way, as closing a connection would.
+    
+    generation counts the commits that wrote through the pool, so results
+    read at an earlier generation are known to be stale.
+    """
+    
+    def __init__(self, database, size, cached_statements):
+        self.database = database
+        self.size = size
+        self.cached_statements = cached_statements
+        self.opened = 0
+        self.generation = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def connect(self):
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(self.database, factory=PooledConnection, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys = ON;')
+        apply_sqlite_profile(conn)
+        conn.pool = self
+        self.opened += 1
+        return conn
+    
+    def bump_generation(self):
+        """Start a new catalog generation (on both sides of a write's commit)"""
+        with self._lock:
+            self.generation += 1
+    
+    def depth(self):
+        """How many callers on this thread hold its connection"""
+        return getattr(self._local, 'depth', 0)
+    
+    def writing(self):
+        """Whether this thread's connection has uncommitted writes"""
+        return bool(self.depth()) and self._local.conn.in_transaction
+    
+    def acquire(self):
+        """Check out this thread's connection, reusing an idle one if there is one"""
+        if not self.depth():
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            self._local.conn = conn or self.connect()
+            self._local.depth = 0
+        self._local.depth += 1
+        return self._local.conn
+    
+    def release(self, conn):
+        """Give up one hold on this thread's connection"""
+        if not self.depth() or self._local.conn is not conn:
+            return
+        self._local.depth -= 1
+        if self._local.depth:
+            return
+        self._local.conn = None
+        
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.discard()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.discard()
+    
+    def release_to(self, depth):
+        """Drop this thread's holds down to depth, e.g. ones a failed request never closed"""
+        while self.depth() > depth:
+            self.release(self._local.conn)
+    
+    def close_all(self):
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.discard()
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Get the connection pool for the configured database"""
+    global _db_pool
+    pool = _db_pool
+    if pool is None or pool.database != app.config['DATABASE']:
+        with _db_pool_lock:
+            if _db_pool is None or _db_pool.database != app.config['DATABASE']:
+                if _db_pool is not None:
+                    _db_pool.close_all()
+                _db_pool = ConnectionPool(app.config['DATABASE'], app.config['DB_POOL_SIZE'],
+                                          app.config['DB_STATEMENT_CACHE'])
+            pool = _db_pool
+    return pool
+
 def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(app.config['DATABASE'])
-    conn.row_factory = sqlite3.Row
-    conn.execute('PRAGMA foreign_keys = ON;')
-    return conn
+    """Get this thread's database connection; close() hands it back to the pool"""
+    return get_db_pool().acquire()
+
+@app.before_request
+def mark_db_depth():
+    """Remember how many holds the thread had before the request"""
+    g.db_depth = get_db_pool().depth()
+
+@app.teardown_request
+def release_request_db(exception=None):
+    """Release connections a request left open"""
+    get_db_pool().release_to(g.get('db_depth', 0))
 
 # ==================== OLLAMA FUNCTIONS ====================
 
@@ -181,7 +450,8 @@ def calculate_file_hash(filepath):
     try:
         hash_md5 = hashlib.md5()
         with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            # Large reads keep syscalls down and let hashlib release the GIL
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
     except:
@@ -202,12 +472,19 @@ def extract_text_content(filepath):
     except:
         return f"Filename: {Path(filepath).name}"
 
-def generate_summary(filepath, content):
-    """Generate AI summary for file"""
-    db = get_db()
+def get_model_name(db=None):
+    """Read the configured Ollama model"""
+    close = db is None
+    if close:
+        db = get_db()
     model = db.execute('SELECT value FROM settings WHERE key = ?', ('ollama_model',)).fetchone()
-    model_name = model['value'] if model else 'llama3.2:3b'
-    db.close()
+    if close:
+        db.close()
+    return model['value'] if model else 'llama3.2:3b'
+
+def generate_summary(filepath, content, model_name=None):
+    """Generate AI summary for file"""
+    model_name = model_name or get_model_name()
     
     if not check_ollama_running():
         return None
@@ -223,12 +500,9 @@ Provide only the summary, no other text:"""
     summary = generate_with_ollama(prompt, model_name)
     return summary
 
-def generate_tags(filepath, content):
+def generate_tags(filepath, content, model_name=None):
     """Generate AI tags for file"""
-    db = get_db()
-    model = db.execute('SELECT value FROM settings WHERE key = ?', ('ollama_model',)).fetchone()
-    model_name = model['value'] if model else 'llama3.2:3b'
-    db.close()
+    model_name = model_name or get_model_name()
     if not check_ollama_running():
         # Graceful offline fallback based on file metadata
         fallback = set()
@@ -238,7 +512,7 @@ def generate_tags(filepath, content):
         if mime_type:
             fallback.add(mime_type.split('/')[0])
         return [tag for tag in fallback if tag]
-
+    
     prompt = f"""You are a digital librarian that organizes local files.
 Suggest 3-5 concise category tags (single words or short phrases) for this file.
 Avoid duplicate wording and keep each tag under 30 characters.
@@ -248,164 +522,922 @@ Content preview:
 {content[:1000]}
 
 Respond with comma-separated tags only."""
-
+    
     response = generate_with_ollama(prompt, model_name)
     if response:
         tags = [tag.strip() for tag in response.split(',')]
         return [tag for tag in tags if tag and len(tag) < 30][:5]
     return []
 
-def index_file(filepath):
-    """Index a single file"""
-    try:
-        path_obj = Path(filepath)
+def load_index_settings(db):
+    """Read the settings the indexer needs once per scan"""
+    rows = db.execute('''SELECT key, value FROM settings
+                         WHERE key IN ('auto_tag', 'auto_summarize', 'ollama_model')''').fetchall()
+    values = {row['key']: row['value'] for row in rows}
+    return {
+        'auto_tag': values.get('auto_tag') == 'true',
+        'auto_summarize': values.get('auto_summarize') == 'true',
+        'model': values.get('ollama_model') or 'llama3.2:3b'
+    }
+
+def is_unchanged(existing, stats):
+    """True when the stored size, mtime and inode match a fresh stat"""
+    return existing is not None and existing['size'] == stats.st_size and \
+        existing['mtime_ns'] == stats.st_mtime_ns and existing['inode'] == stats.st_ino
+
+def prepare_index_record(filepath, stats, existing, settings, verify=False):
+    """Hash a file and generate its AI metadata without touching the database
+    
+    Returns None when the file is unchanged, otherwise a record for
+    write_index_record. Safe to call from worker threads.
+    """
+    if existing is not None and not verify and is_unchanged(existing, stats):
+        return None  # File unchanged, skip hashing
+    
+    path_obj = Path(filepath)
+    record = {
+        'path': str(filepath),
+        'filename': path_obj.name,
+        'extension': path_obj.suffix,
+        'size': stats.st_size,
+        'modified_date': datetime.fromtimestamp(stats.st_mtime),
+        'created_date': datetime.fromtimestamp(stats.st_ctime),
+        'mtime_ns': stats.st_mtime_ns,
+        'inode': stats.st_ino,
+        'file_hash': calculate_file_hash(filepath),
+        'existing_id': existing['id'] if existing is not None else None,
+        'content_changed': True,
+        'summary': None,
+        'tags': []
+    }
+    
+    if existing is not None and existing['file_hash'] == record['file_hash']:
+        # Same content, just remember the new stat fingerprint
+        record['content_changed'] = False
+        return record
+    
+    # Extract content and generate AI features if enabled
+    if settings['auto_tag'] or settings['auto_summarize']:
+        content = extract_text_content(filepath)
         
-        if not path_obj.exists() or path_obj.is_dir():
-            return False
+        if settings['auto_summarize']:
+            record['summary'] = generate_summary(filepath, content, settings['model'])
         
-        stats = path_obj.stat()
-        file_hash = calculate_file_hash(filepath)
+        if settings['auto_tag']:
+            record['tags'] = generate_tags(filepath, content, settings['model'])
+    
+    return record
+
+def write_index_record(db, record):
+    """Insert or update a prepared record (caller commits)"""
+    if not record['content_changed']:
+        db.execute('UPDATE files SET size = ?, mtime_ns = ?, inode = ? WHERE id = ?',
+                  (record['size'], record['mtime_ns'], record['inode'], record['existing_id']))
+        return record['existing_id']
+    
+    # Insert or update file
+    if record['existing_id'] is not None:
+        db.execute('''UPDATE files SET filename = ?, extension = ?, size = ?,
+                     modified_date = ?, file_hash = ?, indexed_date = ?,
+                     mtime_ns = ?, inode = ?
+                     WHERE id = ?''',
+                  (record['filename'], record['extension'], record['size'],
+                   record['modified_date'], record['file_hash'], datetime.now(),
+                   record['mtime_ns'], record['inode'], record['existing_id']))
+        file_id = record['existing_id']
+    else:
+        cursor = db.execute('''INSERT INTO files 
+                              (path, filename, extension, size, modified_date, 
+                               created_date, file_hash, mtime_ns, inode)
+                              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                           (record['path'], record['filename'], record['extension'],
+                            record['size'], record['modified_date'], record['created_date'],
+                            record['file_hash'], record['mtime_ns'], record['inode']))
+        file_id = cursor.lastrowid
+    
+    if record['summary']:
+        db.execute('''INSERT OR REPLACE INTO summaries 
+                     (file_id, summary, model_used) VALUES (?, ?, ?)''',
+                  (file_id, record['summary'], 'llama3.2:3b'))
+    
+    for tag_name in record['tags']:
+        # Insert tag if not exists
+        db.execute('INSERT OR IGNORE INTO tags (tag_name) VALUES (?)', 
+                  (tag_name,))
+        tag = db.execute('SELECT id FROM tags WHERE tag_name = ?', 
+                        (tag_name,)).fetchone()
+        if tag:
+            # Link file to tag
+            db.execute('INSERT OR IGNORE INTO file_tags (file_id, tag_id) VALUES (?, ?)',
+                      (file_id, tag['id']))
+            # Update tag usage
+            db.execute('UPDATE tags SET usage_count = usage_count + 1 WHERE id = ?',
+                      (tag['id'],))
+    
+    return file_id
+
+def index_file(filepath, stats=None, verify=False):
+    """Index a single file
+    
+    Files whose size, mtime and inode match the stored row are skipped
+    without hashing. Pass verify=True to always re-hash the contents.
+    """
+    db = None
+    try:
+        if stats is None:
+            stats = os.stat(filepath)
+        if not stat_module.S_ISREG(stats.st_mode):
+            return False
         
         db = get_db()
         
         # Check if file already exists
-        existing = db.execute('SELECT id, file_hash FROM files WHERE path = ?', 
+        existing = db.execute('SELECT id, file_hash, size, mtime_ns, inode FROM files WHERE path = ?', 
                              (str(filepath),)).fetchone()
         
-        if existing and existing['file_hash'] == file_hash:
-            return True  # File unchanged
-        
-        # Insert or update file
-        if existing:
-            db.execute('''UPDATE files SET filename = ?, extension = ?, size = ?,
-                         modified_date = ?, file_hash = ?, indexed_date = ?
-                         WHERE id = ?''',
-                      (path_obj.name, path_obj.suffix, stats.st_size,
-                       datetime.fromtimestamp(stats.st_mtime),
-                       file_hash, datetime.now(), existing['id']))
-            file_id = existing['id']
+        record = prepare_index_record(filepath, stats, existing, load_index_settings(db), verify)
+        if record is not None:
+            write_index_record(db, record)
+            db.commit()
+        return True
+    
+    except Exception as e:
+        print(f"Error indexing {filepath}: {e}")
+        return False
+    finally:
+        if db is not None:
+            db.close()
+
+def glob_to_regex(glob):
+    """Translate a .gitignore glob into a regex over '/'-separated relative paths"""
+    anchored = '/' in glob
+    glob = glob.lstrip('/')
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith('**/', i) and (i == 0 or glob[i - 1] == '/'):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('**', i) and i + 2 == len(glob) and (i == 0 or glob[i - 1] == '/'):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[' and glob.find(']', i + 2) != -1:
+            end = glob.find(']', i + 2)
+            chars = glob[i + 1:end]
+            if chars[0] == '!':
+                chars = '^' + chars[1:]
+            out.append('[' + chars.replace('\\', '\\\\') + ']')
+            i = end
+        elif c == '\\' and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
         else:
-            cursor = db.execute('''INSERT INTO files 
-                                  (path, filename, extension, size, modified_date, 
-                                   created_date, file_hash)
-                                  VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                               (str(filepath), path_obj.name, path_obj.suffix, 
-                                stats.st_size, datetime.fromtimestamp(stats.st_mtime),
-                                datetime.fromtimestamp(stats.st_ctime), file_hash))
-            file_id = cursor.lastrowid
+            out.append(re.escape(c))
+        i += 1
+    pattern = ''.join(out)
+    # Unanchored patterns match a name at any depth
+    return pattern if anchored else '(?:.*/)?' + pattern
+
+def compile_path_rules(patterns):
+    """Compile .gitignore-style exclude patterns into one regex for dirs and one for files
+    
+    The last matching pattern wins, '!' re-includes and a trailing '/'
+    matches directories only. Alternatives are ordered last rule first,
+    so the named group that matches is the deciding rule.
+    """
+    rules = []
+    for line in patterns:
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negated = line.startswith('!')
+        if negated or line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        rules.append((negated, line.endswith('/'), line.rstrip('/')))
+    
+    def combine(dirs):
+        parts = [f'(?P<r{index}>{glob_to_regex(glob)})'
+                 for index, (_, dir_only, glob) in reversed(list(enumerate(rules)))
+                 if glob and (dirs or not dir_only)]
+        return re.compile('|'.join(parts)) if parts else None
+    
+    return {'dirs': combine(True), 'files': combine(False),
+            'negated': [negated for negated, _, _ in rules]}
+
+def load_path_rules(root, db):
+    """Build the scan rules for a root: defaults, the exclude_patterns setting, then its ignore file"""
+    patterns = list(app.config['DEFAULT_EXCLUDES'])
+    row = db.execute("SELECT value FROM settings WHERE key = 'exclude_patterns'").fetchone()
+    if row and row['value']:
+        try:
+            patterns.extend(json.loads(row['value']))
+        except ValueError:
+            print(f"Ignoring invalid exclude_patterns setting: {row['value']}")
+    try:
+        with open(os.path.join(root, app.config['IGNORE_FILE']), 'r', encoding='utf-8') as f:
+            patterns.extend(f.read().splitlines())
+    except OSError:
+        pass
+    return compile_path_rules(patterns)
+
+def path_excluded(rules, relative_path, is_dir):
+    """True if compiled rules exclude a '/'-separated path relative to the scan root"""
+    regex = rules['dirs'] if is_dir else rules['files']
+    match = regex.fullmatch(relative_path) if regex else None
+    return match is not None and not rules['negated'][int(match.lastgroup[1:])]
+
+def walk_files(folder_path, counters=None, resume_after=None, rules=None):
+    """Yield file entries under folder_path in a single os.scandir pass.
+    
+    Paths excluded by rules (from compile_path_rules; hidden entries only
+    when no rules are given) are skipped without a stat call, and excluded
+    directories are never listed. When a counters dict is given it is
+    updated live with files found, entries skipped and directories
+    scanned/pending so callers can estimate the total.
+    
+    Directories are visited depth-first in name order, so a directory path
+    works as a checkpoint: with resume_after, that directory and everything
+    walked before it are skipped.
+    """
+    if counters is None:
+        counters = {}
+    counters.update({'files': 0, 'skipped': 0, 'dirs_scanned': 0, 'dirs_pending': 1})
+    stack = [folder_path]
+    
+    def sort_key(path):
+        relative = os.path.relpath(path, folder_path)
+        return () if relative == os.curdir else tuple(relative.split(os.sep))
+    
+    def leads_to_cursor(path):
+        return resume_after == path or resume_after.startswith(path.rstrip(os.sep) + os.sep)
+    
+    cursor = sort_key(resume_after) if resume_after else None
+    
+    while stack:
+        current = stack.pop()
+        files = []
+        subdirs = []
+        # Rules match '/'-separated paths relative to the root
+        prefix = os.path.relpath(current, folder_path).replace(os.sep, '/') + '/'
+        if prefix == './':
+            prefix = ''
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    # Skip hidden and system files/folders
+                    if rules is None and entry.name.startswith('.'):
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if not is_dir and not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    if rules is not None and path_excluded(rules, prefix + entry.name, is_dir):
+                        counters['skipped'] += 1
+                        continue
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    else:
+                        files.append(entry)
+        except OSError as e:
+            print(f"Cannot read directory {current}: {e}")
         
-        # Extract content and generate AI features if enabled
-        auto_tag = db.execute('SELECT value FROM settings WHERE key = ?', 
-                             ('auto_tag',)).fetchone()
-        auto_summarize = db.execute('SELECT value FROM settings WHERE key = ?', 
-                                    ('auto_summarize',)).fetchone()
+        files.sort(key=lambda entry: entry.name)
+        subdirs.sort()
         
-        if (auto_tag and auto_tag['value'] == 'true') or \
-           (auto_summarize and auto_summarize['value'] == 'true'):
-            content = extract_text_content(filepath)
+        # The checkpoint and its parents had their own files indexed already
+        if resume_after and leads_to_cursor(current):
+            files = []
+            subdirs = [d for d in subdirs if leads_to_cursor(d) or sort_key(d) > cursor]
+        
+        stack.extend(reversed(subdirs))
+        counters['dirs_scanned'] += 1
+        counters['dirs_pending'] += len(subdirs) - 1
+        counters['files'] += len(files)
+        yield from files
+
+
+def estimate_total(counters):
+    """Estimate total files from the files seen per directory so far"""
+    if not counters.get('dirs_scanned'):
+        return counters.get('files', 0)
+    per_dir = counters['files'] / counters['dirs_scanned']
+    return counters['files'] + int(per_dir * counters['dirs_pending'])
+
+def index_writer(records, batch_size, job_id=None):
+    """Single writer thread: apply prepared records and commit them in batches
+    
+    ('checkpoint', directory, progress) items advance the scan job's cursor
+    in the same transaction as the records queued before them. A record
+    that fails to write is undone on its own, and a batch that fails to
+    commit is retried a record at a time; if any record fails, the cursor
+    stays where it was so a resumed scan tries it again.
+    """
+    db = get_db()
+    batch = []  # Records written since the last commit
+    checkpoint = None  # Latest cursor written since the last commit
+    held = False  # A record failed to write or commit, so the cursor can't move past it
+    
+    def save_checkpoint(cursor, progress):
+        db.execute('''UPDATE scan_jobs SET cursor = ?, progress = ?, updated_date = ?
+                      WHERE id = ?''', (cursor, progress, datetime.now(), job_id))
+    
+    def commit():
+        nonlocal checkpoint, held
+        try:
+            db.commit()
+        except sqlite3.Error as e:
+            app.logger.warning('Index batch of %d files failed to commit, retrying one at a time: %s', len(batch), e)
+            db.rollback()
+            for record in batch:
+                try:
+                    write_index_record(db, record)
+                    db.commit()
+                except Exception as e:
+                    app.logger.error('Error indexing %s: %s', record['path'], e)
+                    db.rollback()
+                    held = True
+            if checkpoint is not None and not held:
+                try:
+                    save_checkpoint(*checkpoint)
+                    db.commit()
+                except sqlite3.Error as e:
+                    app.logger.error('Error saving scan checkpoint: %s', e)
+                    db.rollback()
+        batch.clear()
+        checkpoint = None
+    
+    try:
+        while True:
+            try:
+                record = records.get(timeout=1.0)
+            except queue.Empty:
+                # Idle: make what we have visible to readers
+                if batch:
+                    commit()
+                continue
             
-            # Generate summary
-            if auto_summarize and auto_summarize['value'] == 'true':
-                summary = generate_summary(filepath, content)
-                if summary:
-                    db.execute('''INSERT OR REPLACE INTO summaries 
-                                 (file_id, summary, model_used) VALUES (?, ?, ?)''',
-                              (file_id, summary, 'llama3.2:3b'))
+            if record is None:
+                break
             
-            # Generate tags
-            if auto_tag and auto_tag['value'] == 'true':
-                tags = generate_tags(filepath, content)
-                for tag_name in tags:
-                    # Insert tag if not exists
-                    db.execute('INSERT OR IGNORE INTO tags (tag_name) VALUES (?)', 
-                              (tag_name,))
-                    tag = db.execute('SELECT id FROM tags WHERE tag_name = ?', 
-                                    (tag_name,)).fetchone()
-                    if tag:
-                        # Link file to tag
-                        db.execute('INSERT OR IGNORE INTO file_tags (file_id, tag_id) VALUES (?, ?)',
-                                  (file_id, tag['id']))
-                        # Update tag usage
-                        db.execute('UPDATE tags SET usage_count = usage_count + 1 WHERE id = ?',
-                                  (tag['id'],))
+            if isinstance(record, tuple):
+                if not held:
+                    _, cursor, progress = record
+                    save_checkpoint(cursor, progress)
+                    checkpoint = (cursor, progress)
+                continue
+            
+            # Inside the batch's transaction, so releasing the savepoint doesn't commit
+            if not db.in_transaction:
+                db.execute('BEGIN')
+            db.execute('SAVEPOINT record')
+            try:
+                write_index_record(db, record)
+                db.execute('RELEASE record')
+                batch.append(record)
+            except Exception as e:
+                app.logger.error('Error indexing %s: %s', record['path'], e)
+                db.execute('ROLLBACK TO record')
+                db.execute('RELEASE record')
+                # Never written, so a resumed scan has to reach this file again
+                held = True
+            
+            if len(batch) >= batch_size:
+                commit()
         
-        db.commit()
+        commit()
+    finally:
         db.close()
-        return True
-        
-    except Exception as e:
-        print(f"Error indexing {filepath}: {e}")
-        return False
-
-def scan_folder(folder_path):
-    """Scan folder and index all files"""
-    global indexing_status
 
-    indexing_status['active'] = True
-    indexing_status['progress'] = 0
+def scan_folder(folder_path, verify=False, status=None, control=None):
+    """Scan folder and index all files (verify=True re-hashes unchanged files)
+    
+    The walker feeds a pool of hash/extract workers and a single writer
+    thread commits their results in batches. Progress is checkpointed in
+    scan_jobs, so a scan interrupted part way resumes where it stopped.
+    A job whose walk raised is marked failed with the error, and is resumed
+    from its checkpoint like one that was interrupted.
+    Progress goes to the status dict (indexing_status by default), and
+    control(), if given, is called before each file to pause or stop the scan.
+    """
+    if status is None:
+        status = indexing_status
+    
+    status['active'] = True
+    status['progress'] = 0
+    status['total'] = 0
+    status['files_per_sec'] = 0
+    status['mb_per_sec'] = 0
+    status['skipped'] = 0
+    
+    workers = app.config['INDEX_WORKERS']
+    batch_size = app.config['INDEX_BATCH_SIZE']
+    started = time.time()
+    bytes_indexed = 0
+    resumed_from = 0
+    
+    # Directories in walk order whose files are still being hashed
+    open_dirs = deque()
+    dir_pending = {}
+    
+    def update_throughput():
+        elapsed = max(time.time() - started, 1e-6)
+        done = status['progress'] - resumed_from
+        status['files_per_sec'] = round(done / elapsed, 1)
+        status['mb_per_sec'] = round(bytes_indexed / elapsed / (1024 * 1024), 2)
+    
+    def advance_checkpoint():
+        # A directory is done once the walk has moved past it and its files are queued
+        cursor = None
+        while len(open_dirs) > 1 and not dir_pending.get(open_dirs[0]):
+            cursor = open_dirs.popleft()
+            dir_pending.pop(cursor, None)
+        if cursor is not None:
+            records.put(('checkpoint', cursor, status['progress']))
+    
+    def finish(future):
+        nonlocal bytes_indexed
+        status['progress'] += 1
+        dir_pending[in_flight_dirs.pop(future)] -= 1
+        try:
+            record = future.result()
+        except Exception as e:
+            print(f"Error indexing file: {e}")
+            record = None
+        if record is not None:
+            bytes_indexed += record['size']
+            records.put(record)
+        update_throughput()
     
     try:
         path_obj = Path(os.path.expanduser(folder_path))
         if not path_obj.exists():
             return
+        root = str(path_obj)
+        
+        # Load settings and the rows under this folder once for the whole scan
+        db = get_db()
+        settings = load_index_settings(db)
+        rules = load_path_rules(root, db)
+        known = {
+            row['path']: row for row in db.execute(
+                '''SELECT id, path, file_hash, size, mtime_ns, inode FROM files
+                   WHERE path >= ? AND path < ?''',
+                (root + os.sep, root + chr(ord(os.sep) + 1)))
+        }
+        
+        # Resume an unfinished or failed scan of this folder, or start a new one
+        job = db.execute(
+            "SELECT id, cursor, progress FROM scan_jobs WHERE root = ? AND status IN ('running', 'failed') "
+            "ORDER BY id DESC LIMIT 1", (root,)).fetchone()
+        if job:
+            job_id, resume_after, resumed_from = job['id'], job['cursor'], job['progress']
+            db.execute("UPDATE scan_jobs SET status = 'running', error = NULL WHERE id = ?", (job_id,))
+            db.commit()
+        else:
+            job_id = db.execute('INSERT INTO scan_jobs (root) VALUES (?)', (root,)).lastrowid
+            db.commit()
+            resume_after = None
+        db.close()
+        status['progress'] = resumed_from
         
-        # Get all files
-        all_files = []
-        for root, dirs, files in os.walk(folder_path):
-            # Skip hidden and system folders
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            for file in files:
-                if not file.startswith('.'):
-                    all_files.append(os.path.join(root, file))
+        records = queue.Queue(maxsize=batch_size * 2)
+        writer = threading.Thread(target=index_writer, args=(records, batch_size, job_id), daemon=True)
+        writer.start()
         
-        indexing_status['total'] = len(all_files)
+        walk_error = None
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='indexer') as pool:
+                in_flight = set()
+                in_flight_dirs = {}
+                counters = {}
+                
+                for entry in walk_files(root, counters, resume_after, rules):
+                    if control:
+                        control()
+                    status['total'] = resumed_from + estimate_total(counters)
+                    status['skipped'] = counters['skipped']
+                    status['current_file'] = entry.name
+                    
+                    directory = os.path.dirname(entry.path)
+                    if not open_dirs or open_dirs[-1] != directory:
+                        open_dirs.append(directory)
+                        advance_checkpoint()
+                    
+                    existing = known.get(entry.path)
+                    try:
+                        stats = entry.stat()
+                    except OSError:
+                        status['progress'] += 1
+                        continue
+                    
+                    if existing is not None and not verify and is_unchanged(existing, stats):
+                        status['progress'] += 1
+                        continue
+                    
+                    future = pool.submit(prepare_index_record, entry.path, stats,
+                                         existing, settings, verify)
+                    in_flight.add(future)
+                    in_flight_dirs[future] = directory
+                    dir_pending[directory] = dir_pending.get(directory, 0) + 1
+                    
+                    # Bound the work queued ahead of the workers
+                    if len(in_flight) >= workers * 4:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future)
+                        advance_checkpoint()
+                
+                for future in as_completed(in_flight):
+                    finish(future)
+        except ScanCancelled:
+            # Left running, so the next scan of this folder picks it up
+            raise
+        except Exception as e:
+            walk_error = e
+            raise
+        finally:
+            records.put(None)
+            writer.join()
+            if walk_error is not None:
+                # The cursor stays at the last committed checkpoint
+                db = get_db()
+                db.execute("UPDATE scan_jobs SET status = 'failed', error = ?, updated_date = ? WHERE id = ?",
+                           (str(walk_error), datetime.now(), job_id))
+                db.commit()
+                db.close()
         
-        for i, filepath in enumerate(all_files):
-            indexing_status['progress'] = i + 1
-            indexing_status['current_file'] = os.path.basename(filepath)
-            index_file(filepath)
+        # Every record is committed
+        db = get_db()
+        db.execute("UPDATE scan_jobs SET status = 'completed', cursor = NULL, progress = ?, "
+                   "updated_date = ? WHERE id = ?", (status['progress'], datetime.now(), job_id))
+        db.commit()
+        db.close()
         
+        status['total'] = status['progress']
+        status['skipped'] = counters['skipped']
+        update_throughput()
+    
     finally:
-        indexing_status['active'] = False
-        indexing_status['current_file'] = 'Complete'
+        status['active'] = False
+        status['current_file'] = 'Complete'
+
+# ==================== SCAN JOBS ====================
+
+# Lower runs first; interactive scans pre-empt background ones
+SCAN_PRIORITIES = {'interactive': 0, 'background': 10}
+
+scan_tasks = {}
+scan_queue = []  # heap of (priority, job id)
+scan_lock = threading.Lock()
+scan_ids = itertools.count(1)
+
+class ScanCancelled(Exception):
+    """Raised inside scan_folder to stop a cancelled job"""
+
+def public_scan_task(task):
+    """Job fields safe to return as JSON"""
+    return {key: value for key, value in task.items() if not key.startswith('_')}
+
+def submit_scan(folder, verify=False, priority='interactive'):
+    """Queue a scan job and return its id"""
+    with scan_lock:
+        task = {
+            'id': next(scan_ids),
+            'folder': folder,
+            'verify': verify,
+            'priority': priority,
+            'state': 'queued',  # queued, running, paused, cancelled, completed, failed
+            'active': False,
+            'progress': 0,
+            'total': 0,
+            'current_file': '',
+            'files_per_sec': 0,
+            'mb_per_sec': 0,
+            'skipped': 0,
+            'error': None,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'started': None,
+            'finished': None,
+            # Checked by the scan thread between files; a requested pause parks
+            # it on _resume, and only then is its slot handed to another job
+            '_resume': threading.Event(),
+            '_pause_requested': False,
+            '_cancel': False,
+            '_preempted': False,
+        }
+        task['_resume'].set()
+        scan_tasks[task['id']] = task
+        heapq.heappush(scan_queue, (SCAN_PRIORITIES[priority], task['id']))
+        schedule_scans()
+    return task['id']
+
+def cancel_scan(job_id):
+    """Cancel a queued, running or paused job"""
+    with scan_lock:
+        task = scan_tasks.get(job_id)
+        if task is None or task['state'] in ('cancelled', 'completed', 'failed'):
+            return False
+        if task['state'] == 'queued':
+            # Left in the heap; schedule_scans skips it
+            task['state'] = 'cancelled'
+            task['finished'] = datetime.now().isoformat(timespec='seconds')
+        else:
+            task['_cancel'] = True
+            task['_pause_requested'] = False
+            task['_resume'].set()
+    return True
+
+def pause_scan(job_id):
+    """Pause a running job at its next file, freeing its slot"""
+    with scan_lock:
+        task = scan_tasks.get(job_id)
+        if task is None or task['state'] != 'running' or task['_pause_requested']:
+            return False
+        task['_pause_requested'] = True
+    return True
+
+def resume_scan(job_id):
+    """Resume a job paused with pause_scan"""
+    with scan_lock:
+        task = scan_tasks.get(job_id)
+        if task is None or task['_preempted']:
+            return False
+        if task['_pause_requested']:
+            # Not parked yet, so just withdraw the request
+            task['_pause_requested'] = False
+            return True
+        if task['state'] != 'paused':
+            return False
+        task['state'] = 'queued'
+        heapq.heappush(scan_queue, (SCAN_PRIORITIES[task['priority']], job_id))
+        schedule_scans()
+    return True
+
+def schedule_scans():
+    """Start or resume jobs while there are free slots (caller holds scan_lock)"""
+    while True:
+        # Jobs asked to pause keep their slot until they park
+        running = [t for t in scan_tasks.values() if t['state'] == 'running']
+        preempted = [t for t in scan_tasks.values() if t['_preempted'] and t['state'] == 'paused']
+        
+        while scan_queue and scan_tasks[scan_queue[0][1]]['state'] != 'queued':
+            heapq.heappop(scan_queue)
+        
+        # Best waiting job: queued, or paused earlier to make room
+        candidates = [scan_tasks[scan_queue[0][1]]] if scan_queue else []
+        candidates.extend(preempted)
+        if not candidates:
+            return
+        task = min(candidates, key=lambda t: (SCAN_PRIORITIES[t['priority']], t['id']))
+        
+        if len(running) >= app.config['MAX_CONCURRENT_SCANS']:
+            if any(t['_pause_requested'] for t in running):
+                return
+            # Pre-empt the lowest priority, most recently started job if it ranks below;
+            # it calls back in here once parked
+            victim = max(running, key=lambda t: (SCAN_PRIORITIES[t['priority']], t['started']))
+            if SCAN_PRIORITIES[victim['priority']] <= SCAN_PRIORITIES[task['priority']]:
+                return
+            victim['_pause_requested'] = True
+            victim['_preempted'] = True
+            return
+        
+        # No longer 'queued', so the loop above drops its heap entry
+        task['state'] = 'running'
+        if task['started']:
+            # Its thread is parked in scan_control
+            task['_preempted'] = False
+            task['_resume'].set()
+        else:
+            task['started'] = datetime.now().isoformat(timespec='seconds')
+            threading.Thread(target=run_scan_task, args=(task,), daemon=True).start()
+
+def scan_control(task):
+    """Called by scan_folder before each file: park while paused, stop when cancelled"""
+    if task['_pause_requested']:
+        with scan_lock:
+            if task['_pause_requested']:
+                task['_pause_requested'] = False
+                task['state'] = 'paused'
+                task['_resume'].clear()
+                schedule_scans()
+        task['_resume'].wait()
+    if task['_cancel']:
+        raise ScanCancelled()
+
+def run_scan_task(task):
+    """Scan thread body for a job"""
+    try:
+        scan_folder(task['folder'], task['verify'], status=task, control=lambda: scan_control(task))
+        state = 'completed'
+    except ScanCancelled:
+        state = 'cancelled'
+        task['current_file'] = 'Cancelled'
+    except Exception as e:
+        print(f"Error scanning {task['folder']}: {e}")
+        task['error'] = str(e)
+        state = 'failed'
+    
+    with scan_lock:
+        task['state'] = state
+        task['active'] = False
+        task['_preempted'] = False
+        task['finished'] = datetime.now().isoformat(timespec='seconds')
+        schedule_scans()
+
+def current_indexing_status():
+    """Status of the most important unfinished job, else the latest one, for /api/status"""
+    with scan_lock:
+        tasks = sorted(scan_tasks.values(), key=lambda t: t['id'], reverse=True)
+        unfinished = [t for t in tasks if t['state'] in ('queued', 'running', 'paused')]
+    if not tasks:
+        return indexing_status
+    if unfinished:
+        busy = [t for t in unfinished if t['state'] == 'running'] or unfinished
+        task = min(busy, key=lambda t: (SCAN_PRIORITIES[t['priority']], t['id']))
+    else:
+        task = tasks[0]
+    status = public_scan_task(task)
+    status['jobs'] = len(unfinished)
+    return status
 
 # ==================== SEARCH FUNCTIONS ====================
 
-def search_files(query, limit=20):
-    """Search files using natural language query"""
-    db = get_db()
+class SearchCache:
+    """Bounded LRU cache of search and file list results
     
-    # Simple keyword search (can be enhanced with NLP)
-    keywords = query.lower().split()
+    Each entry is stamped with the pool and catalog generation it was read
+    at. Every commit that writes starts a new generation, so a hit is always
+    what the query would return now; the whole cache is emptied the first
+    time a newer generation is seen. Least recently used entries are evicted
+    beyond max_entries or max_bytes (estimated sizes).
+    """
+    
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (rows, size)
+        self._stamp = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute):
+        """Cached rows for key, or compute()'s rows, cached for next time"""
+        pool = get_db_pool()
+        # Results read through uncommitted writes may yet be rolled back
+        if pool.writing():
+            return compute()
+        # Read the generation first: a commit landing mid-query makes the stamp older, never newer
+        stamp = (pool, pool.generation)
+        with self._lock:
+            self._advance(stamp)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        
+        rows = compute()
+        size = estimate_size(key) + estimate_size(rows)
+        with self._lock:
+            self._advance(stamp)
+            if stamp == self._stamp and size <= self.max_bytes:
+                if key in self._entries:
+                    self._bytes -= self._entries.pop(key)[1]
+                self._entries[key] = (rows, size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._bytes -= self._entries.popitem(last=False)[1][1]
+                    self.evictions += 1
+        return rows
     
-    results = []
+    def _advance(self, stamp):
+        """Empty the cache when the pool changes or a newer generation shows up (lock held)"""
+        current = self._stamp
+        if current is None or current[0] is not stamp[0] or stamp[1] > current[1]:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._stamp = stamp
     
-    # Search in filenames, tags, and summaries
-    for keyword in keywords:
-        # Filename search
-        rows = db.execute('''
-            SELECT DISTINCT f.*, GROUP_CONCAT(t.tag_name, ',') as tags, s.summary
-            FROM files f
-            LEFT JOIN file_tags ft ON f.id = ft.file_id
-            LEFT JOIN tags t ON ft.tag_id = t.id
+    def stats(self):
+        """Hit, miss, eviction and size counters for tuning the limits"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'generation': self._stamp[1] if self._stamp else None
+            }
+
+def estimate_size(value):
+    """Approximate bytes held by a value made of containers, strings and numbers"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache():
+    """Get the shared search result cache"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(app.config['SEARCH_CACHE_ENTRIES'], app.config['SEARCH_CACHE_BYTES'])
+    return _search_cache
+
+
+def search_files(query, limit=20):
+    """Rank files by how well they match the query's keywords across filename, tags and summary"""
+    # One FTS query for all keywords: each matches as a word prefix, and bm25
+    # scores a file higher the more keywords it matches and the weightier the column
+    keywords = list(dict.fromkeys(re.findall(r'\w+', query.lower())))
+    if not keywords:
+        return []
+    match = ' OR '.join(f'"{keyword}"*' for keyword in keywords)
+    # Keywords of a trigram or more also match inside filenames, as the old LIKE
+    # search did ('report' finds 'myreport.pdf'); those files follow the ranked ones
+    inside = [trigram_query(keyword) for keyword in keywords if len(keyword) >= 3]
+    substring = f"filename : ({' OR '.join(inside)})" if inside else None
+    # Queries differing only in case, spacing or punctuation share an entry
+    return get_search_cache().get_or_compute(('search', match, limit),
+                                             lambda: rank_files(match, limit, substring))
+
+
+def rank_files(match, limit, substring=None):
+    """Top files for a file_search MATCH expression, best first, then newer file_trigrams matches for substring"""
+    columns = '''f.*,
+               (SELECT GROUP_CONCAT(t.tag_name, ',') FROM file_tags ft JOIN tags t ON ft.tag_id = t.id
+                WHERE ft.file_id = f.id) as tags,
+               s.summary'''
+    db = get_db()
+    try:
+        # bm25 costs a few µs a match, so a broad query is ranked among its newest
+        # SEARCH_RANK_LIMIT matches, which walking the index in rowid order finds
+        # without scoring the rest; narrower queries are ranked in full
+        rows = db.execute(f'''
+            SELECT {columns}, ROUND(-hits.rank, 3) as score
+            FROM (SELECT rowid, rank FROM file_search WHERE file_search MATCH ?
+                  ORDER BY rowid DESC LIMIT ?) hits
+            JOIN files f ON f.id = hits.rowid
             LEFT JOIN summaries s ON f.id = s.file_id
-            WHERE LOWER(f.filename) LIKE ? OR LOWER(s.summary) LIKE ? OR LOWER(t.tag_name) LIKE ?
-            GROUP BY f.id
+            ORDER BY hits.rank, hits.rowid DESC
             LIMIT ?
-        ''', (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%', limit)).fetchall()
+        ''', (match, app.config['SEARCH_RANK_LIMIT'], limit)).fetchall()
+        results = [dict(row) for row in rows]
         
-        for row in rows:
-            if row['id'] not in [r['id'] for r in results]:
-                results.append(dict(row))
-    
-    db.close()
+        if substring and len(results) < limit:
+            found = {row['id'] for row in results}
+            rows = db.execute(f'''
+                SELECT {columns}, NULL as score
+                FROM (SELECT rowid FROM file_trigrams WHERE file_trigrams MATCH ? ORDER BY rowid DESC LIMIT ?) hits
+                JOIN files f ON f.id = hits.rowid
+                LEFT JOIN summaries s ON f.id = s.file_id
+                ORDER BY hits.rowid DESC
+            ''', (substring, limit + len(found))).fetchall()
+            results.extend(dict(row) for row in rows if row['id'] not in found)
+    finally:
+        db.close()
     return results[:limit]
 
 
+def trigram_query(text):
+    """FTS5 query matching text anywhere in a file_trigrams column, or None if shorter than a trigram"""
+    text = text.strip()
+    if len(text) < 3:
+        return None
+    return '"' + text.replace('"', '""') + '"'
+
+
 def fetch_files(query=None, tag=None, limit=50, sort='recent'):
     """Retrieve files with optional filtering for UI views"""
     db = get_db()
-
+    
     base_query = """
         SELECT f.*, GROUP_CONCAT(t.tag_name, ',') as tags, s.summary
         FROM files f
@@ -413,28 +1445,41 @@ def fetch_files(query=None, tag=None, limit=50, sort='recent'):
         LEFT JOIN tags t ON ft.tag_id = t.id
         LEFT JOIN summaries s ON f.id = s.file_id
     """
-
+    
     conditions = []
     params = []
-
+    
     if query:
         like_query = f"%{query.lower()}%"
-        conditions.append("(LOWER(f.filename) LIKE ? OR LOWER(f.path) LIKE ? OR LOWER(s.summary) LIKE ?)")
-        params.extend([like_query, like_query, like_query])
-
+        match = trigram_query(query)
+        if match:
+            # Names and paths come from the trigram index; only summaries are scanned
+            conditions.append('''f.id IN (SELECT rowid FROM file_trigrams WHERE file_trigrams MATCH ?
+                                          UNION SELECT file_id FROM summaries WHERE LOWER(summary) LIKE ?)''')
+            params.extend([match, like_query])
+        else:
+            conditions.append("(LOWER(f.filename) LIKE ? OR LOWER(f.path) LIKE ? OR LOWER(s.summary) LIKE ?)")
+            params.extend([like_query, like_query, like_query])
+    
     if tag:
         conditions.append("LOWER(t.tag_name) LIKE ?")
         params.append(f"%{tag.lower()}%")
-
+    
     where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
     order_clause = " ORDER BY f.modified_date DESC" if sort == 'recent' else " ORDER BY f.filename ASC"
-
+    
     query_sql = base_query + where_clause + " GROUP BY f.id" + order_clause + " LIMIT ?"
     params.append(limit)
-
-    rows = db.execute(query_sql, params).fetchall()
-    db.close()
-    return [dict(row) for row in rows]
+    
+    def read_rows():
+        rows = db.execute(query_sql, params).fetchall()
+        return [dict(row) for row in rows]
+    
+    try:
+        # The same statement and parameters give the same rows until the catalog changes
+        return get_search_cache().get_or_compute(('files', query_sql, tuple(params)), read_rows)
+    finally:
+        db.close()
 
 
 def apply_tags_to_file(file_id, tag_list):
@@ -461,7 +1506,7 @@ def ensure_file_record(file_path):
     db.close()
     if record:
         return record
-
+    
     # Index the file to insert it
     index_file(file_path)
     db = get_db()
@@ -476,24 +1521,24 @@ def move_files_to_category(file_records, destination_root, category_name):
     secure_category = secure_filename(category_name) or 'categorized'
     category_dir = dest_root / secure_category
     category_dir.mkdir(parents=True, exist_ok=True)
-
+    
     moved = []
     errors = []
-
+    
     db = get_db()
-
+    
     for record in file_records:
         file_path = Path(record['path'])
         if not file_path.exists():
             errors.append({'file': str(file_path), 'error': 'File not found on disk'})
             continue
-
+        
         target_path = category_dir / file_path.name
         counter = 1
         while target_path.exists():
             target_path = category_dir / f"{file_path.stem}_{counter}{file_path.suffix}"
             counter += 1
-
+        
         try:
             shutil.move(str(file_path), target_path)
             stats = target_path.stat()
@@ -506,7 +1551,7 @@ def move_files_to_category(file_records, destination_root, category_name):
             moved.append({'from': str(file_path), 'to': str(target_path)})
         except Exception as exc:
             errors.append({'file': str(file_path), 'error': str(exc)})
-
+    
     db.commit()
     db.close()
     return moved, errors
@@ -543,10 +1588,10 @@ def api_status():
     file_count = db.execute('SELECT COUNT(*) as count FROM files').fetchone()['count']
     tag_count = db.execute('SELECT COUNT(*) as count FROM tags').fetchone()['count']
     db.close()
-
+    
     return jsonify({
         'ollama': ollama_status,
-        'indexing': indexing_status,
+        'indexing': current_indexing_status(),
         'stats': {
             'files': file_count,
             'tags': tag_count
@@ -567,21 +1612,55 @@ def api_search():
     results = search_files(query)
     return jsonify({'results': results})
 
+@app.route('/api/search/cache')
+def api_search_cache():
+    """Search cache counters: hit rate, size and evictions"""
+    return jsonify(get_search_cache().stats())
+
 @app.route('/api/scan', methods=['POST'])
 def api_scan():
     """Start folder scan"""
     data = request.json
     folder = os.path.expanduser(data.get('folder', ''))
-
+    
     if not folder or not os.path.exists(folder):
         return jsonify({'error': 'Invalid folder path'}), 400
     
-    # Start scan in background thread
-    thread = threading.Thread(target=scan_folder, args=(folder,))
-    thread.daemon = True
-    thread.start()
+    verify = bool(data.get('verify', False))
+    priority = data.get('priority', 'interactive')
+    if priority not in SCAN_PRIORITIES:
+        return jsonify({'error': f'Unknown priority: {priority}'}), 400
+    
+    # Queue the scan; it starts in the background when a slot is free
+    job_id = submit_scan(folder, verify, priority)
+    state = scan_tasks[job_id]['state']
     
-    return jsonify({'status': 'started'})
+    return jsonify({'status': 'started' if state == 'running' else 'queued', 'job_id': job_id})
+
+@app.route('/api/scan/jobs')
+def api_scan_jobs():
+    """List scan jobs, newest first"""
+    with scan_lock:
+        jobs = [public_scan_task(t) for t in sorted(scan_tasks.values(), key=lambda t: t['id'], reverse=True)]
+    return jsonify({'jobs': jobs})
+
+@app.route('/api/scan/jobs/<int:job_id>')
+def api_scan_job(job_id):
+    """Get one scan job's progress"""
+    task = scan_tasks.get(job_id)
+    if task is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(public_scan_task(task))
+
+@app.route('/api/scan/jobs/<int:job_id>/<action>', methods=['POST'])
+def api_scan_job_action(job_id, action):
+    """Cancel, pause or resume a scan job"""
+    actions = {'cancel': cancel_scan, 'pause': pause_scan, 'resume': resume_scan}
+    if action not in actions:
+        return jsonify({'error': f'Unknown action: {action}'}), 400
+    if job_id not in scan_tasks:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'success': actions[action](job_id)})
 
 @app.route('/api/ollama/pull', methods=['POST'])
 def api_ollama_pull():
@@ -630,7 +1709,7 @@ def api_file_detail(file_id):
     ''', (file_id,)).fetchone()
     
     db.close()
-
+    
     if file:
         return jsonify(dict(file))
     return jsonify({'error': 'File not found'}), 404
@@ -654,13 +1733,13 @@ def api_categorize_files():
     payload = request.json or {}
     file_ids = payload.get('file_ids', [])
     paths = payload.get('paths', [])
-
+    
     if not file_ids and not paths:
         return jsonify({'error': 'No files provided'}), 400
-
+    
     categorized = []
     errors = []
-
+    
     # Convert paths into records
     for file_path in paths:
         record = ensure_file_record(os.path.expanduser(file_path))
@@ -668,28 +1747,28 @@ def api_categorize_files():
             file_ids.append(record['id'])
         else:
             errors.append({'file': file_path, 'error': 'File could not be indexed'})
-
+    
     db = get_db()
     for file_id in file_ids:
         record = db.execute('SELECT * FROM files WHERE id = ?', (file_id,)).fetchone()
         if not record:
             errors.append({'file': str(file_id), 'error': 'Unknown file id'})
             continue
-
+        
         file_path = record['path']
         content = extract_text_content(file_path)
         tags = generate_tags(file_path, content)
         apply_tags_to_file(file_id, tags)
-
+        
         # Optional summary refresh
         summary = generate_summary(file_path, content)
         if summary:
             db.execute('''INSERT OR REPLACE INTO summaries (file_id, summary, model_used)
                          VALUES (?, ?, ?)''', (file_id, summary, 'llama3.2:3b'))
             db.commit()
-
+        
         categorized.append({'file_id': file_id, 'tags': tags, 'summary': summary})
-
+    
     db.close()
     return jsonify({'categorized': categorized, 'errors': errors})
 
@@ -702,36 +1781,36 @@ def api_move_files():
     destination_root = payload.get('destination_root', '')
     file_ids = payload.get('file_ids', [])
     paths = payload.get('paths', [])
-
+    
     if not category or not destination_root:
         return jsonify({'error': 'Category and destination_root are required'}), 400
-
+    
     if not file_ids and not paths:
         return jsonify({'error': 'No files selected'}), 400
-
+    
     records = []
     errors = []
     db = get_db()
-
+    
     for file_id in file_ids:
         record = db.execute('SELECT * FROM files WHERE id = ?', (file_id,)).fetchone()
         if record:
             records.append(record)
         else:
             errors.append({'file': str(file_id), 'error': 'Unknown file id'})
-
+    
     db.close()
-
+    
     for file_path in paths:
         record = ensure_file_record(os.path.expanduser(file_path))
         if record:
             records.append(record)
         else:
             errors.append({'file': file_path, 'error': 'File could not be indexed'})
-
+    
     moved, move_errors = move_files_to_category(records, destination_root, category)
     errors.extend(move_errors)
-
+    
     return jsonify({'moved': moved, 'errors': errors})
 
 @app.route('/api/tags')
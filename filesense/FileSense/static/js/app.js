@@ -44,15 +44,19 @@ async function refreshStatus() {
         document.getElementById('sidebar-ollama').textContent = ollamaRunning ? 'Ollama • Running' : 'Ollama • Offline';
 
         const indexing = data.indexing;
-        document.getElementById('stat-index').textContent = indexing.active ? 'Indexing…' : 'Idle';
+        document.getElementById('stat-index').textContent = indexing.state === 'paused'
+            ? 'Paused'
+            : (indexing.active ? (indexing.jobs > 1 ? `Indexing… (${indexing.jobs} jobs)` : 'Indexing…') : 'Idle');
         document.getElementById('stat-progress').textContent = indexing.active
-            ? `${indexing.progress} / ${indexing.total} • ${indexing.current_file}`
+            ? `${indexing.progress} / ${indexing.total} • ${indexing.files_per_sec} files/s • ${indexing.mb_per_sec} MB/s • ${indexing.current_file}`
             : 'Start a scan to populate results';
         document.getElementById('sidebar-indexing').textContent = indexing.active ? 'Indexing • Active' : 'Indexing • Idle';
 
         if (indexing.total > 0) {
             const percent = Math.round((indexing.progress / indexing.total) * 100);
-            document.getElementById('progress-label').textContent = indexing.active ? `Indexing ${percent}%` : 'Complete';
+            document.getElementById('progress-label').textContent = indexing.active
+                ? `Indexing ${percent}%`
+                : (indexing.skipped ? `Complete • ${indexing.skipped} excluded` : 'Complete');
             document.getElementById('progress-fill').style.width = `${percent}%`;
         }
     } catch (err) {
@@ -180,6 +184,8 @@ async function startScan() {
     const data = await response.json();
     if (data.status === 'started') {
         document.getElementById('progress-label').textContent = 'Indexing…';
+    } else if (data.status === 'queued') {
+        document.getElementById('progress-label').textContent = 'Queued…';
     } else if (data.error) {
         alert(data.error);
     }
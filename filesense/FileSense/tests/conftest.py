@@ -0,0 +1,32 @@
+"""
+Shared fixtures: the web app, loaded by path, on a throwaway database
+"""
+import os
+import importlib.util
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture(scope='session')
+def web_app():
+    """The app.py module, under a name that can't clash with the desktop app package"""
+    spec = importlib.util.spec_from_file_location('filesense_web', APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def web(web_app, tmp_path, monkeypatch):
+    """The web app with a new, initialized database and empty scan and search state"""
+    monkeypatch.setitem(web_app.app.config, 'DATABASE', str(tmp_path / 'filesense.db'))
+    monkeypatch.setattr(web_app, '_search_cache', None)
+    monkeypatch.setattr(web_app, 'scan_tasks', {})
+    monkeypatch.setattr(web_app, 'scan_queue', [])
+    web_app.init_db()
+    try:
+        yield web_app
+    finally:
+        web_app.get_db_pool().close_all()
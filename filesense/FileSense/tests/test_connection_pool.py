@@ -0,0 +1,99 @@
+"""
+get_db() connections come from a pool: one per thread, reused once released
+"""
+import threading
+
+
+def connect_on_thread(web):
+    """The connection get_db() gives a new thread, which closes it again"""
+    result = []
+    
+    def connect():
+        db = web.get_db()
+        result.append(db)
+        db.close()
+    thread = threading.Thread(target=connect)
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_thread_shares_its_connection(web):
+    pool = web.get_db_pool()
+    outer = web.get_db()
+    inner = web.get_db()
+    assert inner is outer
+    assert pool.depth() == 2
+    
+    # Closing the inner hold leaves the connection with the outer one
+    inner.close()
+    assert pool.depth() == 1
+    assert outer.execute('SELECT 1').fetchone()[0] == 1
+    outer.close()
+    assert pool.depth() == 0
+
+
+def test_threads_get_their_own_connections(web):
+    db = web.get_db()
+    try:
+        assert connect_on_thread(web) is not db
+    finally:
+        db.close()
+
+
+def test_closed_connections_are_reused(web):
+    pool = web.get_db_pool()
+    db = web.get_db()
+    db.close()
+    opened = pool.opened
+    
+    assert web.get_db() is db
+    db.close()
+    # Another thread picks up the idle connection too
+    assert connect_on_thread(web) is db
+    assert pool.opened == opened
+
+
+def test_release_rolls_back_uncommitted_writes(web):
+    db = web.get_db()
+    db.execute("INSERT INTO settings (key, value) VALUES ('pool_test', '1')")
+    assert db.in_transaction
+    db.close()
+    
+    db = web.get_db()
+    try:
+        assert not db.in_transaction
+        assert db.execute("SELECT value FROM settings WHERE key = 'pool_test'").fetchone() is None
+    finally:
+        db.close()
+
+
+def test_pool_keeps_at_most_size_idle_connections(web, monkeypatch):
+    pool = web.get_db_pool()
+    monkeypatch.setattr(pool, 'size', 1)
+    held = threading.Barrier(3)
+    
+    def hold():
+        db = web.get_db()
+        held.wait()
+        db.close()
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    held.wait()
+    for thread in threads:
+        thread.join()
+    
+    assert len(pool._idle) == 1
+
+
+def test_requests_release_what_they_left_open(web):
+    pool = web.get_db_pool()
+    
+    with web.app.test_request_context():
+        web.app.preprocess_request()
+        web.get_db().execute('SELECT 1')
+        assert pool.depth() == 1
+    # Popping the request context ran the teardown
+    assert pool.depth() == 0
+    assert len(pool._idle) == 1
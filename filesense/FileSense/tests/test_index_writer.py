@@ -0,0 +1,73 @@
+"""
+The single index writer and the scan checkpoint it keeps
+"""
+import queue
+from datetime import datetime
+
+
+def make_record(path):
+    return {
+        'path': path, 'filename': path.rsplit('/', 1)[-1], 'extension': '.txt', 'size': 10,
+        'modified_date': datetime.now(), 'created_date': datetime.now(), 'file_hash': path,
+        'mtime_ns': 1, 'inode': 1, 'existing_id': None, 'content_changed': True,
+        'summary': 'a summary', 'tags': ['one', 'two'],
+    }
+
+
+def start_job(web):
+    db = web.get_db()
+    try:
+        job_id = db.execute("INSERT INTO scan_jobs (root) VALUES ('/root')").lastrowid
+        db.commit()
+    finally:
+        db.close()
+    return job_id
+
+
+def run_writer(web, items, job_id, batch_size=10):
+    records = queue.Queue()
+    for item in items:
+        records.put(item)
+    records.put(None)
+    web.index_writer(records, batch_size, job_id)
+
+
+def query(web, sql, *params):
+    db = web.get_db()
+    try:
+        return [tuple(row) for row in db.execute(sql, params)]
+    finally:
+        db.close()
+
+
+def test_checkpoints_follow_written_records(web):
+    job_id = start_job(web)
+    run_writer(web, [make_record('/root/a/1.txt'), ('checkpoint', '/root/a', 1),
+                     make_record('/root/b/2.txt'), ('checkpoint', '/root/b', 2)], job_id, batch_size=1)
+    
+    assert query(web, 'SELECT path FROM files ORDER BY path') == [('/root/a/1.txt',), ('/root/b/2.txt',)]
+    assert query(web, 'SELECT cursor, progress FROM scan_jobs WHERE id = ?', job_id) == [('/root/b', 2)]
+
+
+def test_failed_record_holds_the_checkpoint(web, monkeypatch):
+    write_index_record = web.write_index_record
+    
+    def failing_write(db, record):
+        file_id = write_index_record(db, record)
+        if record['path'] == '/root/b/bad.txt':
+            raise ValueError('cannot index')
+        return file_id
+    
+    monkeypatch.setattr(web, 'write_index_record', failing_write)
+    job_id = start_job(web)
+    run_writer(web, [make_record('/root/a/1.txt'), ('checkpoint', '/root/a', 1),
+                     make_record('/root/b/bad.txt'), make_record('/root/b/2.txt'),
+                     ('checkpoint', '/root/b', 3), make_record('/root/c/3.txt')], job_id)
+    
+    # The other records are written; the failed one left nothing behind
+    assert query(web, 'SELECT path FROM files ORDER BY path') == [
+        ('/root/a/1.txt',), ('/root/b/2.txt',), ('/root/c/3.txt',)]
+    assert query(web, 'SELECT count(*) FROM summaries') == [(3,)]
+    assert query(web, 'SELECT tag_name, usage_count FROM tags ORDER BY tag_name') == [('one', 3), ('two', 3)]
+    # A resumed scan starts before the failed file
+    assert query(web, 'SELECT cursor, progress FROM scan_jobs WHERE id = ?', job_id) == [('/root/a', 1)]
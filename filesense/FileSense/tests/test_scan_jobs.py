@@ -0,0 +1,156 @@
+"""
+The scan job scheduler, and the scan_jobs row a failed scan leaves behind
+"""
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scans(web, monkeypatch):
+    """Replace scan_folder with one that checks control() until its folder is released
+    
+    Yields (started, release): the folders in the order they started, and
+    release(folder) to let that folder's scan return
+    """
+    started = []
+    done = defaultdict(threading.Event)
+    
+    def fake_scan(folder, verify=False, status=None, control=None):
+        started.append(folder)
+        while not done[folder].is_set():
+            control()
+            time.sleep(0.005)
+    monkeypatch.setattr(web, 'scan_folder', fake_scan)
+    yield started, lambda folder: done[folder].set()
+    for event in list(done.values()):
+        event.set()
+    for task in list(web.scan_tasks.values()):
+        task['_cancel'] = True
+        task['_resume'].set()
+    wait_for(lambda: all(t['state'] not in ('running', 'paused') for t in web.scan_tasks.values()))
+
+
+def state(web, job_id):
+    return web.scan_tasks[job_id]['state']
+
+
+def test_jobs_queue_for_a_free_slot(web, scans):
+    started, release = scans
+    first = web.submit_scan('/first')
+    second = web.submit_scan('/second')
+    
+    wait_for(lambda: started == ['/first'])
+    assert state(web, second) == 'queued'
+    
+    release('/first')
+    wait_for(lambda: state(web, first) == 'completed')
+    wait_for(lambda: started == ['/first', '/second'])
+    assert state(web, second) == 'running'
+
+
+def test_interactive_scans_preempt_background_ones(web, scans):
+    started, release = scans
+    background = web.submit_scan('/background', priority='background')
+    wait_for(lambda: started == ['/background'])
+    
+    interactive = web.submit_scan('/interactive')
+    wait_for(lambda: started == ['/background', '/interactive'])
+    assert state(web, background) == 'paused'
+    # Resumed by the scheduler, not by hand
+    assert not web.resume_scan(background)
+    
+    release('/interactive')
+    wait_for(lambda: state(web, interactive) == 'completed')
+    wait_for(lambda: state(web, background) == 'running')
+
+
+def test_paused_jobs_free_their_slot(web, scans):
+    started, release = scans
+    first = web.submit_scan('/first')
+    second = web.submit_scan('/second')
+    wait_for(lambda: started == ['/first'])
+    
+    assert web.pause_scan(first)
+    wait_for(lambda: state(web, first) == 'paused')
+    wait_for(lambda: started == ['/first', '/second'])
+    
+    assert web.resume_scan(first)
+    assert state(web, first) == 'queued'
+    release('/second')
+    wait_for(lambda: state(web, first) == 'running')
+
+
+def test_cancelled_jobs_stop(web, scans):
+    started, _ = scans
+    running = web.submit_scan('/running')
+    queued = web.submit_scan('/queued')
+    wait_for(lambda: started == ['/running'])
+    
+    assert web.cancel_scan(queued)
+    assert state(web, queued) == 'cancelled'
+    assert web.cancel_scan(running)
+    wait_for(lambda: state(web, running) == 'cancelled')
+    # The cancelled job in the queue never started
+    time.sleep(0.05)
+    assert started == ['/running']
+    assert not web.cancel_scan(running)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Two subfolders of three files each"""
+    root = tmp_path / 'docs'
+    for name in ('a', 'b'):
+        (root / name).mkdir(parents=True)
+        for i in range(3):
+            (root / name / f'{i}.txt').write_text(f'{name} {i}', encoding='utf-8')
+    return root
+
+
+def scan_jobs(web):
+    db = web.get_db()
+    try:
+        return [tuple(row) for row in db.execute('SELECT status, error FROM scan_jobs ORDER BY id')]
+    finally:
+        db.close()
+
+
+def test_failed_scan_is_recorded_and_resumed(web, folder):
+    calls = []
+    
+    def failing_control():
+        calls.append(None)
+        if len(calls) == 5:
+            raise RuntimeError('disk went away')
+    
+    with pytest.raises(RuntimeError):
+        web.scan_folder(str(folder), control=failing_control)
+    assert scan_jobs(web) == [('failed', 'disk went away')]
+    
+    # The next scan of the folder picks the failed job up again
+    web.scan_folder(str(folder))
+    assert scan_jobs(web) == [('completed', None)]
+    db = web.get_db()
+    try:
+        assert db.execute('SELECT count(*) FROM files').fetchone()[0] == 6
+    finally:
+        db.close()
+
+
+def test_cancelled_scan_stays_resumable(web, folder):
+    def cancel():
+        raise web.ScanCancelled()
+    
+    with pytest.raises(web.ScanCancelled):
+        web.scan_folder(str(folder), control=cancel)
+    assert scan_jobs(web) == [('running', None)]
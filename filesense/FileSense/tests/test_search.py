@@ -0,0 +1,52 @@
+"""
+Ranked keyword search with filename substring matches
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+
+def add_files(web, names):
+    db = web.get_db()
+    try:
+        db.executemany('INSERT INTO files (path, filename, extension, size, modified_date) VALUES (?, ?, ?, ?, ?)',
+                       [(f'/docs/{name}', name, '.txt', 10, datetime.now()) for name in names])
+        db.commit()
+    finally:
+        db.close()
+
+
+def found(web, query, limit=20):
+    return [row['filename'] for row in web.search_files(query, limit)]
+
+
+def test_best_match_first(web):
+    add_files(web, ['budget notes.txt', 'budget report final.txt', 'report draft.txt'])
+    assert found(web, 'budget report')[0] == 'budget report final.txt'
+    assert sorted(found(web, 'budget report')) == ['budget notes.txt', 'budget report final.txt', 'report draft.txt']
+
+
+def test_broad_queries_rank_their_newest_matches(web, monkeypatch):
+    monkeypatch.setitem(web.app.config, 'SEARCH_RANK_LIMIT', 10)
+    add_files(web, [f'report {i}.txt' for i in range(20)])
+    add_files(web, ['budget report.txt'])
+    add_files(web, [f'report {i}.txt' for i in range(20, 25)])
+    
+    results = found(web, 'budget report', limit=5)
+    # Ranked, not listed newest first, though it matches more files than are ranked
+    assert results[0] == 'budget report.txt'
+    assert len(results) == 5
+
+
+def test_substring_matches_follow_word_matches(web):
+    add_files(web, ['myreport.pdf', 'report.pdf', 'notes.txt'])
+    assert found(web, 'report') == ['report.pdf', 'myreport.pdf']
+
+
+def test_failed_search_releases_its_connection(web, monkeypatch):
+    monkeypatch.setitem(web.app.config, 'SEARCH_RANK_LIMIT', 'not a number')
+    add_files(web, ['report.pdf'])
+    with pytest.raises(sqlite3.Error):
+        web.search_files('report')
+    assert web.get_db_pool().depth() == 0